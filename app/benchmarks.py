@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de performance (pilote local, sans serveur Oracle)
+Usage: python app/benchmarks.py [nom_du_benchmark[=taille1,taille2] ...]
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from queue import Empty
+
+# Ajouter le dossier app au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import oracledb
+import pandas as pd
+
+from config import CSV_CACHE_CONFIG
+from crud_operations import CRUDClient, CRUDVoiture
+from csv_cache import read_table
+from csv_schema import read_csv, to_bind_rows, insert_sql
+from database import Database
+from loader import stream_csv, load_tables
+from local_driver import LocalDriver
+
+# Les benchmarks mesurent la lecture des CSV : pas de cache (sauf bench_csv_cache)
+CSV_CACHE_CONFIG['enabled'] = False
+
+# Durée maximale d'une mesure dans un processus enfant (secondes)
+CHILD_TIMEOUT = 3600.0
+
+LOCATION_ROW = ('C654', '11FG62', 2015, 4, 'C-45', 37, 3, 'Paris', 'Neuilly',
+                date(2015, 4, 1), date(2015, 4, 4), 4, 'très satisfait')
+
+def location_rows(n):
+    """Générer n lignes Location synthétiques (paresseusement)"""
+    for i in range(n):
+        yield LOCATION_ROW[:4] + (f"L-{i}",) + LOCATION_ROW[5:]
+
+def connect_local(n_rows=0, latency=0.0, pooled=False):
+    """Database branchée sur le pilote local, renvoyant n_rows lignes Location"""
+    driver = LocalDriver(responder=lambda sql, params: location_rows(n_rows), latency=latency)
+    db = Database(pooled=pooled, driver=driver)
+    db.connect()
+    return db
+
+def child_result(queue, proc, timeout=CHILD_TIMEOUT, poll=1.0):
+    """Résultat envoyé par un processus de mesure, puis fin du processus
+
+    Lève RuntimeError si le processus se termine sans répondre (tué faute de
+    mémoire, erreur...) ou ne répond pas en `timeout` secondes.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = queue.get(timeout=poll)
+            break
+        except Empty:
+            if proc.exitcode is not None:
+                try:
+                    result = queue.get(timeout=poll)  # envoyé juste avant la fin
+                    break
+                except Empty:
+                    raise RuntimeError(f"processus de mesure terminé sans résultat "
+                                       f"(code {proc.exitcode})") from None
+            if time.monotonic() > deadline:
+                proc.terminate()
+                proc.join()
+                raise RuntimeError(f"processus de mesure sans résultat après {timeout:.0f}s")
+    proc.join()
+    return result
+
+def print_table(headers, rows):
+    """Afficher un tableau de résultats aligné"""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(f"{h:>{w}}" for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(f"{v:>{w}}" for v, w in zip(row, widths)))
+
+# ========== STREAMING: fetchall vs iter_query ==========
+
+def _measure_read(mode, n_rows, queue):
+    """Processus enfant: lire n_rows lignes et mesurer le pic RSS"""
+    db = connect_local(n_rows)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first_row = None
+    count = 0
+    if mode == 'fetchall':
+        rows = db.execute_query("SELECT * FROM Location")
+        first_row = time.perf_counter() - start
+        for _ in rows:
+            count += 1
+    else:
+        for _ in db.iter_query("SELECT * FROM Location"):
+            if first_row is None:
+                first_row = time.perf_counter() - start
+            count += 1
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((count, (rss_after - rss_before) / 1024, first_row * 1000, total))
+
+def bench_streaming(sizes=(10_000, 100_000, 1_000_000)):
+    """Pic RSS et délai de première ligne selon le nombre de lignes"""
+    print("\n📊 Streaming: fetchall() vs iter_query()")
+    ctx = multiprocessing.get_context('fork')
+    results = []
+    for n_rows in sizes:
+        for mode in ('fetchall', 'iter_query'):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure_read, args=(mode, n_rows, queue))
+            proc.start()
+            count, rss_mb, first_ms, total = child_result(queue, proc)
+            results.append((f"{n_rows:,}", mode, f"{rss_mb:.1f}", f"{first_ms:.2f}", f"{total:.2f}"))
+    print_table(("lignes", "mode", "pic RSS (Mo)", "1ère ligne (ms)", "total (s)"), results)
+    return results
+
+# ========== COLONNES: tuples + DataFrame vs fetch_dataframe ==========
+
+# cursor.description de Location (nom, type, taille, taille interne, précision, échelle, null)
+LOCATION_DESCRIPTION = (
+    ('CODEC', oracledb.DB_TYPE_VARCHAR, 10, 10, None, None, False),
+    ('IMMAT', oracledb.DB_TYPE_VARCHAR, 10, 10, None, None, False),
+    ('ANNEE', oracledb.DB_TYPE_NUMBER, 5, 22, 4, 0, False),
+    ('MOIS', oracledb.DB_TYPE_NUMBER, 3, 22, 2, 0, False),
+    ('NUMLOC', oracledb.DB_TYPE_VARCHAR, 10, 10, None, None, False),
+    ('KM', oracledb.DB_TYPE_NUMBER, 11, 22, 10, 0, True),
+    ('DUREE', oracledb.DB_TYPE_NUMBER, 6, 22, 5, 0, True),
+    ('VILLED', oracledb.DB_TYPE_VARCHAR, 50, 50, None, None, True),
+    ('VILLEA', oracledb.DB_TYPE_VARCHAR, 50, 50, None, None, True),
+    ('DATED', oracledb.DB_TYPE_DATE, 23, None, None, None, True),
+    ('DATEF', oracledb.DB_TYPE_DATE, 23, None, None, None, True),
+    ('NOTE', oracledb.DB_TYPE_NUMBER, 3, 22, 2, 0, True),
+    ('AVIS', oracledb.DB_TYPE_VARCHAR, 200, 200, None, None, True),
+)
+
+def _measure_frame(mode, n_rows, queue):
+    """Processus enfant: construire le DataFrame de n_rows lignes Location"""
+    driver = LocalDriver(responder=lambda sql, params: (LOCATION_DESCRIPTION, location_rows(n_rows)))
+    db = Database(driver=driver)
+    db.connect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'tuples':
+        rows = db.execute_query("SELECT * FROM Location")
+        df = pd.DataFrame(rows, columns=[d[0] for d in LOCATION_DESCRIPTION])
+    else:
+        df = db.fetch_dataframe("SELECT * FROM Location")
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    frame_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+    queue.put((len(df), (rss_after - rss_before) / 1024, frame_mb, total))
+
+def bench_columnar(sizes=(100_000, 1_000_000)):
+    """Temps, pic RSS et taille du DataFrame : chemin tuples vs chemin colonnes
+
+    10 000 000 lignes : python app/benchmarks.py columnar=10000000
+    """
+    print("\n📊 DataFrame: execute_query() + pd.DataFrame vs fetch_dataframe()")
+    ctx = multiprocessing.get_context('fork')
+    results = []
+    for n_rows in sizes:
+        for mode in ('tuples', 'columnar'):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure_frame, args=(mode, n_rows, queue))
+            proc.start()
+            count, rss_mb, frame_mb, total = child_result(queue, proc)
+            results.append((f"{n_rows:,}", mode, f"{total:.2f}", f"{count / total:,.0f}",
+                            f"{rss_mb:.1f}", f"{frame_mb:.1f}"))
+    print_table(("lignes", "mode", "total (s)", "lignes/s", "pic RSS (Mo)", "DataFrame (Mo)"), results)
+    return results
+
+# ========== TYPES: Decimal vs types natifs (NativeTypeHandler) ==========
+
+VOITURE_DESCRIPTION = (
+    ('IMMAT', oracledb.DB_TYPE_VARCHAR, 10, 10, None, None, False),
+    ('CATEGORIE', oracledb.DB_TYPE_VARCHAR, 20, 20, None, None, True),
+    ('PLACES', oracledb.DB_TYPE_NUMBER, 3, 22, 2, 0, True),
+    ('COMPTEUR', oracledb.DB_TYPE_NUMBER, 127, 22, 0, -127, True),
+    ('PRIXJ', oracledb.DB_TYPE_NUMBER, 13, 22, 10, 2, True),
+)
+CATEGORIES = ('luxe', 'premium', 'familiale', 'citadine')
+
+def voiture_rows(n):
+    """n lignes Voiture dont les NUMBER arrivent en Decimal (oracledb.defaults.fetch_decimals)"""
+    for i in range(n):
+        yield (f"{i:06d}AB", CATEGORIES[i % 4], Decimal(2 + i % 6),
+               Decimal(1000 + i % 90000), Decimal(f"{20 + i % 80}.{i % 100:02d}"))
+
+def _aggregate(rows):
+    """Agrégations typiques : sommes Python puis groupby pandas"""
+    start = time.perf_counter()
+    total_km = sum(row[3] for row in rows)
+    total_prix = sum(row[4] for row in rows)
+    python_s = time.perf_counter() - start
+    df = pd.DataFrame(rows, columns=[d[0] for d in VOITURE_DESCRIPTION])
+    start = time.perf_counter()
+    df.groupby('CATEGORIE').agg({'COMPTEUR': 'sum', 'PRIXJ': 'mean'})
+    (df['PRIXJ'] * df['PLACES']).sum()
+    pandas_s = time.perf_counter() - start
+    return total_km, total_prix, python_s, pandas_s, str(df['PRIXJ'].dtype)
+
+def bench_types(sizes=(100_000, 1_000_000)):
+    """Coût des agrégations selon le type Python des NUMBER (Decimal ou natif)"""
+    print("\n📊 Types: Decimal vs int/float/centimes (outputtypehandler)")
+    results = []
+    for n_rows in sizes:
+        for mode in ('decimal', 'float', 'cents'):
+            driver = LocalDriver(responder=lambda sql, params: (VOITURE_DESCRIPTION, voiture_rows(n_rows)))
+            db = Database(driver=driver, native_types=mode != 'decimal')
+            if db.type_handler:
+                db.type_handler.price_mode = mode
+            db.connect()
+            db.metrics.slow_query_ms = 0
+            rows = db.execute_query("SELECT Immat, Categorie, Places, compteur, prixJ FROM Voiture")
+            _, _, python_s, pandas_s, dtype = _aggregate(rows)
+            results.append((f"{n_rows:,}", mode, type(rows[0][4]).__name__, dtype,
+                            f"{python_s * 1000:.1f}", f"{pandas_s * 1000:.1f}"))
+    print_table(("lignes", "mode", "prixJ", "dtype pandas", "sum() ms", "pandas ms"), results)
+    return results
+
+# ========== CONVERSION CSV: iterrows vs colonnes ==========
+
+LOCATION_HEADER = "CodeC;immat;annee;mois;numloc;km;duree;villed;villea;dated;datef;note;avis"
+
+def write_location_csv(path, n):
+    """CSV Location synthétique de n lignes (avec jetons NULL)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(LOCATION_HEADER + "\n")
+        for i in range(n):
+            note, avis = (str(1 + i % 5), "satisfait") if i % 3 else ("NULL", "NULL")
+            f.write(f"C{i % 5000};{i % 9000:02d}AB{i % 97};{2000 + i % 20};{1 + i % 12};L-{i};"
+                    f"{i % 900};{i % 14};Paris;Neuilly;2015-{1 + i % 12:02d}-01;"
+                    f"2015-{1 + i % 12:02d}-{2 + i % 27:02d};{note};{avis}\n")
+
+def _legacy_location_rows(df):
+    """Conversion ligne à ligne de l'ancien import_locations (référence)"""
+    data = []
+    for _, row in df.iterrows():
+        dated = None
+        datef = None
+        if pd.notna(row.get('dated')):
+            try:
+                dated = pd.to_datetime(row['dated'])
+            except Exception:
+                pass
+        if pd.notna(row.get('datef')):
+            try:
+                datef = pd.to_datetime(row['datef'])
+            except Exception:
+                pass
+        data.append((
+            str(row['CodeC']).strip() if pd.notna(row['CodeC']) else None,
+            str(row['immat']).strip() if pd.notna(row['immat']) else None,
+            int(row['annee']) if pd.notna(row['annee']) else None,
+            int(row['mois']) if pd.notna(row['mois']) else None,
+            str(row['numloc']).strip() if pd.notna(row['numloc']) else None,
+            int(row['km']) if pd.notna(row['km']) else None,
+            int(row['duree']) if pd.notna(row['duree']) else None,
+            str(row['villed']).strip() if pd.notna(row['villed']) else None,
+            str(row['villea']).strip() if pd.notna(row['villea']) else None,
+            dated,
+            datef,
+            int(row['note']) if pd.notna(row.get('note')) and str(row['note']) != 'NULL' else None,
+            str(row['avis']).strip() if pd.notna(row.get('avis')) and str(row['avis']) != 'NULL' else None
+        ))
+    return data
+
+def bench_convert(sizes=(1_000_000,), legacy_max=50_000):
+    """Lignes/s de la conversion CSV -> binds (l'ancienne boucle est limitée à legacy_max lignes)"""
+    print("\n📊 Conversion CSV Location: iterrows() vs colonnes (csv_schema)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f"location_{n_rows}.csv")
+            write_location_csv(path, n_rows)
+            start = time.perf_counter()
+            df = read_csv(path, 'location')
+            read_s = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = to_bind_rows(df, 'location')
+            convert_s = time.perf_counter() - start
+            results.append((f"{n_rows:,}", "colonnes", f"{read_s:.2f}", f"{convert_s:.2f}",
+                            f"{len(rows) / convert_s:,.0f}"))
+            n_legacy = min(n_rows, legacy_max)
+            df = pd.read_csv(path, sep=';', nrows=n_legacy)
+            start = time.perf_counter()
+            rows = _legacy_location_rows(df)
+            convert_s = time.perf_counter() - start
+            results.append((f"{n_legacy:,}", "iterrows", "-", f"{convert_s:.2f}",
+                            f"{len(rows) / convert_s:,.0f}"))
+    print_table(("lignes", "mode", "lecture (s)", "conversion (s)", "lignes/s"), results)
+    return results
+
+# ========== IMPORT EN FLUX: fichier entier vs paquets ==========
+
+def _measure_import(mode, path, queue):
+    """Processus enfant: importer le CSV Location et mesurer le pic RSS"""
+    db = connect_local()
+    db.metrics.slow_query_ms = 0
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'fichier entier':
+        rows = to_bind_rows(read_csv(path, 'location'), 'location')
+        report = db.execute_batch(insert_sql('location'), rows)
+    else:
+        report = stream_csv(db, 'location', path=path)
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((report.succeeded, (rss_after - rss_before) / 1024, total))
+
+def bench_import(sizes=(100_000, 1_000_000)):
+    """Pic RSS et débit de l'import Location : fichier entier vs stream_csv"""
+    print("\n📊 Import Location: fichier entier vs flux par paquets")
+    ctx = multiprocessing.get_context('fork')
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f"location_{n_rows}.csv")
+            write_location_csv(path, n_rows)
+            for mode in ('fichier entier', 'flux'):
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_measure_import, args=(mode, path, queue))
+                proc.start()
+                count, rss_mb, total = child_result(queue, proc)
+                results.append((f"{n_rows:,}", mode, f"{rss_mb:.1f}", f"{total:.2f}",
+                                f"{count / total:,.0f}"))
+    print_table(("lignes", "mode", "pic RSS (Mo)", "total (s)", "lignes/s"), results)
+    return results
+
+# ========== CHARGEMENT: séquentiel vs parallèle ==========
+
+def write_schema_csvs(directory, n_locations):
+    """Jeu de CSV cohérent (clés étrangères respectées) pour les 4 tables"""
+    n_clients, n_voitures, n_proprios = 5000, 9000, 500
+    files = {name: os.path.join(directory, f"{name}.csv")
+             for name in ('proprietaire', 'client', 'voiture', 'location')}
+    with open(files['proprietaire'], "w", encoding="utf-8") as f:
+        f.write("codeP;Pseudo;email;ville;anneeI\n")
+        for i in range(n_proprios):
+            f.write(f"P{i};pseudo{i};p{i}@mail.fr;Paris;{2000 + i % 20}.0\n")
+    with open(files['client'], "w", encoding="utf-8") as f:
+        f.write("CodeC;Nom;Prenom;age;Permis;Adresse;Ville\n")
+        for i in range(n_clients):
+            f.write(f"C{i};Nom{i};Prenom{i};{20 + i % 60};{1000000 + i};rue {i};Paris\n")
+    with open(files['voiture'], "w", encoding="utf-8") as f:
+        f.write("Immat;modele;Marque;Categorie;couleur;places;achatA;compteur;prixJ;codeP\n")
+        for i in range(n_voitures):
+            f.write(f"{i % 9000:02d}AB{i % 97};Clio;Renault;luxe;Rouge;4;2010.0;{i * 7};30.0;P{i % n_proprios}\n")
+    write_location_csv(files['location'], n_locations)
+    return files
+
+def bench_loader(sizes=(200_000,), writers=4, row_latency=20e-6):
+    """Durée totale de l'import des 4 tables : séquentiel vs parallèle
+
+    `row_latency` simule le travail du serveur par ligne insérée.
+    """
+    print(f"\n📊 Chargement: séquentiel vs parallèle ({writers} écrivains pour Location)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            files = write_schema_csvs(tmp, n_rows)
+            for mode in ('séquentiel', 'parallèle'):
+                driver = LocalDriver(row_latency=row_latency)
+                db = Database(pooled=mode == 'parallèle', driver=driver)
+                db.connect()
+                db.metrics.slow_query_ms = 0
+                start = time.perf_counter()
+                reports = load_tables(db, files=files, writers=writers)
+                total = time.perf_counter() - start
+                db.disconnect()
+                rows = sum(report.succeeded for report in reports.values() if report)
+                results.append((f"{n_rows:,}", mode, f"{rows:,}", f"{total:.2f}", f"{rows / total:,.0f}"))
+    print_table(("locations", "mode", "lignes", "total (s)", "lignes/s"), results)
+    return results
+
+# ========== CACHE DES CSV: parsing vs colonnes .npy ==========
+
+def bench_csv_cache(sizes=(1_000_000,), chunk_rows=50_000):
+    """Durée de lecture + conversion du CSV Location : sans cache, premier
+    passage (parsing + écriture du cache), passages suivants"""
+    print("\n📊 Lecture Location: CSV parsé vs cache .npy")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f"location_{n_rows}.csv")
+            write_location_csv(path, n_rows)
+            cache_dir = os.path.join(tmp, 'cache')
+            for mode, enabled in (('sans cache', False), ('cache froid', True), ('cache chaud', True)):
+                start = time.perf_counter()
+                chunks = read_table(path, 'location', chunksize=chunk_rows, directory=cache_dir, enabled=enabled)
+                first = next(chunks)
+                first_ms = (time.perf_counter() - start) * 1000
+                count = len(to_bind_rows(first, 'location'))
+                for chunk in chunks:
+                    count += len(to_bind_rows(chunk, 'location'))
+                total = time.perf_counter() - start
+                results.append((f"{n_rows:,}", mode, f"{first_ms:.1f}", f"{total:.2f}", f"{count / total:,.0f}"))
+    print_table(("lignes", "mode", "1er paquet (ms)", "total (s)", "lignes/s"), results)
+    return results
+
+# ========== CRUD EN MASSE: boucle create/update/delete vs *_many ==========
+
+def client_records(n):
+    """n clients synthétiques (dicts au format de CRUDClient)"""
+    return [{'codec': f"B{i:06d}", 'nom': f"Nom{i}", 'prenom': f"Prenom{i}", 'age': 20 + i % 60,
+             'permis': f"P{i:08d}", 'adresse': f"{i} rue de Paris", 'ville': 'Paris'} for i in range(n)]
+
+def bench_crud_bulk(sizes=(2_000,), latency=0.2e-3):
+    """Débit des opérations CRUD : une requête + COMMIT par ligne vs array DML
+
+    `latency` simule l'aller-retour réseau vers le serveur.
+    """
+    print(f"\n📊 CRUD: boucle ligne à ligne vs *_many (aller-retour {latency * 1000:.1f} ms)")
+    results = []
+    for n_rows in sizes:
+        records = client_records(n_rows)
+        changes = [{'codec': r['codec'], 'ville': 'Lyon'} for r in records]
+        codes = [r['codec'] for r in records]
+        for mode in ('boucle', 'en masse'):
+            driver = LocalDriver(responder=_check_and_act_responder, latency=latency)
+            db = Database(driver=driver)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.connect()
+            db.metrics.slow_query_ms = 0
+            crud = CRUDClient(db)
+            for operation in ('create', 'update', 'delete'):
+                round_trips, commits = driver.round_trips, driver.commits
+                start = time.perf_counter()
+                if mode == 'en masse':
+                    bulk = {'create': crud.create_many, 'update': crud.update_many, 'delete': crud.delete_many}
+                    ok = bulk[operation]({'create': records, 'update': changes, 'delete': codes}[operation]).succeeded
+                else:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        if operation == 'create':
+                            ok = sum(bool(crud.create(**r)) for r in records)
+                        elif operation == 'update':
+                            ok = sum(bool(crud.update(c['codec'], ville=c['ville'])) for c in changes)
+                        else:
+                            ok = sum(bool(crud.delete(code)) for code in codes)
+                total = time.perf_counter() - start
+                results.append((f"{n_rows:,}", operation, mode, f"{ok:,}", driver.round_trips - round_trips,
+                                driver.commits - commits, f"{total:.2f}", f"{n_rows / total:,.0f}"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.disconnect()
+    print_table(("lignes", "opération", "mode", "ok", "allers-retours", "commits", "total (s)", "lignes/s"),
+                results)
+    return results
+
+# ========== ENREGISTREMENTS: SELECT * en tuples vs projection en __slots__ ==========
+
+CLIENT_COLUMNS = [column for _, column in CRUDClient.KEY + CRUDClient.FIELDS]
+# Colonnes de la liste des clients du menu
+CLIENT_LISTING = ('codec', 'nom', 'prenom', 'ville')
+
+def client_values(i):
+    """Ligne Client synthétique (une chaîne par valeur, comme le pilote)"""
+    return {'CodeC': f"C{i:07d}", 'Nom': f"Nom{i % 5000}", 'Prenom': f"Prenom{i % 300}",
+            'Age': 18 + i % 70, 'Permis': f"{i:012d}",
+            'Adresse': f"{i % 200} avenue des Champs-Élysées, bâtiment {i % 7}", 'Ville': f"Ville{i % 900}"}
+
+def _client_responder(n_rows):
+    """Réponses du pilote local : les colonnes de la liste du SELECT"""
+    def respond(sql, params):
+        columns = sql.split("SELECT ", 1)[1].split(" FROM", 1)[0].strip()
+        names = CLIENT_COLUMNS if columns == '*' else [column.strip() for column in columns.split(',')]
+        return (tuple(values[name] for name in names) for values in map(client_values, range(n_rows)))
+    return respond
+
+def wire_bytes(row):
+    """Taille approchée d'une ligne sur le réseau : octets UTF-8 des chaînes,
+    un octet par paire de chiffres (+1) pour les NUMBER"""
+    return sum(len(value.encode()) if isinstance(value, str) else len(str(value)) // 2 + 1
+               for value in row if value is not None)
+
+def bench_records(sizes=(1_000_000,)):
+    """Mémoire par ligne lue et volume transféré : SELECT * vs projection,
+    tuples vs enregistrements à __slots__"""
+    print(f"\n📊 Lectures Client: SELECT * vs projection ({', '.join(CLIENT_LISTING)}), tuples vs __slots__")
+    results = []
+    for n_rows in sizes:
+        driver = LocalDriver(responder=_client_responder(n_rows))
+        db = Database(driver=driver)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.connect()
+        db.metrics.slow_query_ms = 0
+        crud = CRUDClient(db)
+        known = dict(crud.KEY + crud.FIELDS)
+        for columns in (None, CLIENT_LISTING):
+            select = ", ".join(known[field] for field in columns) if columns else "*"
+            for mode in ('tuples', '__slots__'):
+                tracemalloc.start()
+                start = time.perf_counter()
+                if mode == 'tuples':
+                    rows = db.execute_query(f"SELECT {select} FROM Client ORDER BY Nom, Prenom")
+                else:
+                    rows = crud.read(columns=columns)
+                total = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                sample = rows[:10_000]
+                wire = sum(wire_bytes(row) for row in sample) / len(sample)
+                results.append((f"{n_rows:,}", "SELECT *" if columns is None else "projection", mode,
+                                len(rows[0]), f"{current / n_rows:.0f}", f"{peak / n_rows:.0f}",
+                                f"{wire:.0f}", f"{total:.2f}"))
+                del rows, sample
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.disconnect()
+    print_table(("lignes", "lecture", "type", "colonnes", "octets/ligne", "pic octets/ligne",
+                 "réseau octets/ligne", "total (s)"), results)
+    return results
+
+# ========== VÉRIFICATION ET ACTION: relecture + écriture vs un aller-retour ==========
+
+CLIENT_ROW = ('C0001', 'Dupont', 'Jean', 35, '1234567890', '123 rue de la Paix', 'Paris')
+
+def _check_and_act_responder(sql, params):
+    """Réponses du pilote local : la ligne du client pour les lectures, RETURNING
+    et le bloc PL/SQL (aucune location)"""
+    words = sql.split()
+    if words[:2] == ['SELECT', 'COUNT(*)']:
+        return [(0,)]
+    if words[0] in ('SELECT', 'UPDATE'):
+        return [CLIENT_ROW]
+    if words[0] == 'DECLARE':
+        return [(CLIENT_ROW[1], CLIENT_ROW[2], 0)]
+    return []
+
+def _legacy_update(db, codec):
+    """Flux précédent de modifier_client : read(), UPDATE puis COMMIT"""
+    with db.acquire() as (connection, cursor):
+        cursor.execute("SELECT * FROM Client WHERE CodeC = :1", (codec,))
+        cursor.fetchall()
+        cursor.execute("UPDATE Client SET Ville = :1 WHERE CodeC = :2", ('Lyon', codec))
+        connection.commit()
+
+def _legacy_delete(db, codec):
+    """Flux précédent de supprimer_client : read(), COUNT des locations, DELETE puis COMMIT"""
+    with db.acquire() as (connection, cursor):
+        cursor.execute("SELECT * FROM Client WHERE CodeC = :1", (codec,))
+        cursor.fetchall()
+        cursor.execute("SELECT COUNT(*) FROM Location WHERE CodeC = :1", (codec,))
+        cursor.fetchall()
+        cursor.execute("DELETE FROM Client WHERE CodeC = :1", (codec,))
+        connection.commit()
+
+def bench_check_and_act(sizes=(200,), latency=1e-3):
+    """Latence d'une action du menu (modifier / supprimer un client) :
+    relecture puis écriture et COMMIT vs une seule instruction serveur"""
+    print(f"\n📊 Vérification et action: flux précédent vs un aller-retour (aller-retour {latency * 1000:.1f} ms)")
+    results = []
+    for n_actions in sizes:
+        for operation in ('modifier', 'supprimer'):
+            for mode in ('précédent', 'un aller-retour'):
+                driver = LocalDriver(responder=_check_and_act_responder, latency=latency)
+                db = Database(driver=driver)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db.connect()
+                db.metrics.slow_query_ms = 0
+                crud = CRUDClient(db)
+                round_trips = driver.round_trips
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(n_actions):
+                        if mode == 'précédent':
+                            (_legacy_update if operation == 'modifier' else _legacy_delete)(db, CLIENT_ROW[0])
+                        elif operation == 'modifier':
+                            crud.update(CLIENT_ROW[0], ville='Lyon')
+                        else:
+                            crud.delete(CLIENT_ROW[0])
+                total = time.perf_counter() - start
+                results.append((f"{n_actions:,}", operation, mode,
+                                f"{(driver.round_trips - round_trips) / n_actions:.0f}",
+                                f"{total / n_actions * 1000:.2f}"))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db.disconnect()
+    print_table(("actions", "opération", "flux", "allers-retours/action", "ms/action"), results)
+    return results
+
+def _legacy_update_returning(crud, codec, changes):
+    """UPDATE précédent de update() : SET construit selon les champs fournis"""
+    columns = crud.KEY + crud.FIELDS + crud.OTHER
+    sets = ", ".join(f"{crud.UPDATABLE[param]} = :{param}" for param in changes)
+    query = (f"UPDATE Client SET {sets} WHERE CodeC = :k_codec "
+             f"RETURNING {', '.join(column for _, column in columns)} "
+             f"INTO {', '.join(f':r_{param}' for param, _ in columns)}")
+    returning = {f"r_{param}": str for param, _ in columns}
+    crud.db.execute_returning(query, {**changes, 'k_codec': codec}, returning)
+
+def bench_statement_shapes(sizes=(5000,), cache_sizes=(20, 50)):
+    """Cache d'instructions sous un mélange aléatoire de modifications de
+    clients : SET selon les champs fournis vs UPDATE canonique"""
+    print("\n📊 Formes des UPDATE: textes distincts, analyses et succès du cache d'instructions")
+    rng = random.Random(7)
+    fields = list(CRUDClient.UPDATABLE)
+    values = {'nom': 'Durand', 'prenom': 'Léa', 'age': 30, 'permis': 'B',
+              'adresse': '1 rue Haute', 'ville': 'Lyon'}
+    results = []
+    for n_updates in sizes:
+        updates = [{param: values[param] for param in rng.sample(fields, rng.randint(1, 3))}
+                   for _ in range(n_updates)]
+        for cache_size in cache_sizes:
+            for mode in ('SET dynamique', 'canonique'):
+                driver = LocalDriver(responder=_check_and_act_responder)
+                db = Database(driver=driver)
+                db.statement_cache.size = cache_size
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db.connect()
+                db.metrics.slow_query_ms = 0
+                crud = CRUDClient(db)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for changes in updates:
+                        if mode == 'canonique':
+                            crud.update(CLIENT_ROW[0], **changes)
+                        else:
+                            _legacy_update_returning(crud, CLIENT_ROW[0], changes)
+                stats = db.statement_cache.stats()
+                results.append((f"{n_updates:,}", cache_size, mode, stats['distinct_statements'],
+                                f"{stats['parses']:,}", f"{stats['hit_ratio']:.1%}"))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db.disconnect()
+    print_table(("updates", "cache", "texte", "textes distincts", "analyses", "succès cache"), results)
+    return results
+
+def _voiture_responder(sql, params):
+    """Réponses du pilote local : une voiture par immatriculation"""
+    words = sql.split()
+    if words[0] in ('SELECT', 'UPDATE'):
+        immat = (params or ('AA-000-AA',))[0] if not isinstance(params, dict) else params['k_immat']
+        return [(immat, 'Clio', 'Renault', 'citadine', 'rouge', 5, 2020, 10000, 45.0, 'P1', 'disponible')]
+    return []
+
+def bench_entity_cache(sizes=(5000,), cars=200, write_every=50, latency=2e-4):
+    """Lectures de voitures par immatriculation (quelques voitures très
+    demandées) avec une modification toutes les `write_every` lectures :
+    sans cache d'entités vs avec"""
+    print(f"\n📊 Cache d'entités: {cars} voitures, aller-retour {latency * 1000:.1f} ms")
+    rng = random.Random(11)
+    immats = [f"AA-{i:03d}-AA" for i in range(cars)]
+    weights = [1 / rank for rank in range(1, cars + 1)]
+    results = []
+    for n_reads in sizes:
+        lookups = rng.choices(immats, weights, k=n_reads)
+        for mode in ('sans cache', 'cache'):
+            driver = LocalDriver(responder=_voiture_responder, latency=latency)
+            db = Database(driver=driver)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.connect()
+            db.metrics.slow_query_ms = 0
+            db.entities = None
+            if mode == 'cache':
+                db.enable_entity_cache(verify_s=0)
+            crud = CRUDVoiture(db)
+            round_trips = driver.round_trips
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i, immat in enumerate(lookups, 1):
+                    crud.read(immat)
+                    if i % write_every == 0:
+                        crud.update(immat, compteur=10000 + i)
+            total = time.perf_counter() - start
+            stats = db.entities.stats() if db.entities else {'hit_ratio': 0.0}
+            results.append((f"{n_reads:,}", mode, f"{driver.round_trips - round_trips:,}",
+                            f"{total / n_reads * 1000:.3f}", f"{stats['hit_ratio']:.1%}"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.disconnect()
+    print_table(("lectures", "mode", "allers-retours", "ms/lecture", "succès cache"), results)
+    return results
+
+BENCHMARKS = {
+    'streaming': bench_streaming,
+    'columnar': bench_columnar,
+    'types': bench_types,
+    'convert': bench_convert,
+    'import': bench_import,
+    'loader': bench_loader,
+    'csvcache': bench_csv_cache,
+    'crudbulk': bench_crud_bulk,
+    'records': bench_records,
+    'checkact': bench_check_and_act,
+    'stmtshapes': bench_statement_shapes,
+    'entities': bench_entity_cache,
+}
+
+def main():
+    """Lancer les benchmarks demandés (tous par défaut)
+
+    `nom=taille1,taille2` remplace les tailles par défaut d'un benchmark.
+    """
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for arg in names:
+        name, _, sizes = arg.partition('=')
+        if name not in BENCHMARKS:
+            print(f"❌ Benchmark inconnu: {name} (disponibles: {', '.join(BENCHMARKS)})")
+            continue
+        if sizes:
+            BENCHMARKS[name](tuple(int(size) for size in sizes.split(',')))
+        else:
+            BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main()
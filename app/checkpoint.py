@@ -0,0 +1,109 @@
+"""
+Points de reprise de l'import : chaque paquet validé est enregistré dans la
+même transaction que ses lignes, un import interrompu repart du dernier paquet
+"""
+import io
+import itertools
+
+import pandas as pd
+
+from csv_schema import read_csv
+
+CHECKPOINT_TABLE = 'Import_Checkpoint'
+
+# Une ligne par paquet validé : table, empreinte du CSV, position dans le fichier
+_CREATE_TABLE = (
+    f"CREATE TABLE {CHECKPOINT_TABLE} ("
+    "table_name VARCHAR2(30), source_hash VARCHAR2(32), chunk_no NUMBER, "
+    "start_offset NUMBER, end_offset NUMBER, row_count NUMBER, loaded NUMBER, chunk_rows NUMBER, "
+    f"CONSTRAINT pk_import_checkpoint PRIMARY KEY (table_name, source_hash, chunk_no))"
+)
+
+
+def ensure_table(db):
+    """Créer la table des points de reprise si besoin (ORA-00955 ignorée)"""
+    db.execute_update(
+        f"BEGIN EXECUTE IMMEDIATE '{_CREATE_TABLE}'; "
+        f"EXCEPTION WHEN OTHERS THEN IF SQLCODE != -955 THEN RAISE; END IF; END;"
+    )
+
+def committed_chunks(db, name, source):
+    """Paquets déjà validés d'un CSV : {n°: (début, fin, lignes, insérées, lignes par paquet)}"""
+    rows = db.execute_query(
+        f"SELECT chunk_no, start_offset, end_offset, row_count, loaded, chunk_rows "
+        f"FROM {CHECKPOINT_TABLE} WHERE table_name = :1 AND source_hash = :2",
+        [name, source]
+    )
+    if rows is None:
+        raise RuntimeError(f"Points de reprise illisibles ({CHECKPOINT_TABLE})")
+    return {int(chunk_no): tuple(int(value) for value in values) for chunk_no, *values in rows}
+
+def sources(db):
+    """Empreintes des CSV ayant des points de reprise : {nom: {empreintes}}"""
+    rows = db.execute_query(f"SELECT DISTINCT table_name, source_hash FROM {CHECKPOINT_TABLE}") or []
+    found = {}
+    for name, source in rows:
+        found.setdefault(name, set()).add(source)
+    return found
+
+def clear(db, names=None):
+    """Oublier les points de reprise (import terminé ou recommencé)"""
+    if names is None:
+        db.execute_update(f"DELETE FROM {CHECKPOINT_TABLE}")
+        return
+    for name in names:
+        db.execute_update(f"DELETE FROM {CHECKPOINT_TABLE} WHERE table_name = :1", [name])
+
+def iter_chunks(path, name, chunk_rows, done=None):
+    """Lire le CSV par paquets de `chunk_rows` lignes, avec leur position en octets
+
+    Renvoie des (n°, début, fin, DataFrame) ; l'index du DataFrame est le rang
+    des lignes dans le fichier, comme read_csv. Les paquets de `done` ne sont
+    ni relus ni renvoyés : on saute directement à leur fin.
+    """
+    done = done or {}
+    with open(path, 'rb') as f:
+        header = f.readline()
+        chunk_no, row = 0, 0
+        while True:
+            if chunk_no in done:
+                _, end, count, _, _ = done[chunk_no]
+                f.seek(end)
+                row += count
+                chunk_no += 1
+                continue
+            start = f.tell()
+            lines = list(itertools.islice(iter(f.readline, b''), chunk_rows))
+            if not lines:
+                return
+            end = f.tell()
+            df = read_csv(io.BytesIO(header + b''.join(lines)), name)
+            df.index = pd.RangeIndex(row, row + len(df))
+            yield chunk_no, start, end, df
+            row += len(df)
+            chunk_no += 1
+
+def resume_point(done):
+    """(paquets, lignes lues, lignes insérées) déjà validés, pour le rapport d'import"""
+    return (len(done), sum(count for _, _, count, _, _ in done.values()),
+            sum(loaded for _, _, _, loaded, _ in done.values()))
+
+def write_chunk(db, query, rows, name, source, chunk, chunk_rows):
+    """Insérer un paquet et son point de reprise dans une seule transaction
+
+    Les lignes rejetées par Oracle (batcherrors) n'empêchent pas la
+    validation : elles figurent dans le BatchReport renvoyé.
+    """
+    chunk_no, start, end = chunk
+    with db.transaction():
+        report = db.execute_batch(query, rows, chunk_size=len(rows), policy='partial')
+        if report.aborted:
+            # Pas de point de reprise pour un paquet non envoyé : la transaction est annulée
+            raise RuntimeError(f"{name}: paquet {chunk_no} interrompu")
+        db.execute_update(
+            f"INSERT INTO {CHECKPOINT_TABLE} (table_name, source_hash, chunk_no, start_offset, "
+            f"end_offset, row_count, loaded, chunk_rows) VALUES (:1, :2, :3, :4, :5, :6, :7, :8)",
+            [name, source, chunk_no, start, end, len(rows), report.succeeded, chunk_rows]
+        )
+    report.committed = True
+    return report
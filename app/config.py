@@ -14,9 +14,127 @@ ORACLE_CONFIG = {
     'dsn': os.getenv('ORACLE_DSN', 'localhost:1521/FREEPDB1')
 }
 
+# Pool de connexions (mode multi-threads)
+POOL_CONFIG = {
+    'enabled': os.getenv('ORACLE_POOL', '0') == '1',
+    'min': int(os.getenv('ORACLE_POOL_MIN', '1')),
+    'max': int(os.getenv('ORACLE_POOL_MAX', '4')),
+    'increment': int(os.getenv('ORACLE_POOL_INCREMENT', '1'))
+}
+
+# Transactions: commit groupé des écritures concurrentes (connexion unique)
+TRANSACTION_CONFIG = {
+    'group_commit': os.getenv('ORACLE_GROUP_COMMIT', '0') == '1',
+    'group_commit_window_ms': float(os.getenv('ORACLE_GROUP_COMMIT_WINDOW_MS', '2')),
+    'group_commit_max': int(os.getenv('ORACLE_GROUP_COMMIT_MAX', '64'))
+}
+
+# Écritures en lot (array DML)
+BATCH_CONFIG = {
+    'chunk_size': int(os.getenv('ORACLE_BATCH_SIZE', '10000')),
+    # 'partial': valider les lignes correctes / 'atomic': tout ou rien
+    'error_policy': os.getenv('ORACLE_BATCH_POLICY', 'partial')
+}
+
+# Import des CSV en flux (lignes par paquet, paquets en attente d'écriture)
+IMPORT_CONFIG = {
+    'chunk_rows': int(os.getenv('IMPORT_CHUNK_ROWS', '50000')),
+    'queue_depth': int(os.getenv('IMPORT_QUEUE_DEPTH', '2')),
+    # Chargement parallèle (nécessite ORACLE_POOL=1) et écrivains pour Location
+    'parallel': os.getenv('IMPORT_PARALLEL', '0') == '1',
+    'writers': int(os.getenv('IMPORT_WRITERS', '4')),
+    # 'full': vider puis recharger / 'delta': n'appliquer que les différences /
+    # 'staging': charger des tables STG_* puis publier en une transaction
+    'mode': os.getenv('IMPORT_MODE', 'full'),
+    'keep_staging': os.getenv('IMPORT_KEEP_STAGING', '0') == '1',
+    # Points de reprise par paquet (table Import_Checkpoint) : un import complet
+    # interrompu reprend au dernier paquet validé au lieu de tout recommencer
+    'resume': os.getenv('IMPORT_RESUME', '0') == '1',
+    # Validation des CSV en mémoire avant connexion (lignes rejetées dans REJECT_DIR) :
+    # 'schema' (types, longueurs, clés), 'all' (+ CHECK et triggers) ou 'off'
+    'prevalidate': os.getenv('IMPORT_PREVALIDATE', 'schema'),
+    # Référence du mode delta: 'auto', 'snapshot' (dernier import) ou 'live' (tables)
+    'delta_source': os.getenv('IMPORT_DELTA_SOURCE', 'auto')
+}
+
+# Statistiques de l'optimiseur après import : tables dont le nombre de lignes a
+# changé de plus de stale_pct %, échantillonnées au-delà de sample_rows lignes
+STATS_CONFIG = {
+    'stale_pct': float(os.getenv('ORACLE_STATS_STALE_PCT', '10')),
+    'sample_rows': int(os.getenv('ORACLE_STATS_SAMPLE_ROWS', '1000000')),
+    # Pourcentage lu au-delà de sample_rows, ou 'auto' (DBMS_STATS.AUTO_SAMPLE_SIZE)
+    'sample_pct': os.getenv('ORACLE_STATS_SAMPLE_PCT', 'auto'),
+    'background': os.getenv('ORACLE_STATS_BACKGROUND', '1') == '1'
+}
+
+# Lecture en flux (taille des lots récupérés par aller-retour)
+FETCH_CONFIG = {
+    'arraysize': int(os.getenv('ORACLE_ARRAYSIZE', '500')),
+    'prefetchrows': int(os.getenv('ORACLE_PREFETCHROWS', '501')),
+    # Lignes par page des listes (pagination par clé)
+    'page_size': int(os.getenv('ORACLE_PAGE_SIZE', '20'))
+}
+
+# Cache d'instructions du pilote : textes SQL préparés gardés par connexion
+STATEMENT_CACHE_CONFIG = {
+    'size': int(os.getenv('ORACLE_STMT_CACHE_SIZE', '50'))
+}
+
+# Conversion des NUMBER en types Python natifs (outputtypehandler)
+TYPE_CONFIG = {
+    'native': os.getenv('ORACLE_NATIVE_TYPES', '1') == '1',
+    # prixJ: 'float' (euros) ou 'cents' (entier en centimes, calculs exacts)
+    'price_mode': os.getenv('ORACLE_PRICE_MODE', 'float')
+}
+
 # Configuration des chemins
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+# CSV_DIR: importer un autre jeu de CSV (ex: généré par generate_data.py)
+DATA_DIR = os.getenv('CSV_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data'))
 SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sql')
+METRICS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'metrics')
+STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'state')
+REJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'rejects')
+GENERATED_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'generated')
+
+# Cache des résultats de requêtes (opt-in, invalidé par les écritures)
+CACHE_CONFIG = {
+    'enabled': os.getenv('ORACLE_QUERY_CACHE', '0') == '1',
+    'max_entries': int(os.getenv('ORACLE_QUERY_CACHE_ENTRIES', '256')),
+    'max_mb': float(os.getenv('ORACLE_QUERY_CACHE_MB', '32')),
+    'ttl_s': float(os.getenv('ORACLE_QUERY_CACHE_TTL_S', '300'))
+}
+
+# Cache d'entités : lignes Client / Voiture / Proprietaire lues par clé
+ENTITY_CACHE_CONFIG = {
+    'enabled': os.getenv('ORACLE_ENTITY_CACHE', '0') == '1',
+    # Entrées par table (LRU)
+    'max_entries': int(os.getenv('ORACLE_ENTITY_CACHE_ENTRIES', '4096')),
+    # Revalider par ORA_ROWSCN les entrées plus anciennes (secondes, 0 = jamais)
+    'verify_s': float(os.getenv('ORACLE_ENTITY_CACHE_VERIFY_S', '30'))
+}
+
+# Cache des CSV parsés (colonnes .npy, invalidé quand le CSV change)
+CSV_CACHE_CONFIG = {
+    'enabled': os.getenv('CSV_CACHE', '1') == '1',
+    'directory': os.getenv('CSV_CACHE_DIR', os.path.join(STATE_DIR, 'csv_cache')),
+    # Recalculer le hash même si taille et date n'ont pas changé
+    'verify': os.getenv('CSV_CACHE_VERIFY', '0') == '1'
+}
+
+# Générateur de données synthétiques (même graine et même taille de bloc :
+# mêmes fichiers, quel que soit le nombre de processus)
+GENERATOR_CONFIG = {
+    'seed': int(os.getenv('DATAGEN_SEED', '42')),
+    'workers': int(os.getenv('DATAGEN_WORKERS', str(os.cpu_count() or 1))),
+    'block_rows': int(os.getenv('DATAGEN_BLOCK_ROWS', '500000')),
+    'directory': os.getenv('DATAGEN_DIR', GENERATED_DIR)
+}
+
+# Instrumentation des requêtes
+METRICS_CONFIG = {
+    'slow_query_ms': float(os.getenv('ORACLE_SLOW_QUERY_MS', '500')),
+    'sample_size': int(os.getenv('ORACLE_METRICS_SAMPLES', '1024'))
+}
 
 # Fichiers CSV
 CSV_FILES = {
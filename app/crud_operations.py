@@ -2,18 +2,540 @@
 """
 Module CRUD - Opérations Create, Read, Update, Delete
 Gestion complète des entités: Clients, Voitures, Locations, Propriétaires
+
+Les opérations appelées dans un bloc `with crud.transaction():` (ou
+`with db.transaction():`) sont validées ensemble par un seul COMMIT.
 """
 
+from config import BATCH_CONFIG, FETCH_CONFIG
+from csv_schema import CSV_SCHEMAS
 from database import Database
+from query_cache import written_tables
+from records import record_type
 from datetime import datetime, date
+from decimal import Decimal
+from functools import lru_cache
+import base64
+import json
 import sys
+import time
 
-class CRUDClient:
-    """Opérations CRUD pour les clients"""
+# Résultat d'une ligne d'une opération en masse
+OK = 'ok'
+NOT_FOUND = 'introuvable'
+FAILED = 'erreur'
+
+# Type Python des binds de sortie (RETURNING INTO), d'après le schéma des CSV ;
+# VARCHAR2 pour les colonnes absentes des CSV (etat)
+_OUT_TYPES = {'str': str, 'int': int, 'float': float, 'date': datetime}
+COLUMN_TYPES = {(schema['table'], column.name): _OUT_TYPES[column.type]
+                for schema in CSV_SCHEMAS.values() for column in schema['columns']}
+
+
+class _ReadFailed(Exception):
+    """Lecture d'une entité en erreur (déjà signalée par Database)"""
+
+
+class BulkResult:
+    """Résultat d'un create_many / update_many / delete_many
+
+    `outcomes[i]` : (statut, message) de l'enregistrement i, dans l'ordre
+    d'entrée ; statut OK, NOT_FOUND (aucune ligne touchée) ou FAILED.
+    """
+    
+    def __init__(self, total):
+        self.outcomes = [(OK, None)] * total
+        self.elapsed = 0.0
+        self.chunks = 0
+    
+    def fail(self, index, message):
+        self.outcomes[index] = (FAILED, message)
+    
+    def count(self, status):
+        return sum(1 for outcome, _ in self.outcomes if outcome == status)
+    
+    @property
+    def succeeded(self):
+        return self.count(OK)
+    
+    @property
+    def rows_per_second(self):
+        return len(self.outcomes) / self.elapsed if self.elapsed else 0.0
+    
+    def summary(self, limit=5):
+        """Résumé lisible : compteurs, débit et premiers échecs"""
+        lines = [f"{self.succeeded}/{len(self.outcomes)} ok, {self.count(NOT_FOUND)} introuvable(s), "
+                 f"{self.count(FAILED)} en erreur ({self.rows_per_second:,.0f} lignes/s)"]
+        failures = [(i, status, message) for i, (status, message) in enumerate(self.outcomes) if status != OK]
+        lines.extend(f"#{i}: {status}" + (f" ({message})" if message else "")
+                     for i, status, message in failures[:limit])
+        if len(failures) > limit:
+            lines.append(f"... {len(failures) - limit} autre(s)")
+        return lines
+
+
+# ========== CURSEURS DE PAGINATION ==========
+
+def _encode_cursor(table, values):
+    """Curseur opaque : valeurs de tri de la dernière ligne d'une page"""
+    def plain(value):
+        if isinstance(value, (datetime, date)):
+            return {'d': value.isoformat()}
+        if isinstance(value, Decimal):
+            return {'n': str(value)}
+        return value
+    data = json.dumps([table, [plain(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor, table, size):
+    """Valeurs de tri d'un curseur de `table` (ValueError si le curseur est invalide)"""
+    def typed(value):
+        if isinstance(value, dict) and 'd' in value:
+            return datetime.fromisoformat(value['d'])
+        if isinstance(value, dict) and 'n' in value:
+            return Decimal(value['n'])
+        return value
+    try:
+        owner, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Curseur de pagination invalide: {e}") from None
+    if owner != table or not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Curseur de pagination invalide pour {table}")
+    return [typed(value) for value in values]
+
+
+class CRUDBase:
+    """Base commune des classes CRUD
+    
+    Les sous-classes décrivent leur table : `KEY` et `FIELDS` sont des
+    (paramètre, colonne) dans l'ordre des arguments de create(), `UPDATABLE`
+    associe les paramètres de update() aux colonnes. `ORDER` est l'ordre de
+    page() (terminé par la clé primaire, couvert par un index) et `FILTERS`
+    ses filtres d'égalité (paramètre: colonne). `OTHER` complète la liste
+    des colonnes de la table (hors create()), dans l'ordre du schéma.
+    """
+    
+    TABLE = None
+    KEY = ()
+    FIELDS = ()
+    UPDATABLE = {}
+    OTHER = ()
+    ORDER = ()
+    FILTERS = {}
     
     def __init__(self, db: Database):
         self.db = db
     
+    def transaction(self):
+        """Ouvrir (ou rejoindre) une transaction : un seul COMMIT pour le bloc"""
+        return self.db.transaction()
+    
+    # ========== PROJECTION ET ENREGISTREMENTS ==========
+    
+    def _projection(self, columns=None, alias='', required=()):
+        """(liste du SELECT, champs) pour les paramètres `columns` (toutes les
+        colonnes par défaut), complétés des champs `required`"""
+        known = dict(self.KEY + self.FIELDS + self.OTHER)
+        fields = list(columns or known)
+        unknown = [field for field in fields if field not in known]
+        if unknown:
+            raise ValueError(f"Colonne inconnue: {', '.join(unknown)} ({', '.join(known)})")
+        fields.extend(field for field in required if field not in fields)
+        return ", ".join(f"{alias}{known[field]}" for field in fields), tuple(fields)
+    
+    def _records(self, rows, fields):
+        """Lignes -> enregistrements à __slots__ (None si la requête a échoué)"""
+        if rows is None:
+            return None
+        make = record_type(self.TABLE, fields)
+        return [make(*row) for row in rows]
+    
+    def _stream_records(self, query, params, fields):
+        """Parcourir une requête en flux, ligne par ligne en enregistrements"""
+        make = record_type(self.TABLE, fields)
+        for row in self.db.iter_query(query, params):
+            yield make(*row)
+    
+    # ========== CACHE D'ENTITÉS ==========
+    
+    def _written(self, keys):
+        """Clés primaires écrites, par table, pour le cache d'entités"""
+        return {self.TABLE.upper(): list(keys)}
+    
+    def _entity_cache(self):
+        """Cache d'entités de la base s'il suit la table (jamais dans une
+        transaction : les lignes lues ou écrites ne sont pas encore validées)"""
+        cache = self.db.entities
+        if cache is None or not cache.tracks(self.TABLE) or self.db.in_transaction():
+            return None
+        return cache
+    
+    def _key_condition(self):
+        return " AND ".join(f"{column} = :{i}" for i, (_, column) in enumerate(self.KEY, 1))
+    
+    def _load_entity(self, key):
+        """Ligne complète de clé `key` (et son ORA_ROWSCN si revalidation)"""
+        select, fields = self._projection()
+        version = ", ORA_ROWSCN" if self.db.entities.verify_s else ""
+        rows = self.db.execute_query(f"SELECT {select}{version} FROM {self.TABLE} "
+                                     f"WHERE {self._key_condition()}", key)
+        if rows is None:
+            raise _ReadFailed()
+        if not rows:
+            return None
+        row = rows[0]
+        return record_type(self.TABLE, fields)(*row[:len(fields)]), row[len(fields)] if version else None
+    
+    def _entity_version(self, key):
+        """ORA_ROWSCN actuel de la ligne `key` (None si supprimée ou en erreur)"""
+        rows = self.db.execute_query(f"SELECT ORA_ROWSCN FROM {self.TABLE} WHERE {self._key_condition()}", key)
+        return rows[0][0] if rows else None
+    
+    def _read_key(self, key, columns=None):
+        """Lecture par clé primaire : [enregistrement], [] si introuvable,
+        None en cas d'erreur ; sans aller-retour si la ligne est en cache"""
+        select, fields = self._projection(columns)
+        cache = self._entity_cache()
+        if cache is None:
+            query = f"SELECT {select} FROM {self.TABLE} WHERE {self._key_condition()}"
+            return self._records(self.db.execute_query(query, key), fields)
+        try:
+            entity = cache.get(self.TABLE, key, self._load_entity, self._entity_version)
+        except _ReadFailed:
+            return None
+        if entity is None:
+            return []
+        if fields != entity._fields:
+            entity = record_type(self.TABLE, fields)(*(getattr(entity, field) for field in fields))
+        return [entity]
+    
+    # ========== UPDATE À TEXTE STABLE ==========
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _update_statement(cls, returning=False):
+        """UPDATE canonique de la table : toutes les colonnes de UPDATABLE,
+        chacune gardée par un drapeau `:s_<param>` (1 = modifier)
+        
+        Un seul texte SQL quels que soient les champs fournis : une analyse
+        et une entrée du cache d'instructions par table, au lieu d'une par
+        combinaison de colonnes. Les colonnes non modifiées sont réaffectées
+        à elles-mêmes (les triggers comparent OLD et NEW). `returning` :
+        nouvelle image de toutes les colonnes dans les binds `:r_<param>`.
+        """
+        sets = ", ".join(f"{column} = CASE WHEN :s_{param} = 1 THEN :{param} ELSE {column} END"
+                         for param, column in cls.UPDATABLE.items())
+        where = " AND ".join(f"{column} = :k_{param}" for param, column in cls.KEY)
+        query = f"UPDATE {cls.TABLE} SET {sets} WHERE {where}"
+        if returning:
+            columns = cls.KEY + cls.FIELDS + cls.OTHER
+            query += (f" RETURNING {', '.join(column for _, column in columns)}"
+                      f" INTO {', '.join(f':r_{param}' for param, _ in columns)}")
+        return query
+    
+    def _update_binds(self, key, changes):
+        """Binds de l'UPDATE canonique : drapeau et valeur de chaque colonne
+        modifiable (None si inchangée), puis la clé"""
+        binds = {}
+        for param in self.UPDATABLE:
+            binds[f"s_{param}"] = 1 if param in changes else 0
+            binds[param] = self.stored(param, changes.get(param))
+        binds.update((f"k_{param}", value) for (param, _), value in zip(self.KEY, key))
+        return binds
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _update_inputsizes(cls):
+        """Types des valeurs non textuelles : un None lié en VARCHAR2 ferait
+        échouer le CASE (types incompatibles) et créerait un autre curseur"""
+        types = ((param, COLUMN_TYPES.get((cls.TABLE, column), str)) for param, column in cls.UPDATABLE.items())
+        return {param: type_ for param, type_ in types if type_ is not str}
+    
+    # ========== FORMAT DES VALEURS ==========
+    
+    def loaded(self, param, value):
+        """Valeur `param` au format des lectures et des écritures des CRUD :
+        prix en centimes si ORACLE_PRICE_MODE=cents (saisie en euros -> CRUD)"""
+        handler = self.db.type_handler
+        column = dict(self.KEY + self.FIELDS + self.OTHER).get(param)
+        return value if handler is None or column is None else handler.to_python(column, value)
+    
+    def stored(self, param, value):
+        """Inverse de `loaded` : valeur telle que stockée en base, pour un bind
+        ou un affichage (prix en euros)"""
+        handler = self.db.type_handler
+        column = dict(self.KEY + self.FIELDS + self.OTHER).get(param)
+        return value if handler is None or column is None else handler.to_database(column, value)
+    
+    # ========== VÉRIFICATION ET ACTION EN UN ALLER-RETOUR ==========
+    
+    def _returned(self, values, columns):
+        """Valeurs des binds `:r_<param>` de `columns` ((param, colonne)),
+        converties comme une lecture (prix en centimes si ORACLE_PRICE_MODE=cents)"""
+        handler = self.db.type_handler
+        return {param: values[f"r_{param}"] if handler is None else handler.to_python(column, values[f"r_{param}"])
+                for param, column in columns}
+    
+    def _update_returning(self, key, changes):
+        """UPDATE de la ligne `key` (valeurs de KEY) avec RETURNING INTO de
+        toutes ses colonnes : la nouvelle image de la ligne sans relecture
+        
+        Renvoie (statut, enregistrement) : (OK, ligne modifiée), (NOT_FOUND,
+        None) ou (FAILED, None).
+        """
+        columns = self.KEY + self.FIELDS + self.OTHER
+        returning = {f"r_{param}": COLUMN_TYPES.get((self.TABLE, column), str) for param, column in columns}
+        result = self.db.execute_returning(self._update_statement(returning=True),
+                                           self._update_binds(key, changes), returning,
+                                           inputsizes=self._update_inputsizes(), keys=self._written([key]))
+        if result is None:
+            return FAILED, None
+        rows, values = result
+        if not rows:
+            return NOT_FOUND, None
+        fields = tuple(param for param, _ in columns)
+        record = record_type(self.TABLE, fields)(*self._returned(values, columns).values())
+        cache = self._entity_cache()
+        if cache is not None:
+            # Écriture directe : la nouvelle image remplace l'entrée évincée
+            cache.put(self.TABLE, tuple(key), record)
+        return OK, record
+    
+    def _delete_unreferenced(self, value, labels):
+        """DELETE de la ligne de clé `value` si aucune location ne la référence
+        
+        Bloc PL/SQL : DELETE gardé par NOT EXISTS, puis, s'il n'a rien
+        supprimé, comptage des locations pour expliquer le refus. Un
+        aller-retour, sans fenêtre entre la vérification et la suppression.
+        Renvoie (locations, {paramètre: valeur des colonnes `labels`}) :
+        0 si supprimée, -1 si introuvable, le nombre de locations sinon ;
+        None en cas d'erreur.
+        """
+        (_, column), = self.KEY
+        known = dict(self.KEY + self.FIELDS + self.OTHER)
+        block = f"""
+            DECLARE
+                n NUMBER;
+            BEGIN
+                DELETE FROM {self.TABLE} t
+                 WHERE t.{column} = :code
+                   AND NOT EXISTS (SELECT 1 FROM Location l WHERE l.{column} = t.{column})
+                RETURNING {', '.join(known[label] for label in labels)}
+                     INTO {', '.join(f':r_{label}' for label in labels)};
+                IF SQL%ROWCOUNT = 1 THEN
+                    :locations := 0;
+                ELSE
+                    SELECT COUNT(*) INTO n FROM Location WHERE {column} = :code;
+                    :locations := CASE WHEN n > 0 THEN n ELSE -1 END;
+                END IF;
+            END;
+        """
+        returning = {f"r_{label}": COLUMN_TYPES.get((self.TABLE, known[label]), str) for label in labels}
+        result = self.db.execute_returning(block, {'code': value}, {**returning, 'locations': int},
+                                           tables=written_tables(f"DELETE FROM {self.TABLE}"),
+                                           keys=self._written([(value,)]))
+        if result is None:
+            return None
+        _, values = result
+        return values['locations'], self._returned(values, [(label, known[label]) for label in labels])
+    
+    # ========== PAGINATION PAR CLÉ (keyset) ==========
+    
+    def _seek(self, values, alias=''):
+        """Condition « après la ligne `values` » dans l'ordre ORDER
+        
+        Tri ascendant, NULL en dernier (défaut Oracle) : les colonnes hors clé
+        primaire peuvent être NULL. Renvoie (condition, binds nommés).
+        """
+        keys = {column for _, column in self.KEY}
+        terms, equal, params = [], [], {}
+        for i, (column, value) in enumerate(zip(self.ORDER, values)):
+            name = f"{alias}{column}"
+            if value is None:
+                equal.append(f"{name} IS NULL")
+                continue
+            params[f"s{i}"] = value
+            after = f"{name} > :s{i}" if column in keys else f"({name} > :s{i} OR {name} IS NULL)"
+            terms.append(" AND ".join(equal + [after]))
+            equal.append(f"{name} = :s{i}")
+        return "(" + " OR ".join(f"({term})" for term in terms) + ")", params
+    
+    def _page(self, source, cursor, size, filters, columns=None, alias='', extra=()):
+        """Page de `source` (FROM ...) après `cursor` : colonnes `columns` de la
+        table (plus celles de ORDER) suivies des expressions `extra` [(champ, expression)]"""
+        size = size or FETCH_CONFIG['page_size']
+        params_of = {column: param for param, column in self.KEY + self.FIELDS + self.OTHER}
+        order_fields = [params_of[column] for column in self.ORDER]
+        select, fields = self._projection(columns, alias, required=order_fields)
+        if extra:
+            select += ", " + ", ".join(expression for _, expression in extra)
+        conditions, params = [], {}
+        for param, value in filters.items():
+            if param not in self.FILTERS:
+                raise ValueError(f"Filtre inconnu: {param} ({', '.join(self.FILTERS) or 'aucun'})")
+            if value is not None:
+                conditions.append(f"{alias}{self.FILTERS[param]} = :f_{param}")
+                params[f"f_{param}"] = value
+        if cursor:
+            seek, seek_params = self._seek(_decode_cursor(cursor, self.TABLE, len(self.ORDER)), alias)
+            conditions.append(seek)
+            params.update(seek_params)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = ", ".join(f"{alias}{column}" for column in self.ORDER)
+        # Une ligne de plus que la page : sait-on s'il y a une suite ?
+        params['n'] = size + 1
+        rows = self.db.execute_query(
+            f"SELECT {select} {source}{where} ORDER BY {order} FETCH FIRST :n ROWS ONLY", params) or []
+        records = self._records(rows[:size], fields + tuple(field for field, _ in extra))
+        if len(rows) <= size:
+            return records, None
+        last = records[-1]
+        return records, _encode_cursor(self.TABLE, [getattr(last, field) for field in order_fields])
+    
+    def page(self, cursor=None, size=None, columns=None, **filters):
+        """Lire une page : (enregistrements, curseur de la page suivante ou None)
+        
+        Pagination par clé : la page suivante reprend après la dernière ligne
+        (WHERE sur ORDER) au lieu de sauter les précédentes (OFFSET), la page N
+        coûte autant que la première. Le curseur est opaque. `columns` limite
+        les colonnes lues (celles de ORDER sont toujours ajoutées).
+        """
+        return self._page(f"FROM {self.TABLE}", cursor, size, filters, columns)
+    
+    # ========== OPÉRATIONS EN MASSE (array DML) ==========
+    
+    @staticmethod
+    def _values(record, fields):
+        """Valeurs d'un enregistrement (dict par nom de paramètre, ou tuple
+        dans l'ordre de `fields`) ; les champs absents valent None"""
+        if isinstance(record, dict):
+            return [record.get(param) for param, _ in fields]
+        values = list(record) if isinstance(record, (tuple, list)) else [record]
+        if len(values) > len(fields):
+            raise ValueError(f"{len(values)} valeurs pour {len(fields)} champs")
+        return values + [None] * (len(fields) - len(values))
+    
+    def _run_many(self, query, rows, indices, result, chunk_size, check_found=False, inputsizes=None,
+                  keys=()):
+        """executemany par paquets (COMMIT par paquet hors transaction) et
+        report des erreurs / lignes non trouvées sur les enregistrements ;
+        `keys` : clés primaires écrites (cache d'entités)"""
+        if not rows:
+            return
+        chunk_size = chunk_size or BATCH_CONFIG['chunk_size']
+        report = self.db.execute_batch(query, rows, chunk_size=chunk_size, policy='partial',
+                                       row_counts=check_found, inputsizes=inputsizes,
+                                       keys=self._written(keys))
+        result.chunks += report.chunks
+        failed = dict(report.errors)
+        # Erreur hors batcherrors (connexion...) : les paquets suivants n'ont pas été appliqués
+        executed = min(len(rows), report.chunks * chunk_size)
+        for position, index in enumerate(indices):
+            if position >= executed:
+                result.fail(index, "paquet non appliqué")
+            elif position in failed:
+                result.fail(index, failed[position])
+            elif check_found and report.row_counts is not None and position < len(report.row_counts) \
+                    and not report.row_counts[position]:
+                result.outcomes[index] = (NOT_FOUND, None)
+    
+    def create_many(self, records, chunk_size=None) -> BulkResult:
+        """Insérer des enregistrements en lot (dicts ou tuples comme create())
+        
+        Un aller-retour et un COMMIT par paquet de `chunk_size` lignes ; les
+        lignes refusées par Oracle n'empêchent pas les autres.
+        """
+        records = list(records)
+        result = BulkResult(len(records))
+        start = time.perf_counter()
+        rows, indices = [], []
+        for index, record in enumerate(records):
+            try:
+                values = self._values(record, self.KEY + self.FIELDS)
+            except ValueError as e:
+                result.fail(index, str(e))
+                continue
+            if any(value is None for value in values[:len(self.KEY)]):
+                result.fail(index, "clé incomplète")
+                continue
+            rows.append(tuple(values))
+            indices.append(index)
+        columns = [column for _, column in self.KEY + self.FIELDS]
+        query = (f"INSERT INTO {self.TABLE} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(f':{i}' for i in range(1, len(columns) + 1))})")
+        self._run_many(query, rows, indices, result, chunk_size,
+                       keys=[row[:len(self.KEY)] for row in rows])
+        result.elapsed = time.perf_counter() - start
+        return result
+    
+    def update_many(self, records, chunk_size=None) -> BulkResult:
+        """Mettre à jour des enregistrements en lot
+        
+        Chaque enregistrement est un dict : la clé (paramètres de KEY) et les
+        champs à modifier (comme update(), les None sont ignorés). Tous
+        partagent l'UPDATE canonique : un executemany quel que soit le
+        mélange de colonnes modifiées.
+        """
+        records = list(records)
+        result = BulkResult(len(records))
+        start = time.perf_counter()
+        rows, indices = [], []
+        for index, record in enumerate(records):
+            key = [record.get(param) for param, _ in self.KEY] if isinstance(record, dict) else [None]
+            if any(value is None for value in key):
+                result.fail(index, "clé incomplète")
+                continue
+            changes = {param: record[param] for param in self.UPDATABLE if record.get(param) is not None}
+            if not changes:
+                result.fail(index, "aucune modification")
+                continue
+            rows.append(self._update_binds(key, changes))
+            indices.append(index)
+        self._run_many(self._update_statement(), rows, indices, result, chunk_size,
+                       check_found=True, inputsizes=self._update_inputsizes(),
+                       keys=[tuple(row[f"k_{param}"] for param, _ in self.KEY) for row in rows])
+        result.elapsed = time.perf_counter() - start
+        return result
+    
+    def delete_many(self, keys, chunk_size=None) -> BulkResult:
+        """Supprimer en lot par clé primaire (valeur, tuple ou dict par enregistrement)
+        
+        Une ligne encore référencée (ex: client avec des locations) est
+        refusée par la clé étrangère et marquée en erreur.
+        """
+        keys = list(keys)
+        result = BulkResult(len(keys))
+        start = time.perf_counter()
+        rows, indices = [], []
+        for index, key in enumerate(keys):
+            try:
+                values = self._values(key, self.KEY)
+            except ValueError as e:
+                result.fail(index, str(e))
+                continue
+            if any(value is None for value in values):
+                result.fail(index, "clé incomplète")
+                continue
+            rows.append(tuple(values))
+            indices.append(index)
+        where = " AND ".join(f"{column} = :{i}" for i, (_, column) in enumerate(self.KEY, 1))
+        self._run_many(f"DELETE FROM {self.TABLE} WHERE {where}", rows, indices, result,
+                       chunk_size, check_found=True, keys=rows)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+class CRUDClient(CRUDBase):
+    """Opérations CRUD pour les clients"""
+    
+    TABLE = 'Client'
+    KEY = (('codec', 'CodeC'),)
+    FIELDS = (('nom', 'Nom'), ('prenom', 'Prenom'), ('age', 'Age'), ('permis', 'Permis'),
+              ('adresse', 'Adresse'), ('ville', 'Ville'))
+    UPDATABLE = dict(FIELDS)
+    # idx_client_nom (Nom, Prenom), départagé par la clé
+    ORDER = ('Nom', 'Prenom', 'CodeC')
+    
     def create(self, codec: str, nom: str, prenom: str, age: int, 
                permis: str, adresse: str, ville: str) -> bool:
         """Créer un nouveau client"""
@@ -22,119 +544,108 @@ class CRUDClient:
             VALUES (:1, :2, :3, :4, :5, :6, :7)
         """
         try:
-            self.db.execute_update(query, (codec, nom, prenom, age, permis, adresse, ville))
+            self.db.execute_update(query, (codec, nom, prenom, age, permis, adresse, ville),
+                                   keys=self._written([(codec,)]))
             print(f"✅ Client {nom} {prenom} créé avec succès (Code: {codec})")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la création: {e}")
             return False
     
-    def read(self, codec: str = None) -> list:
-        """Lire un ou tous les clients"""
+    def read(self, codec: str = None, columns=None) -> list:
+        """Lire un ou tous les clients (`columns`: paramètres des colonnes à lire)
+        
+        Par clé, la ligne vient du cache d'entités quand elle y est.
+        """
+        select, fields = self._projection(columns)
         if codec:
-            query = "SELECT * FROM Client WHERE CodeC = :1"
-            return self.db.execute_query(query, (codec,))
+            return self._read_key((codec,), columns)
         else:
-            query = "SELECT * FROM Client ORDER BY Nom, Prenom"
-            return self.db.execute_query(query)
-    
-    def update(self, codec: str, **kwargs) -> bool:
-        """Mettre à jour un client (kwargs: nom, prenom, age, permis, adresse, ville)"""
-        # Construire la requête dynamiquement
-        updates = []
-        values = []
-        
-        mapping = {
-            'nom': 'Nom',
-            'prenom': 'Prenom',
-            'age': 'Age',
-            'permis': 'Permis',
-            'adresse': 'Adresse',
-            'ville': 'Ville'
-        }
-        
-        for key, value in kwargs.items():
-            if key in mapping and value is not None:
-                updates.append(f"{mapping[key]} = :{len(values) + 1}")
-                values.append(value)
-        
-        if not updates:
-            print("❌ Aucune modification à effectuer")
-            return False
+            query = f"SELECT {select} FROM Client ORDER BY Nom, Prenom"
+            return self._records(self.db.execute_query(query), fields)
+    
+    def stream(self, columns=None):
+        """Parcourir tous les clients en flux (mémoire bornée)"""
+        select, fields = self._projection(columns)
+        return self._stream_records(f"SELECT {select} FROM Client ORDER BY Nom, Prenom", None, fields)
+    
+    def update(self, codec: str, **kwargs):
+        """Mettre à jour un client (kwargs: nom, prenom, age, permis, adresse, ville)
         
-        values.append(codec)
-        query = f"UPDATE Client SET {', '.join(updates)} WHERE CodeC = :{len(values)}"
+        Un aller-retour (UPDATE ... RETURNING) ; renvoie le client modifié,
+        None s'il est introuvable ou en cas d'erreur.
+        """
+        changes = {key: value for key, value in kwargs.items() if key in self.UPDATABLE and value is not None}
+        if not changes:
+            print("❌ Aucune modification à effectuer")
+            return None
         
-        try:
-            rows = self.db.execute_update(query, tuple(values))
-            if rows > 0:
-                print(f"✅ Client {codec} mis à jour ({rows} ligne(s))")
-                return True
-            else:
-                print(f"⚠️  Client {codec} non trouvé")
-                return False
-        except Exception as e:
-            print(f"❌ Erreur lors de la mise à jour: {e}")
-            return False
+        status, client = self._update_returning((codec,), changes)
+        if status == OK:
+            print(f"✅ Client {codec} mis à jour")
+        elif status == NOT_FOUND:
+            print(f"⚠️  Client {codec} non trouvé")
+        else:
+            print("❌ Erreur lors de la mise à jour")
+        return client
     
     def delete(self, codec: str) -> bool:
-        """Supprimer un client"""
-        # Vérifier d'abord s'il a des locations
-        check_query = "SELECT COUNT(*) FROM Location WHERE CodeC = :1"
-        result = self.db.execute_query(check_query, (codec,))
-        nb_locations = result[0][0] if result else 0
-        
-        if nb_locations > 0:
-            print(f"⚠️  Impossible de supprimer: {nb_locations} location(s) associée(s)")
+        """Supprimer un client sans location (vérification et suppression en un aller-retour)"""
+        result = self._delete_unreferenced(codec, ('nom', 'prenom'))
+        if result is None:
+            print("❌ Erreur lors de la suppression")
+            return False
+        locations, client = result
+        if locations > 0:
+            print(f"⚠️  Impossible de supprimer: {locations} location(s) associée(s)")
             print("   Supprimez d'abord les locations ou utilisez CASCADE")
             return False
-        
-        query = "DELETE FROM Client WHERE CodeC = :1"
-        try:
-            rows = self.db.execute_update(query, (codec,))
-            if rows > 0:
-                print(f"✅ Client {codec} supprimé")
-                return True
-            else:
-                print(f"⚠️  Client {codec} non trouvé")
-                return False
-        except Exception as e:
-            print(f"❌ Erreur lors de la suppression: {e}")
+        if locations < 0:
+            print(f"⚠️  Client {codec} non trouvé")
             return False
+        print(f"✅ Client {client['nom']} {client['prenom']} ({codec}) supprimé")
+        return True
     
-    def list_all(self):
-        """Afficher tous les clients de manière formatée"""
-        clients = self.read()
+    def list_all(self, cursor=None, size=None):
+        """Afficher une page de clients ; renvoie le curseur de la page suivante (None à la fin)"""
+        clients, suivant = self.page(cursor, size, columns=('codec', 'nom', 'prenom', 'age', 'ville'))
         if not clients:
             print("Aucun client trouvé")
-            return
+            return None
         
         print(f"\n{'='*100}")
         print(f"{'Code':<10} {'Nom':<20} {'Prénom':<20} {'Âge':<5} {'Ville':<20}")
         print(f"{'='*100}")
-        
         for client in clients:
-            codec, nom, prenom, age, permis, adresse, ville = client
-            nom_str = nom if nom else ""
-            prenom_str = prenom if prenom else ""
-            age_str = str(age) if age is not None else "N/A"
-            ville_str = ville if ville else "N/A"
-            print(f"{codec:<10} {nom_str:<20} {prenom_str:<20} {age_str:<5} {ville_str:<20}")
+            nom_str = client.nom if client.nom else ""
+            prenom_str = client.prenom if client.prenom else ""
+            age_str = str(client.age) if client.age is not None else "N/A"
+            ville_str = client.ville if client.ville else "N/A"
+            print(f"{client.codec:<10} {nom_str:<20} {prenom_str:<20} {age_str:<5} {ville_str:<20}")
         
         print(f"{'='*100}")
-        print(f"Total: {len(clients)} client(s)")
+        print(f"Page: {len(clients)} client(s)" + (" (suite disponible)" if suivant else ""))
+        return suivant
 
 
-class CRUDVoiture:
+class CRUDVoiture(CRUDBase):
     """Opérations CRUD pour les voitures"""
     
-    def __init__(self, db: Database):
-        self.db = db
+    TABLE = 'Voiture'
+    KEY = (('immat', 'Immat'),)
+    FIELDS = (('modele', 'Modele'), ('marque', 'Marque'), ('categorie', 'Categorie'),
+              ('couleur', 'Couleur'), ('places', 'Places'), ('achat_annee', 'achatA'),
+              ('compteur', 'compteur'), ('prix_jour', 'prixJ'), ('code_proprio', 'codeP'))
+    OTHER = (('etat', 'etat'),)
+    UPDATABLE = {**dict(FIELDS), **dict(OTHER)}
+    # idx_voiture_marque (Marque), départagé par la clé
+    ORDER = ('Marque', 'Modele', 'Immat')
+    FILTERS = {'etat': 'etat'}
     
     def create(self, immat: str, modele: str, marque: str, categorie: str,
                couleur: str, places: int, achat_annee: int, compteur: int,
                prix_jour: float, code_proprio: str) -> bool:
-        """Créer une nouvelle voiture"""
+        """Créer une nouvelle voiture (`prix_jour` au format des lectures, voir `loaded`)"""
         query = """
             INSERT INTO Voiture (Immat, Modele, Marque, Categorie, Couleur,
                                Places, achatA, compteur, prixJ, codeP)
@@ -142,117 +653,113 @@ class CRUDVoiture:
         """
         try:
             self.db.execute_update(query, (immat, modele, marque, categorie, couleur,
-                                          places, achat_annee, compteur, prix_jour, code_proprio))
+                                          places, achat_annee, compteur,
+                                          self.stored('prix_jour', prix_jour), code_proprio),
+                                   keys=self._written([(immat,)]))
             print(f"✅ Voiture {marque} {modele} créée (Immat: {immat})")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la création: {e}")
             return False
     
-    def read(self, immat: str = None) -> list:
-        """Lire une ou toutes les voitures"""
+    def read(self, immat: str = None, columns=None) -> list:
+        """Lire une ou toutes les voitures (`columns`: paramètres des colonnes à lire)
+        
+        Par clé, la ligne vient du cache d'entités quand elle y est.
+        """
+        select, fields = self._projection(columns)
         if immat:
-            query = "SELECT * FROM Voiture WHERE Immat = :1"
-            return self.db.execute_query(query, (immat,))
+            return self._read_key((immat,), columns)
         else:
-            query = "SELECT * FROM Voiture ORDER BY Marque, Modele"
-            return self.db.execute_query(query)
-    
-    def update(self, immat: str, **kwargs) -> bool:
-        """Mettre à jour une voiture"""
-        updates = []
-        values = []
-        
-        mapping = {
-            'modele': 'Modele',
-            'marque': 'Marque',
-            'categorie': 'Categorie',
-            'couleur': 'Couleur',
-            'places': 'Places',
-            'achat_annee': 'achatA',
-            'compteur': 'compteur',
-            'prix_jour': 'prixJ',
-            'code_proprio': 'codeP',
-            'etat': 'etat'
-        }
-        
-        for key, value in kwargs.items():
-            if key in mapping and value is not None:
-                updates.append(f"{mapping[key]} = :{len(values) + 1}")
-                values.append(value)
-        
-        if not updates:
-            print("❌ Aucune modification à effectuer")
-            return False
+            query = f"SELECT {select} FROM Voiture ORDER BY Marque, Modele"
+            return self._records(self.db.execute_query(query), fields)
+    
+    def stream(self, disponibles_only: bool = False, columns=None):
+        """Parcourir les voitures en flux (mémoire bornée)"""
+        select, fields = self._projection(columns)
+        if disponibles_only:
+            query = f"SELECT {select} FROM Voiture WHERE etat = 'disponible' ORDER BY Marque, Modele"
+        else:
+            query = f"SELECT {select} FROM Voiture ORDER BY Marque, Modele"
+        return self._stream_records(query, None, fields)
+    
+    def update(self, immat: str, **kwargs):
+        """Mettre à jour une voiture
         
-        values.append(immat)
-        query = f"UPDATE Voiture SET {', '.join(updates)} WHERE Immat = :{len(values)}"
+        Un aller-retour (UPDATE ... RETURNING) ; renvoie la voiture modifiée,
+        None si elle est introuvable ou en cas d'erreur.
+        """
+        changes = {key: value for key, value in kwargs.items() if key in self.UPDATABLE and value is not None}
+        if not changes:
+            print("❌ Aucune modification à effectuer")
+            return None
         
-        try:
-            rows = self.db.execute_update(query, tuple(values))
-            if rows > 0:
-                print(f"✅ Voiture {immat} mise à jour ({rows} ligne(s))")
-                return True
-            else:
-                print(f"⚠️  Voiture {immat} non trouvée")
-                return False
-        except Exception as e:
-            print(f"❌ Erreur lors de la mise à jour: {e}")
-            return False
+        status, voiture = self._update_returning((immat,), changes)
+        if status == OK:
+            print(f"✅ Voiture {immat} mise à jour")
+        elif status == NOT_FOUND:
+            print(f"⚠️  Voiture {immat} non trouvée")
+        else:
+            print("❌ Erreur lors de la mise à jour")
+        return voiture
     
     def delete(self, immat: str) -> bool:
-        """Supprimer une voiture"""
-        # Vérifier les locations
-        check_query = "SELECT COUNT(*) FROM Location WHERE Immat = :1"
-        result = self.db.execute_query(check_query, (immat,))
-        nb_locations = result[0][0] if result else 0
-        
-        if nb_locations > 0:
-            print(f"⚠️  Impossible de supprimer: {nb_locations} location(s) associée(s)")
+        """Supprimer une voiture sans location (vérification et suppression en un aller-retour)"""
+        result = self._delete_unreferenced(immat, ('marque', 'modele'))
+        if result is None:
+            print("❌ Erreur lors de la suppression")
             return False
-        
-        query = "DELETE FROM Voiture WHERE Immat = :1"
-        try:
-            rows = self.db.execute_update(query, (immat,))
-            if rows > 0:
-                print(f"✅ Voiture {immat} supprimée")
-                return True
-            else:
-                print(f"⚠️  Voiture {immat} non trouvée")
-                return False
-        except Exception as e:
-            print(f"❌ Erreur lors de la suppression: {e}")
+        locations, voiture = result
+        if locations > 0:
+            print(f"⚠️  Impossible de supprimer: {locations} location(s) associée(s)")
+            return False
+        if locations < 0:
+            print(f"⚠️  Voiture {immat} non trouvée")
             return False
+        print(f"✅ Voiture {voiture['marque']} {voiture['modele']} ({immat}) supprimée")
+        return True
     
-    def list_all(self, disponibles_only=False):
-        """Afficher toutes les voitures"""
-        if disponibles_only:
-            query = "SELECT * FROM Voiture WHERE etat = 'disponible' ORDER BY Marque, Modele"
-            voitures = self.db.execute_query(query)
-        else:
-            voitures = self.read()
-        
+    def list_all(self, disponibles_only=False, cursor=None, size=None):
+        """Afficher une page de voitures ; renvoie le curseur de la page suivante (None à la fin)"""
+        voitures, suivant = self.page(cursor, size,
+                                      columns=('immat', 'marque', 'modele', 'categorie', 'prix_jour', 'compteur', 'etat'),
+                                      etat='disponible' if disponibles_only else None)
         if not voitures:
             print("Aucune voiture trouvée")
-            return
+            return None
         
         print(f"\n{'='*120}")
         print(f"{'Immat':<12} {'Marque':<15} {'Modèle':<15} {'Catégorie':<12} {'Prix/J':<8} {'KM':<10} {'État':<15}")
         print(f"{'='*120}")
-        
         for v in voitures:
-            immat, modele, marque, categorie, couleur, places, achat, compteur, prix, codep, etat = v
-            print(f"{immat:<12} {marque:<15} {modele:<15} {categorie:<12} {prix:>6.2f}€ {compteur:>9,} {etat or 'N/A':<15}")
+            print(f"{v.immat:<12} {v.marque:<15} {v.modele:<15} {v.categorie:<12} "
+                  f"{self.stored('prix_jour', v.prix_jour):>6.2f}€ "
+                  f"{v.compteur:>9,} {v.etat or 'N/A':<15}")
         
         print(f"{'='*120}")
-        print(f"Total: {len(voitures)} voiture(s)")
+        print(f"Page: {len(voitures)} voiture(s)" + (" (suite disponible)" if suivant else ""))
+        return suivant
 
 
-class CRUDLocation:
+class CRUDLocation(CRUDBase):
     """Opérations CRUD pour les locations"""
     
-    def __init__(self, db: Database):
-        self.db = db
+    TABLE = 'Location'
+    KEY = (('codec', 'CodeC'), ('immat', 'Immat'), ('annee', 'Annee'), ('mois', 'Mois'),
+           ('numloc', 'numLoc'))
+    FIELDS = (('km', 'km'), ('duree', 'duree'), ('villed', 'villed'), ('villea', 'villea'),
+              ('dated', 'dated'), ('datef', 'datef'))
+    OTHER = (('note', 'note'), ('avis', 'avis'))
+    UPDATABLE = {**dict(FIELDS), **dict(OTHER)}
+    # Ordre de pk_location
+    ORDER = ('CodeC', 'Immat', 'Annee', 'Mois', 'numLoc')
+    FILTERS = {'codec': 'CodeC', 'immat': 'Immat'}
+    
+    def _written(self, keys):
+        """Les triggers modifient la voiture louée (état, compteur) : seule
+        son entrée est évincée du cache d'entités"""
+        keys = list(keys)
+        return {'LOCATION': keys, 'VOITURE': [(key[1],) for key in keys]}
     
     def create(self, codec: str, immat: str, annee: int, mois: int, numloc: str,
                km: int, duree: int, villed: str, villea: str, 
@@ -265,74 +772,67 @@ class CRUDLocation:
         """
         try:
             self.db.execute_update(query, (codec, immat, annee, mois, numloc, km, duree,
-                                          villed, villea, dated, datef))
+                                          villed, villea, dated, datef),
+                                   keys=self._written([(codec, immat, annee, mois, numloc)]))
             print(f"✅ Location créée: Client {codec}, Voiture {immat}")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la création: {e}")
             return False
     
-    def read(self, codec: str = None, immat: str = None) -> list:
-        """Lire les locations d'un client ou d'une voiture"""
+    def read(self, codec: str = None, immat: str = None, columns=None) -> list:
+        """Lire les locations d'un client ou d'une voiture (`columns`: paramètres des colonnes à lire)"""
+        select, fields = self._projection(columns)
         if codec:
-            query = "SELECT * FROM Location WHERE CodeC = :1 ORDER BY Annee DESC, Mois DESC"
-            return self.db.execute_query(query, (codec,))
+            query = f"SELECT {select} FROM Location WHERE CodeC = :1 ORDER BY Annee DESC, Mois DESC"
+            return self._records(self.db.execute_query(query, (codec,)), fields)
         elif immat:
-            query = "SELECT * FROM Location WHERE Immat = :1 ORDER BY Annee DESC, Mois DESC"
-            return self.db.execute_query(query, (immat,))
+            query = f"SELECT {select} FROM Location WHERE Immat = :1 ORDER BY Annee DESC, Mois DESC"
+            return self._records(self.db.execute_query(query, (immat,)), fields)
         else:
-            query = "SELECT * FROM Location ORDER BY Annee DESC, Mois DESC"
-            return self.db.execute_query(query)
-    
-    def update(self, codec: str, immat: str, annee: int, mois: int, numloc: str, **kwargs) -> bool:
-        """Mettre à jour une location"""
-        updates = []
-        values = []
-        
-        mapping = {
-            'km': 'km',
-            'duree': 'duree',
-            'villed': 'villed',
-            'villea': 'villea',
-            'dated': 'dated',
-            'datef': 'datef',
-            'note': 'note',
-            'avis': 'avis'
-        }
-        
-        for key, value in kwargs.items():
-            if key in mapping and value is not None:
-                updates.append(f"{mapping[key]} = :{len(values) + 1}")
-                values.append(value)
-        
-        if not updates:
-            print("❌ Aucune modification à effectuer")
-            return False
+            query = f"SELECT {select} FROM Location ORDER BY Annee DESC, Mois DESC"
+            return self._records(self.db.execute_query(query), fields)
+    
+    def stream(self, codec: str = None, immat: str = None, columns=None):
+        """Parcourir les locations en flux (mémoire bornée, même filtre que read)"""
+        select, fields = self._projection(columns)
+        if codec:
+            query = f"SELECT {select} FROM Location WHERE CodeC = :1 ORDER BY Annee DESC, Mois DESC"
+            return self._stream_records(query, (codec,), fields)
+        elif immat:
+            query = f"SELECT {select} FROM Location WHERE Immat = :1 ORDER BY Annee DESC, Mois DESC"
+            return self._stream_records(query, (immat,), fields)
+        else:
+            query = f"SELECT {select} FROM Location ORDER BY Annee DESC, Mois DESC"
+            return self._stream_records(query, None, fields)
+    
+    def update(self, codec: str, immat: str, annee: int, mois: int, numloc: str, **kwargs):
+        """Mettre à jour une location
         
-        values.extend([codec, immat, annee, mois, numloc])
-        query = f"""UPDATE Location SET {', '.join(updates)} 
-                   WHERE CodeC = :{len(values)-4} AND Immat = :{len(values)-3} 
-                   AND Annee = :{len(values)-2} AND Mois = :{len(values)-1} 
-                   AND numLoc = :{len(values)}"""
+        Un aller-retour (UPDATE ... RETURNING) ; renvoie la location modifiée,
+        None si elle est introuvable ou en cas d'erreur.
+        """
+        changes = {key: value for key, value in kwargs.items() if key in self.UPDATABLE and value is not None}
+        if not changes:
+            print("❌ Aucune modification à effectuer")
+            return None
         
-        try:
-            rows = self.db.execute_update(query, tuple(values))
-            if rows > 0:
-                print(f"✅ Location mise à jour ({rows} ligne(s))")
-                return True
-            else:
-                print(f"⚠️  Location non trouvée")
-                return False
-        except Exception as e:
-            print(f"❌ Erreur lors de la mise à jour: {e}")
-            return False
+        status, location = self._update_returning((codec, immat, annee, mois, numloc), changes)
+        if status == OK:
+            print(f"✅ Location mise à jour")
+        elif status == NOT_FOUND:
+            print(f"⚠️  Location non trouvée")
+        else:
+            print("❌ Erreur lors de la mise à jour")
+        return location
     
     def delete(self, codec: str, immat: str, annee: int, mois: int, numloc: str) -> bool:
         """Supprimer une location"""
         query = """DELETE FROM Location 
                    WHERE CodeC = :1 AND Immat = :2 AND Annee = :3 AND Mois = :4 AND numLoc = :5"""
         try:
-            rows = self.db.execute_update(query, (codec, immat, annee, mois, numloc))
+            rows = self.db.execute_update(query, (codec, immat, annee, mois, numloc),
+                                          keys=self._written([(codec, immat, annee, mois, numloc)]))
             if rows > 0:
                 print(f"✅ Location supprimée")
                 return True
@@ -343,45 +843,48 @@ class CRUDLocation:
             print(f"❌ Erreur lors de la suppression: {e}")
             return False
     
-    def list_all(self, limit: int = 50):
-        """Afficher les locations récentes"""
-        query = f"""
-            SELECT l.*, c.Nom, c.Prenom, v.Marque, v.Modele
+    def list_all(self, limit: int = 50, cursor=None):
+        """Afficher une page de `limit` locations (ordre de pk_location) ;
+        renvoie le curseur de la page suivante (None à la fin)"""
+        source = """
             FROM Location l
             JOIN Client c ON l.CodeC = c.CodeC
             JOIN Voiture v ON l.Immat = v.Immat
-            ORDER BY l.Annee DESC, l.Mois DESC
-            FETCH FIRST {limit} ROWS ONLY
         """
-        locations = self.db.execute_query(query)
-        
+        locations, suivant = self._page(
+            source, cursor, limit, {}, columns=('annee', 'mois', 'km', 'duree', 'note', 'avis'), alias='l.',
+            extra=(('nom', 'c.Nom'), ('prenom', 'c.Prenom'), ('marque', 'v.Marque'), ('modele', 'v.Modele')))
         if not locations:
             print("Aucune location trouvée")
-            return
+            return None
         
         print(f"\n{'='*130}")
         print(f"{'Client':<25} {'Voiture':<25} {'Période':<15} {'Durée':<8} {'KM':<8} {'Note':<6} {'Avis':<20}")
         print(f"{'='*130}")
-        
         for loc in locations:
-            codec, immat, annee, mois, numloc, km, duree, villed, villea, dated, datef, note, avis, nom, prenom, marque, modele = loc
-            client = f"{nom} {prenom}"
-            voiture = f"{marque} {modele}"
-            periode = f"{mois:02d}/{annee}"
-            note_str = f"{note}/5" if note else "N/A"
+            client = f"{loc.nom} {loc.prenom}"
+            voiture = f"{loc.marque} {loc.modele}"
+            periode = f"{loc.mois:02d}/{loc.annee}"
+            note_str = f"{loc.note}/5" if loc.note else "N/A"
+            avis = loc.avis
             avis_str = (avis[:17] + '...') if avis and len(avis) > 20 else (avis or 'N/A')
             
-            print(f"{client:<25} {voiture:<25} {periode:<15} {duree:>5} j {km:>7} {note_str:<6} {avis_str:<20}")
+            print(f"{client:<25} {voiture:<25} {periode:<15} {loc.duree:>5} j {loc.km:>7} {note_str:<6} {avis_str:<20}")
         
         print(f"{'='*130}")
-        print(f"Total: {len(locations)} location(s) affichée(s)")
+        print(f"Page: {len(locations)} location(s)" + (" (suite disponible)" if suivant else ""))
+        return suivant
 
 
-class CRUDProprietaire:
+class CRUDProprietaire(CRUDBase):
     """Opérations CRUD pour les propriétaires"""
     
-    def __init__(self, db: Database):
-        self.db = db
+    TABLE = 'Proprietaire'
+    KEY = (('codep', 'CodeP'),)
+    FIELDS = (('pseudo', 'pseudo'), ('email', 'email'), ('ville', 'Ville'),
+              ('annee_inscription', 'anneeI'))
+    UPDATABLE = dict(FIELDS)
+    ORDER = ('pseudo', 'CodeP')
     
     def create(self, codep: str, pseudo: str, email: str, ville: str, annee_inscription: int) -> bool:
         """Créer un nouveau propriétaire"""
@@ -390,21 +893,25 @@ class CRUDProprietaire:
             VALUES (:1, :2, :3, :4, :5)
         """
         try:
-            self.db.execute_update(query, (codep, pseudo, email, ville, annee_inscription))
+            self.db.execute_update(query, (codep, pseudo, email, ville, annee_inscription),
+                                   keys=self._written([(codep,)]))
             print(f"✅ Propriétaire {pseudo} créé (Code: {codep})")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la création: {e}")
             return False
     
-    def read(self, codep: str = None) -> list:
-        """Lire un ou tous les propriétaires"""
+    def read(self, codep: str = None, columns=None) -> list:
+        """Lire un ou tous les propriétaires (`columns`: paramètres des colonnes à lire)
+        
+        Par clé, la ligne vient du cache d'entités quand elle y est.
+        """
+        select, fields = self._projection(columns)
         if codep:
-            query = "SELECT * FROM Proprietaire WHERE CodeP = :1"
-            return self.db.execute_query(query, (codep,))
+            return self._read_key((codep,), columns)
         else:
-            query = "SELECT * FROM Proprietaire ORDER BY pseudo"
-            return self.db.execute_query(query)
+            query = f"SELECT {select} FROM Proprietaire ORDER BY pseudo"
+            return self._records(self.db.execute_query(query), fields)
     
     def list_with_stats(self):
         """Afficher les propriétaires avec leurs statistiques"""
@@ -505,12 +1012,12 @@ def demo_crud_operations():
             places=5,
             achat_annee=2024,
             compteur=5000,
-            prix_jour=89.99,
+            prix_jour=crud_voiture.loaded('prix_jour', 89.99),
             code_proprio="P12"
         )
         
         print("\n✏️  UPDATE: Modification du prix et de l'état")
-        crud_voiture.update("TEST123", prix_jour=79.99, etat="en maintenance")
+        crud_voiture.update("TEST123", prix_jour=crud_voiture.loaded('prix_jour', 79.99), etat="en maintenance")
         
         print("\n📖 READ: Voiture après modification")
         voiture = crud_voiture.read("TEST123")
@@ -527,7 +1034,7 @@ def demo_crud_operations():
         
         crud_location = CRUDLocation(db)
         
-        print("\n📋 Locations récentes:")
+        print("\n📋 Locations (première page, par client puis voiture):")
         crud_location.list_all(limit=10)
         
         # === Propriétaires ===
@@ -0,0 +1,316 @@
+"""
+Cache binaire des CSV lus : une fois parsé, chaque fichier est stocké en
+colonnes .npy projetables en mémoire, invalidé dès que le CSV change
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from config import CSV_CACHE_CONFIG
+from csv_schema import CSV_SCHEMAS, read_csv
+
+MANIFEST = 'manifest.json'
+_HASH_BLOCK = 1 << 20
+
+# Au-delà (valeurs distinctes / lignes), une colonne texte n'est pas relue en
+# Categorical : vérifier l'unicité des catégories coûterait plus que le texte
+MAX_CATEGORY_RATIO = 0.5
+
+# Valeurs distinctes gardées en mémoire par colonne texte pendant la
+# construction ; au-delà, la colonne est stockée en texte brut
+MAX_CATEGORIES = 1 << 16
+
+# Lignes par paquet pour construire une entrée lue d'un seul bloc
+BUILD_CHUNK_ROWS = 100_000
+_COPY_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    """Empreinte BLAKE2b du contenu du fichier"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def entry_path(path, name, directory=None):
+    """Dossier du cache d'un CSV (un par fichier source et schéma)"""
+    source = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=6).hexdigest()
+    return os.path.join(directory or CSV_CACHE_CONFIG['directory'], f"{name}-{source}")
+
+def _read_manifest(entry):
+    try:
+        with open(os.path.join(entry, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_manifest(entry, manifest):
+    tmp = os.path.join(entry, MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(entry, MANIFEST))
+
+def is_fresh(manifest, path, verify=False):
+    """Le cache correspond-il encore au CSV ?
+
+    Taille et date de modification identiques : oui, sans relire le fichier
+    (sauf `verify`). Date différente mais même taille : on compare le hash
+    (fichier recopié ou touché sans modification).
+    """
+    if manifest is None:
+        return False
+    stat = os.stat(path)
+    if manifest['size'] != stat.st_size:
+        return False
+    if manifest['mtime_ns'] == stat.st_mtime_ns and not verify:
+        return True
+    if manifest['hash'] != file_hash(path):
+        return False
+    manifest['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+class _ColumnWriter:
+    """Colonne du cache écrite paquet par paquet dans des fichiers bruts,
+    convertis en .npy une fois le nombre de lignes connu
+
+    Texte : codes int32 tant que la colonne a au plus MAX_CATEGORIES valeurs
+    distinctes ; au-delà (numéros de location...), octets UTF-8 et positions
+    de fin de chaque valeur (longueur nulle = NULL, '' étant un jeton NULL).
+    """
+
+    def __init__(self, directory, index, column):
+        self.prefix = os.path.join(directory, str(index))
+        self.csv = column.csv
+        self.kind = 'numeric' if column.type in ('int', 'float') else 'codes'
+        self.file = open(self.prefix + ('.raw' if self.kind == 'numeric' else '.codes.raw'), 'wb')
+        self.categories = {}
+        self.rows = 0
+
+    def append(self, values):
+        if self.kind == 'numeric':
+            values.to_numpy(dtype=np.float64).tofile(self.file)
+        elif self.kind == 'codes':
+            codes, uniques = pd.factorize(values)
+            mapping = np.array([self.categories.setdefault(value, len(self.categories)) for value in uniques],
+                               dtype=np.int32)
+            if len(self.categories) > MAX_CATEGORIES:
+                self._to_strings()
+                self._append_strings(values)
+            else:
+                codes = codes.astype(np.int32)
+                codes[codes >= 0] = mapping[codes[codes >= 0]]
+                codes.tofile(self.file)
+        else:
+            self._append_strings(values)
+        self.rows += len(values)
+
+    def _to_strings(self):
+        """Passer en texte brut : réécrire les codes déjà écrits"""
+        self.file.close()
+        categories = np.array(list(self.categories), dtype=object)
+        self.categories = None
+        self.kind = 'strings'
+        self.file = open(self.prefix + '.bytes.raw', 'wb')
+        self.ends = open(self.prefix + '.ends.raw', 'wb')
+        self.size = 0
+        codes_path = self.prefix + '.codes.raw'
+        if self.rows:
+            codes = np.memmap(codes_path, dtype=np.int32, mode='r', shape=(self.rows,))
+            for start in range(0, self.rows, _COPY_BLOCK):
+                block = np.asarray(codes[start:start + _COPY_BLOCK])
+                text = categories[np.maximum(block, 0)]
+                text[block < 0] = None
+                self._append_strings(text)
+            del codes
+        os.remove(codes_path)
+
+    def _append_strings(self, values):
+        encoded = [value.encode('utf-8') if isinstance(value, str) else b''
+                   for value in np.asarray(values, dtype=object)]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        (self.size + np.cumsum(lengths)).tofile(self.ends)
+        self.size += int(lengths.sum())
+        self.file.write(b''.join(encoded))
+
+    def finish(self, ratio_rows):
+        """Fermer les fichiers bruts, écrire les .npy ; renvoie l'entrée du manifeste"""
+        self.file.close()
+        if self.kind == 'numeric':
+            _raw_to_npy(self.prefix + '.raw', self.prefix + '.npy', np.float64, self.rows)
+        elif self.kind == 'codes':
+            _raw_to_npy(self.prefix + '.codes.raw', self.prefix + '.codes.npy', np.int32, self.rows)
+            np.save(self.prefix + '.uniques.npy', np.asarray(list(self.categories), dtype=str))
+            if len(self.categories) > MAX_CATEGORY_RATIO * ratio_rows:
+                self.kind = 'text'
+        else:
+            self.ends.close()
+            _raw_to_npy(self.prefix + '.ends.raw', self.prefix + '.ends.npy', np.int64, self.rows)
+            _raw_to_npy(self.prefix + '.bytes.raw', self.prefix + '.bytes.npy', np.uint8, self.size)
+        return {'csv': self.csv, 'kind': self.kind}
+
+    def close(self):
+        self.file.close()
+        if self.kind == 'strings':
+            self.ends.close()
+
+def _raw_to_npy(raw, path, dtype, count):
+    """Recopier un fichier brut dans un .npy (par blocs : mémoire bornée)"""
+    if not count:
+        np.save(path, np.empty(0, dtype=dtype))
+    else:
+        source = np.memmap(raw, dtype=dtype, mode='r', shape=(count,))
+        target = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(count,))
+        for start in range(0, count, _COPY_BLOCK):
+            target[start:start + _COPY_BLOCK] = source[start:start + _COPY_BLOCK]
+        target.flush()
+        del source, target
+    os.remove(raw)
+
+def build_chunks(path, name, entry, chunksize):
+    """Parser le CSV par paquets de `chunksize` lignes, renvoyés au fur et à
+    mesure, en écrivant ses colonnes typées
+
+    Colonnes numériques : float64 (NaN = NULL). Texte et dates : codes
+    int32 (-1 = NULL) et valeurs distinctes, relus en Categorical quand les
+    valeurs se répètent, en texte sinon. La mémoire ne dépend que de
+    `chunksize` et de MAX_CATEGORIES. L'entrée est écrite à côté puis
+    renommée une fois le fichier lu en entier : jamais de cache à moitié
+    écrit (un parcours abandonné ne laisse rien).
+    """
+    stat = os.stat(path)
+    digest = file_hash(path)
+    tmp = entry + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    writers = [_ColumnWriter(tmp, i, column) for i, column in enumerate(CSV_SCHEMAS[name]['columns'])]
+    complete = False
+    try:
+        rows = 0
+        for df in read_csv(path, name, chunksize=chunksize):
+            for writer in writers:
+                writer.append(df[writer.csv])
+            rows += len(df)
+            yield df
+        columns = [writer.finish(rows) for writer in writers]
+        _write_manifest(tmp, {'source': os.path.abspath(path), 'size': stat.st_size,
+                              'mtime_ns': stat.st_mtime_ns, 'hash': digest,
+                              'rows': rows, 'columns': columns})
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        complete = True
+    finally:
+        if not complete:
+            for writer in writers:
+                writer.close()
+            shutil.rmtree(tmp, ignore_errors=True)
+
+def _load(path):
+    """np.load projeté en mémoire (un tableau vide ne se projette pas)"""
+    array = np.load(path, mmap_mode='r')
+    return array if array.size else np.asarray(array)
+
+def open_entry(entry, manifest):
+    """Colonnes d'une entrée : (nom, type, tableau, valeurs distinctes), les
+    tableaux étant projetés en mémoire (rien n'est lu avant d'être utilisé)"""
+    columns = []
+    for i, column in enumerate(manifest['columns']):
+        kind = column['kind']
+        if kind == 'numeric':
+            columns.append((column['csv'], kind, np.load(os.path.join(entry, f"{i}.npy"), mmap_mode='r'), None))
+            continue
+        if kind == 'strings':
+            columns.append((column['csv'], kind, np.load(os.path.join(entry, f"{i}.ends.npy"), mmap_mode='r'),
+                            _load(os.path.join(entry, f"{i}.bytes.npy"))))
+            continue
+        codes = np.load(os.path.join(entry, f"{i}.codes.npy"), mmap_mode='r')
+        if kind == 'codes':
+            uniques = pd.Index(np.load(os.path.join(entry, f"{i}.uniques.npy")), dtype=object)
+        else:
+            uniques = np.load(os.path.join(entry, f"{i}.uniques.npy"), mmap_mode='r')
+        columns.append((column['csv'], kind, codes, uniques))
+    return columns
+
+def frame(columns, start, stop):
+    """DataFrame des lignes [start, stop) (index = rang dans le fichier, comme read_csv)"""
+    data = {}
+    for csv, kind, values, uniques in columns:
+        if kind == 'strings':
+            data[csv] = _strings(values, uniques, start, stop)
+            continue
+        values = values[start:stop]
+        if kind == 'numeric':
+            data[csv] = values
+        elif kind == 'codes':
+            data[csv] = pd.Categorical.from_codes(values, categories=uniques)
+        else:
+            text = uniques[values].astype(object) if len(uniques) else np.empty(len(values), dtype=object)
+            text[values < 0] = np.nan
+            data[csv] = text
+    return pd.DataFrame(data, index=pd.RangeIndex(start, stop), copy=False)
+
+def _strings(ends, data, start, stop):
+    """Valeurs [start, stop) d'une colonne texte brute : `ends` donne la fin
+    de chaque valeur dans les octets `data` (longueur nulle = NULL)"""
+    text = np.empty(stop - start, dtype=object)
+    if stop <= start:
+        return text
+    begin = int(ends[start - 1]) if start else 0
+    bounds = np.asarray(ends[start:stop], dtype=np.int64) - begin
+    blob = data[begin:begin + int(bounds[-1])].tobytes()
+    previous = 0
+    for i, end in enumerate(bounds.tolist()):
+        text[i] = blob[previous:end].decode('utf-8') if end > previous else np.nan
+        previous = end
+    return text
+
+def read_table(path, name, chunksize=None, directory=None, enabled=None, verify=None):
+    """read_csv(path, name) avec cache : mêmes colonnes et même index
+
+    `chunksize` : itérateur de tranches, comme pandas. Un CSV modifié est
+    reparsé et son entrée remplacée ; sans cache, lecture directe.
+    """
+    enabled = CSV_CACHE_CONFIG['enabled'] if enabled is None else enabled
+    if not enabled:
+        return read_csv(path, name, chunksize=chunksize)
+    verify = CSV_CACHE_CONFIG['verify'] if verify is None else verify
+    entry = entry_path(path, name, directory)
+    manifest = _read_manifest(entry)
+    mtime = manifest and manifest['mtime_ns']
+    if not is_fresh(manifest, path, verify):
+        # Cache froid : paquets renvoyés pendant la construction, un seul parsing
+        chunks = build_chunks(path, name, entry, chunksize or BUILD_CHUNK_ROWS)
+        if chunksize is not None:
+            return chunks
+        for _ in chunks:
+            pass
+        manifest = _read_manifest(entry)
+        return frame(open_entry(entry, manifest), 0, manifest['rows'])
+    if manifest['mtime_ns'] != mtime:
+        _write_manifest(entry, manifest)  # même contenu, nouvelle date
+    columns = open_entry(entry, manifest)
+    rows = manifest['rows']
+    if chunksize is None:
+        return frame(columns, 0, rows)
+    # Paquet par paquet : seules les pages du paquet courant sont lues
+    return (frame(columns, start, min(start + chunksize, rows)) for start in range(0, rows, chunksize))
+
+def purge(directory=None):
+    """Supprimer les entrées dont le CSV a disparu ou changé ; renvoie leur nombre"""
+    directory = directory or CSV_CACHE_CONFIG['directory']
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for entry_name in os.listdir(directory):
+        entry = os.path.join(directory, entry_name)
+        manifest = _read_manifest(entry)
+        source = manifest and manifest.get('source')
+        if source and os.path.exists(source) and is_fresh(manifest, source):
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        removed += 1
+    return removed
@@ -0,0 +1,172 @@
+"""
+Schéma des fichiers CSV et conversion en lignes de binds, colonne par colonne
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Colonne d'un CSV : nom dans le fichier, colonne Oracle, type ('str', 'int',
+# 'float', 'date') et format pour les dates
+Column = namedtuple('Column', 'csv name type format', defaults=(None,))
+
+# Valeurs lues comme NULL
+NULL_TOKENS = ('NULL', '')
+
+# 'key' : clé primaire (pk_location pour Location)
+CSV_SCHEMAS = {
+    'proprietaire': {
+        'table': 'Proprietaire',
+        'key': ('CodeP',),
+        'columns': (
+            Column('codeP', 'CodeP', 'str'),
+            Column('Pseudo', 'pseudo', 'str'),
+            Column('email', 'email', 'str'),
+            Column('ville', 'Ville', 'str'),
+            Column('anneeI', 'anneeI', 'int'),
+        ),
+    },
+    'client': {
+        'table': 'Client',
+        'key': ('CodeC',),
+        'columns': (
+            Column('CodeC', 'CodeC', 'str'),
+            Column('Nom', 'Nom', 'str'),
+            Column('Prenom', 'Prenom', 'str'),
+            Column('age', 'Age', 'int'),
+            Column('Permis', 'Permis', 'str'),
+            Column('Adresse', 'Adresse', 'str'),
+            Column('Ville', 'Ville', 'str'),
+        ),
+    },
+    'voiture': {
+        'table': 'Voiture',
+        'key': ('Immat',),
+        'columns': (
+            Column('Immat', 'Immat', 'str'),
+            Column('modele', 'Modele', 'str'),
+            Column('Marque', 'Marque', 'str'),
+            Column('Categorie', 'Categorie', 'str'),
+            Column('couleur', 'Couleur', 'str'),
+            Column('places', 'Places', 'int'),
+            Column('achatA', 'achatA', 'int'),
+            Column('compteur', 'compteur', 'int'),
+            Column('prixJ', 'prixJ', 'float'),
+            Column('codeP', 'codeP', 'str'),
+        ),
+    },
+    'location': {
+        'table': 'Location',
+        'key': ('CodeC', 'Immat', 'Annee', 'Mois', 'numLoc'),
+        'columns': (
+            Column('CodeC', 'CodeC', 'str'),
+            Column('immat', 'Immat', 'str'),
+            Column('annee', 'Annee', 'int'),
+            Column('mois', 'Mois', 'int'),
+            Column('numloc', 'numLoc', 'str'),
+            Column('km', 'km', 'int'),
+            Column('duree', 'duree', 'int'),
+            Column('villed', 'villed', 'str'),
+            Column('villea', 'villea', 'str'),
+            # Date illisible : NULL (comme l'ancien import ligne à ligne)
+            Column('dated', 'dated', 'date', '%Y-%m-%d'),
+            Column('datef', 'datef', 'date', '%Y-%m-%d'),
+            Column('note', 'note', 'int'),
+            Column('avis', 'avis', 'str'),
+        ),
+    },
+}
+
+def read_csv(path, name=None, **kwargs):
+    """Lire un CSV du projet (jetons NULL_TOKENS -> NaN)
+
+    Avec le schéma `name`, les colonnes numériques sont converties par le
+    parseur C de pandas (float64) ; le reste est lu en texte.
+    """
+    dtype = str
+    if name is not None:
+        dtype = {column.csv: np.float64 if column.type in ('int', 'float') else str
+                 for column in CSV_SCHEMAS[name]['columns']}
+    return pd.read_csv(path, sep=';', dtype=dtype, keep_default_na=False,
+                       na_values=list(NULL_TOKENS), **kwargs)
+
+def insert_sql(name, table=None):
+    """INSERT positionnel (:1, :2...) correspondant au schéma (`table` : autre cible)"""
+    schema = CSV_SCHEMAS[name]
+    columns = schema['columns']
+    names = ", ".join(column.name for column in columns)
+    binds = ", ".join(f":{i}" for i in range(1, len(columns) + 1))
+    return f"INSERT INTO {table or schema['table']} ({names}) VALUES ({binds})"
+
+def merge_sql(name):
+    """MERGE d'une ligne (binds positionnels dans l'ordre du CSV) : mise à jour
+    si la clé primaire existe, insertion sinon"""
+    schema = CSV_SCHEMAS[name]
+    columns = [column.name for column in schema['columns']]
+    key = schema['key']
+    source = ", ".join(f":{i} AS {column}" for i, column in enumerate(columns, 1))
+    on = " AND ".join(f"t.{column} = s.{column}" for column in key)
+    updates = ", ".join(f"t.{column} = s.{column}" for column in columns if column not in key)
+    return (f"MERGE INTO {schema['table']} t USING (SELECT {source} FROM dual) s ON ({on}) "
+            f"WHEN MATCHED THEN UPDATE SET {updates} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f's.{column}' for column in columns)})")
+
+def delete_sql(name):
+    """DELETE par clé primaire (binds dans l'ordre de 'key')"""
+    schema = CSV_SCHEMAS[name]
+    where = " AND ".join(f"{column} = :{i}" for i, column in enumerate(schema['key'], 1))
+    return f"DELETE FROM {schema['table']} WHERE {where}"
+
+def _fill(values, mask):
+    """Tableau objet : valeurs Python là où `mask`, None ailleurs"""
+    out = np.full(len(mask), None, dtype=object)
+    out[mask] = values[mask].tolist()
+    return out
+
+def _by_uniques(raw, convert):
+    """Convertir seulement les valeurs distinctes puis les redistribuer
+
+    Villes, codes, dates... se répètent beaucoup : la conversion objet ne
+    coûte qu'une fois par valeur distincte.
+    """
+    codes, uniques = pd.factorize(raw)
+    values = np.append(convert(pd.Series(uniques)), None)  # code -1 (NaN) -> None
+    return values[codes]
+
+def _strip(values):
+    return values.str.strip().to_numpy(dtype=object)
+
+def _dates(fmt):
+    def convert(values):
+        dates = pd.to_datetime(values, format=fmt, errors='coerce')
+        return _fill(np.asarray(dates.dt.to_pydatetime(), dtype=object), dates.notna().to_numpy())
+    return convert
+
+def convert_column(raw, column):
+    """Convertir une colonne lue par read_csv en tableau objet de valeurs Python (None = NULL)"""
+    if column.type == 'str':
+        return _by_uniques(raw, _strip)
+    if column.type == 'date':
+        return _by_uniques(raw, _dates(column.format))
+    present = raw.notna().to_numpy()
+    if pd.api.types.is_numeric_dtype(raw):
+        numbers = raw.to_numpy(dtype=np.float64)
+    else:
+        numbers = pd.to_numeric(raw.str.strip(), errors='coerce')
+        invalid = present & numbers.isna().to_numpy()
+        if invalid.any():
+            first = int(np.argmax(invalid))
+            # +2 : en-tête du CSV et numérotation à partir de 1
+            raise ValueError(f"{column.csv}: valeur invalide '{raw.iloc[first]}' "
+                             f"(ligne {raw.index[first] + 2}, {int(invalid.sum())} au total)")
+        numbers = numbers.to_numpy(dtype=np.float64)
+    if column.type == 'int':
+        numbers = np.trunc(numbers)
+        return _fill(np.nan_to_num(numbers).astype(np.int64), present)
+    return _fill(numbers, present)
+
+def to_bind_rows(df, name):
+    """DataFrame lu par read_csv -> liste de tuples prêts pour executemany"""
+    columns = [convert_column(df[column.csv], column) for column in CSV_SCHEMAS[name]['columns']]
+    return list(zip(*columns))
@@ -1,87 +1,905 @@
 """
 Gestion de la connexion à la base de données Oracle
 """
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
 import oracledb
-from config import ORACLE_CONFIG
+import pandas as pd
+from config import (ORACLE_CONFIG, POOL_CONFIG, FETCH_CONFIG, TRANSACTION_CONFIG,
+                    METRICS_CONFIG, CACHE_CONFIG, BATCH_CONFIG, TYPE_CONFIG,
+                    STATEMENT_CACHE_CONFIG, ENTITY_CACHE_CONFIG)
+from entity_cache import EntityCache
+from metrics import QueryMetrics, StatementCacheStats
+from query_cache import QueryCache, written_tables, procedure_tables
+from type_handlers import NativeTypeHandler
+
+try:
+    import pyarrow
+except ImportError:  # chemin NumPy utilisé à la place
+    pyarrow = None
+
+_NUMBER_TYPES = (oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_BINARY_INTEGER)
+_FLOAT_TYPES = (oracledb.DB_TYPE_BINARY_DOUBLE, oracledb.DB_TYPE_BINARY_FLOAT)
+_DATE_TYPES = (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+               oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ)
+
+
+def _column_kind(description):
+    """Type NumPy cible d'une colonne d'après cursor.description"""
+    _, type_code, _, _, precision, scale, _ = description
+    if type_code in _NUMBER_TYPES:
+        if scale == 0 and precision:
+            return 'int'
+        # NUMBER sans précision (COUNT, SUM...) : entier si toutes les valeurs le sont
+        return 'number' if scale == -127 or scale is None else 'float'
+    if type_code in _FLOAT_TYPES:
+        return 'float'
+    if type_code in _DATE_TYPES:
+        return 'datetime'
+    return 'object'
+
+
+def _to_array(values, kind):
+    """Convertir les valeurs d'une colonne (un lot) en tableau NumPy"""
+    if kind == 'number':
+        kind = 'int' if all(type(v) is int for v in values) else 'float'
+    if kind == 'int':
+        try:
+            return np.array(values, dtype=np.int64)
+        except (TypeError, OverflowError):
+            kind = 'float'  # NULL présents : NaN
+    if kind == 'float':
+        return np.array(values, dtype=np.float64)
+    # Dates : converties en une fois par _concat_column (np.array date par date est lent)
+    return np.array(values, dtype=object)
+
+
+def _concat_column(chunks, kind):
+    """Assembler les lots d'une colonne"""
+    values = np.concatenate(chunks) if chunks else _to_array((), 'float' if kind == 'number' else kind)
+    if kind == 'datetime':
+        return pd.to_datetime(values).to_numpy()
+    return values
+
+
+class TransactionError(Exception):
+    """Transaction annulée car une de ses instructions a échoué"""
+
+
+class Transaction:
+    """Unité de travail ouverte par `Database.transaction()`"""
+
+    def __init__(self, connection, cursor):
+        self.connection = connection
+        self.cursor = cursor
+        self.rollback_only = False
+        self.touched = set()
+        self._savepoints = 0
+
+    @contextmanager
+    def savepoint(self, name=None):
+        """Point de reprise : une erreur dans le bloc n'annule que ce bloc"""
+        self._savepoints += 1
+        name = name or f"sp_{self._savepoints}"
+        rollback_only = self.rollback_only
+        self.cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield name
+        except Exception:
+            self.rollback_to(name)
+            self.rollback_only = rollback_only
+            raise
+
+    def rollback_to(self, name):
+        """Revenir à un point de reprise sans annuler toute la transaction"""
+        self.cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+
+
+def _chunk_row_counts(counts, size, errors):
+    """Lignes touchées par chaque ligne du paquet : le pilote peut omettre
+    les lignes rejetées (batcherrors), comptées alors 0"""
+    if len(counts) == size:
+        return list(counts)
+    rejected = {error.offset for error in errors}
+    counts = iter(counts)
+    return [0 if offset in rejected else next(counts, 0) for offset in range(size)]
+
+
+class BatchReport:
+    """Résultat d'un `execute_batch` : lignes appliquées et lignes rejetées
+
+    `aborted` : une erreur (connexion...) a interrompu le lot ; les lignes
+    des paquets non appliqués figurent dans `errors`.
+    """
+
+    def __init__(self, total, policy):
+        self.total = total
+        self.policy = policy
+        self.succeeded = 0
+        self.errors = []
+        self.chunks = 0
+        self.committed = False
+        self.aborted = False
+        self.elapsed = 0.0
+        self.row_counts = None
+
+    @property
+    def ok(self):
+        return not self.errors and not self.aborted
+
+    @property
+    def rows_per_second(self):
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, index, message):
+        self.errors.append((index, message))
+
+    def merge(self, other, offset=0):
+        """Ajouter le rapport d'un paquet dont la première ligne est au rang `offset`"""
+        self.total += other.total
+        self.succeeded += other.succeeded
+        self.chunks += other.chunks
+        self.aborted = self.aborted or other.aborted
+        self.errors.extend((offset + index, message) for index, message in other.errors)
+
+    def summary(self, limit=5):
+        """Résumé lisible : compteurs et premières erreurs"""
+        status = "interrompu" if self.aborted else "validé" if self.committed else "annulé"
+        lines = [f"{self.succeeded}/{self.total} ligne(s) appliquée(s), "
+                 f"{len(self.errors)} rejetée(s) ({self.policy}, {status})"]
+        for index, message in self.errors[:limit]:
+            lines.append(f"#{index}: {message}")
+        if len(self.errors) > limit:
+            lines.append(f"... {len(self.errors) - limit} autre(s) erreur(s)")
+        return lines
+
+
+class GroupCommit:
+    """Regroupe les COMMIT des threads concurrents sur la connexion partagée
+
+    Le premier appelant devient meneur : il attend au plus `window_ms`
+    (ou `max_batch` appelants) puis émet un seul COMMIT pour tout le lot.
+    Les écritures sont numérotées par époque (`written`) : une époque est
+    close par le premier COMMIT qui la suit, celui du meneur ou un `flush`
+    avant une transaction ou un batch, et son échec revient à ses auteurs.
+    """
+
+    def __init__(self, db, window_ms, max_batch):
+        self.db = db
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.pending = 0
+        self.leader = False
+        self.done = -1
+        self.errors = {}
+        self.epoch = 0
+        self.dirty = False
+        self.failures = {}
+        self.commits = 0
+        self.callers = 0
+
+    def written(self):
+        """Noter une écriture non validée (verrou de la connexion tenu), renvoie son époque"""
+        self.dirty = True
+        return self.epoch
+
+    def flush(self, connection):
+        """Valider tout de suite les écritures en attente (verrou de la connexion tenu)
+
+        Appelé avant qu'une transaction ou un batch ne prenne la connexion :
+        leur ROLLBACK éventuel n'annule alors que leur propre travail.
+        """
+        if not self.dirty:
+            return
+        epoch = self.epoch
+        self.epoch += 1
+        self.dirty = False
+        try:
+            connection.commit()
+        except Exception as e:
+            self.failures[epoch] = e
+            raise
+
+    def commit(self, epoch):
+        with self.condition:
+            generation = self.generation
+            self.pending += 1
+            self.callers += 1
+            if self.leader:
+                if self.pending >= self.max_batch:
+                    self.condition.notify_all()
+                self.condition.wait_for(lambda: self.done >= generation)
+                error = self.errors.get(generation) or self.failures.get(epoch)
+                if error:
+                    raise error
+                return
+            self.leader = True
+            self.condition.wait_for(lambda: self.pending >= self.max_batch, timeout=self.window)
+            # Clore le lot : les suivants forment le lot suivant
+            self.generation += 1
+            self.pending = 0
+            self.leader = False
+
+        error = None
+        try:
+            with self.db.acquire() as (connection, _):
+                self.flush(connection)
+        except Exception as e:
+            error = e
+        with self.condition:
+            self.commits += 1
+            self.done = max(self.done, generation)
+            if error:
+                self.errors[generation] = error
+            self.condition.notify_all()
+        error = error or self.failures.get(epoch)
+        if error:
+            raise error
+
 
 class Database:
-    """Classe pour gérer la connexion Oracle"""
-    
-    def __init__(self):
+    """Classe pour gérer la connexion Oracle
+
+    Deux modes :
+    - connexion unique (par défaut) : une session partagée, protégée par un verrou
+    - pool (`pooled=True` ou ORACLE_POOL=1) : chaque thread emprunte sa propre
+      session (connexion + curseur) le temps d'un appel
+
+    `driver` permet d'injecter un pilote compatible oracledb (ex: local_driver).
+    `native_types` installe NativeTypeHandler sur chaque session : les NUMBER
+    du schéma arrivent en int/float (prixJ en centimes si ORACLE_PRICE_MODE=cents).
+
+    Hors transaction, chaque écriture est validée immédiatement (ou par lot
+    avec le commit groupé, en connexion unique). Dans `with db.transaction():`
+    les écritures du thread sont validées ensemble à la sortie du bloc.
+
+    Chaque appel `execute_*` / `call_procedure` est mesuré dans `self.metrics`,
+    et compté dans `self.statement_cache` (analyses et succès du cache
+    d'instructions de chaque session, STATEMENT_CACHE_CONFIG).
+    `execute_query(..., cached=True)` passe par le cache de résultats s'il est
+    activé (CACHE_CONFIG ou `enable_cache()`) ; les écritures l'invalident.
+    `self.entities` (ENTITY_CACHE_CONFIG) garde les lignes de référence lues
+    par clé par les CRUD ; les écritures l'invalident de la même façon.
+    """
+
+    def __init__(self, pooled=None, driver=None, native_types=None):
+        self.driver = driver or oracledb
+        self.pooled = POOL_CONFIG['enabled'] if pooled is None else pooled
+        native_types = TYPE_CONFIG['native'] if native_types is None else native_types
+        self.type_handler = NativeTypeHandler(price_mode=TYPE_CONFIG['price_mode']) if native_types else None
+        self.pool = None
         self.connection = None
         self.cursor = None
-    
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        # Sessions libres réservées aux parcours en flux (connexion unique)
+        self._stream_sessions = []
+        self._stream_lock = threading.Lock()
+        self.metrics = QueryMetrics(METRICS_CONFIG['slow_query_ms'], METRICS_CONFIG['sample_size'])
+        self.statement_cache = StatementCacheStats(STATEMENT_CACHE_CONFIG['size'])
+        self.metrics.register_source('statement_cache', self.statement_cache.stats)
+        self.cache = None
+        if CACHE_CONFIG['enabled']:
+            self.enable_cache()
+        self.entities = None
+        if ENTITY_CACHE_CONFIG['enabled']:
+            self.enable_entity_cache()
+        self.group_commit = None
+        if TRANSACTION_CONFIG['group_commit']:
+            self.group_commit = GroupCommit(self, TRANSACTION_CONFIG['group_commit_window_ms'],
+                                            TRANSACTION_CONFIG['group_commit_max'])
+
     def connect(self):
         """Établir la connexion à Oracle"""
         try:
+            if self.pooled:
+                self.pool = self.driver.create_pool(
+                    min=POOL_CONFIG['min'],
+                    max=POOL_CONFIG['max'],
+                    increment=POOL_CONFIG['increment'],
+                    stmtcachesize=STATEMENT_CACHE_CONFIG['size'],
+                    **ORACLE_CONFIG
+                )
+                with self.acquire() as (connection, _):
+                    version = connection.version
+                print(f"✓ Pool Oracle prêt ({POOL_CONFIG['min']}-{POOL_CONFIG['max']} sessions, version {version})")
+                return True
             # Mode Thin (pas besoin d'Oracle Instant Client)
-            self.connection = oracledb.connect(**ORACLE_CONFIG)
+            self.connection = self.driver.connect(stmtcachesize=STATEMENT_CACHE_CONFIG['size'],
+                                                  **ORACLE_CONFIG)
+            self.connection.outputtypehandler = self.type_handler
             self.cursor = self.connection.cursor()
             print(f"✓ Connecté à Oracle Database (version {self.connection.version})")
             return True
         except Exception as e:
             print(f"❌ Erreur de connexion: {e}")
             return False
-    
+
     def disconnect(self):
         """Fermer la connexion"""
+        with self._stream_lock:
+            sessions, self._stream_sessions = self._stream_sessions, []
+        for connection in sessions:
+            connection.close()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+            print("✓ Pool fermé")
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
         if self.connection:
             self.connection.close()
+            self.connection = None
             print("✓ Déconnexion réussie")
-    
-    def execute_query(self, query, params=None):
-        """Exécuter une requête SELECT"""
+
+    def enable_cache(self, max_entries=None, max_mb=None, ttl_s=None):
+        """Activer le cache de résultats pour les requêtes `cached=True`"""
+        if self.cache is None:
+            self.cache = QueryCache(
+                max_entries or CACHE_CONFIG['max_entries'],
+                int((max_mb or CACHE_CONFIG['max_mb']) * 1024 * 1024),
+                ttl_s or CACHE_CONFIG['ttl_s']
+            )
+            self.metrics.register_source('query_cache', self.cache.stats)
+        return self.cache
+
+    def enable_entity_cache(self, max_entries=None, verify_s=None):
+        """Activer le cache d'entités des CRUD (lectures par clé primaire)"""
+        if self.entities is None:
+            self.entities = EntityCache(
+                max_entries or ENTITY_CACHE_CONFIG['max_entries'],
+                ENTITY_CACHE_CONFIG['verify_s'] if verify_s is None else verify_s
+            )
+            self.metrics.register_source('entity_cache', self.entities.stats)
+        return self.entities
+
+    def _invalidate(self, tables, keys=None):
+        """Invalider les caches après une écriture (tables=None: tout)
+
+        `keys` : {table: clés primaires écrites}, pour n'évincer que ces
+        entités (les autres tables écrites sont vidées du cache d'entités).
+        """
+        if self.cache is None and self.entities is None:
+            return
+        if self.cache is not None:
+            self.cache.invalidate(tables)
+        if self.entities is not None:
+            self.entities.invalidate(tables, keys)
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            # Ré-invalider à la fin : d'autres sessions ont pu relire l'état validé entre-temps
+            if tables is None or tx.touched is None:
+                tx.touched = None
+            else:
+                tx.touched |= tables
+
+    @contextmanager
+    def acquire(self):
+        """Emprunter une session (connexion, curseur) pour le thread courant
+
+        Les appels imbriqués dans un même thread réutilisent la même session ;
+        elle est rendue au pool (ou le verrou libéré) à la sortie du bloc externe.
+        """
+        local = self._local
+        if getattr(local, 'depth', 0):
+            local.depth += 1
+            try:
+                yield local.connection, local.cursor
+            finally:
+                local.depth -= 1
+            return
+
+        if self.pool is not None:
+            connection = self.pool.acquire()
+            connection.outputtypehandler = self.type_handler
+            cursor = connection.cursor()
+        else:
+            if self.connection is None:
+                raise RuntimeError("Pas de connexion active")
+            self._lock.acquire()
+            connection, cursor = self.connection, self.cursor
+
+        local.connection, local.cursor, local.depth = connection, cursor, 1
         try:
-            if params:
-                self.cursor.execute(query, params)
+            yield connection, cursor
+        finally:
+            local.connection, local.cursor, local.depth = None, None, 0
+            if self.pool is not None:
+                cursor.close()
+                self.pool.release(connection)
             else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+                self._lock.release()
+
+    @contextmanager
+    def _stream_session(self):
+        """Session réservée à un parcours en flux, empruntée par le générateur
+
+        Elle n'entre pas dans la profondeur de `acquire()` : un générateur
+        suspendu ne retient ni le verrou ni la session du thread, et peut être
+        repris ou fermé dans un autre ordre, ou depuis un autre thread. Pool :
+        une session du pool ; connexion unique : une seconde connexion, gardée
+        pour les parcours suivants. Dans une transaction, sa session (pour
+        voir les écritures non validées).
+        """
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            yield tx.connection
+            return
+        if self.pool is not None:
+            connection = self.pool.acquire()
+            connection.outputtypehandler = self.type_handler
+            try:
+                yield connection
+            finally:
+                self.pool.release(connection)
+            return
+        if self.connection is None:
+            raise RuntimeError("Pas de connexion active")
+        with self._stream_lock:
+            connection = self._stream_sessions.pop() if self._stream_sessions else None
+        if connection is None:
+            connection = self.driver.connect(stmtcachesize=STATEMENT_CACHE_CONFIG['size'], **ORACLE_CONFIG)
+            connection.outputtypehandler = self.type_handler
+        failed = False
+        try:
+            yield connection
+        except Exception:
+            failed = True  # état inconnu après l'erreur : pas de réutilisation
+            raise
+        finally:
+            with self._stream_lock:
+                reuse = not failed and self.connection is not None
+                if reuse:
+                    self._stream_sessions.append(connection)
+            if not reuse:
+                connection.close()
+
+    def execute_query(self, query, params=None, cached=False):
+        """Exécuter une requête SELECT (`cached=True`: passer par le cache de résultats)"""
+        cache = self.cache if cached else None
+        if cache is not None:
+            rows = cache.get(query, params)
+            if rows is not None:
+                return list(rows)
+            version = cache.version
+        start = time.perf_counter()
+        try:
+            with self.acquire() as (connection, cursor):
+                self.statement_cache.seen(connection, query)
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                rows = cursor.fetchall()
+            self.metrics.record('query', query, time.perf_counter() - start, len(rows))
+            if cache is not None and not self.in_transaction():
+                cache.put(query, params, tuple(rows), version)
+            return rows
+        except Exception as e:
+            self.metrics.record('query', query, time.perf_counter() - start, error=True)
+            print(f"❌ Erreur d'exécution: {e}")
+            return None
+
+    def iter_query(self, query, params=None, arraysize=None, prefetchrows=None):
+        """Exécuter une requête SELECT et parcourir le résultat en flux
+
+        Les lignes sont récupérées par lots de `arraysize` : la mémoire reste
+        bornée et la première ligne arrive sans attendre la fin du résultat.
+        Le générateur emprunte sa propre session (voir `_stream_session`)
+        jusqu'à ce qu'il soit épuisé ou fermé.
+        Une erreur, même après les premières lignes, est remontée à l'appelant
+        (un résultat tronqué ne doit pas passer pour complet).
+        """
+        start = time.perf_counter()
+        count = 0
+        error = False
+        try:
+            with self._stream_session() as connection:
+                # Curseur dédié : d'autres requêtes peuvent s'exécuter pendant le parcours
+                cursor = connection.cursor()
+                try:
+                    cursor.arraysize = arraysize or FETCH_CONFIG['arraysize']
+                    cursor.prefetchrows = prefetchrows or FETCH_CONFIG['prefetchrows']
+                    self.statement_cache.seen(connection, query)
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    while True:
+                        rows = cursor.fetchmany()
+                        if not rows:
+                            break
+                        count += len(rows)
+                        yield from rows
+                finally:
+                    cursor.close()
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.metrics.record('stream', query, time.perf_counter() - start, count, error)
+
+    @contextmanager
+    def transaction(self):
+        """Unité de travail : un seul COMMIT pour le bloc, ROLLBACK global en cas d'erreur
+
+        Les CRUD et les `execute_*` appelés dans le bloc (même thread) y participent.
+        Une transaction imbriquée devient un point de reprise (SAVEPOINT).
+        """
+        local = self._local
+        current = getattr(local, 'transaction', None)
+        if current is not None:
+            with current.savepoint():
+                yield current
+            return
+
+        with self.acquire() as (connection, cursor):
+            self._flush_group(connection)
+            tx = Transaction(connection, cursor)
+            local.transaction = tx
+            try:
+                yield tx
+                if tx.rollback_only:
+                    raise TransactionError("Une instruction de la transaction a échoué")
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                local.transaction = None
+                if tx.touched is None or tx.touched:
+                    if self.cache is not None:
+                        self.cache.invalidate(tx.touched)
+                    if self.entities is not None:
+                        self.entities.invalidate(tx.touched)
+
+    def _flush_group(self, connection):
+        """Valider les écritures du commit groupé encore en attente sur la connexion partagée
+
+        À appeler verrou tenu, avant tout travail pouvant se terminer par un
+        ROLLBACK global (transaction, batch) : il n'emporte pas les autres.
+        """
+        if self.group_commit is not None and self.pool is None:
+            self.group_commit.flush(connection)
+
+    def in_transaction(self):
+        """Le thread courant est-il dans un bloc `transaction()` ?"""
+        return getattr(self._local, 'transaction', None) is not None
+
+    def _write(self, action, partial=False, tables=None, keys=None):
+        """Exécuter une écriture puis la valider selon le mode courant
+
+        - dans une transaction : pas de COMMIT, l'échec marque la transaction
+        - commit groupé : COMMIT partagé avec les autres threads
+        - sinon : COMMIT envoyé avec l'exécution (autocommit, un seul
+          aller-retour), ROLLBACK en cas d'erreur
+        `partial` protège par un SAVEPOINT les écritures pouvant échouer à moitié
+        (executemany) quand la connexion est partagée par le commit groupé.
+        `tables` : tables modifiées, pour invalider le cache (None: toutes) ;
+        `keys` : clés écrites par table (voir `_invalidate`).
+        """
+        tx = getattr(self._local, 'transaction', None)
+        group = self.group_commit if tx is None and self.pool is None else None
+        with self.acquire() as (connection, cursor):
+            try:
+                if group is not None and partial:
+                    cursor.execute("SAVEPOINT bda_batch")
+                if tx is None and group is None:
+                    connection.autocommit = True
+                    try:
+                        result = action(cursor)
+                    finally:
+                        connection.autocommit = False
+                else:
+                    result = action(cursor)
+            except Exception:
+                if tx is not None:
+                    tx.rollback_only = True
+                elif group is None:
+                    connection.rollback()
+                elif partial:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bda_batch")
+                raise
+            else:
+                if group is not None:
+                    epoch = group.written()
+            finally:
+                self._invalidate(tables, keys)
+        if group is not None:
+            group.commit(epoch)
+        return result
+
+    def fetch_columns(self, query, params=None, arraysize=None):
+        """Exécuter un SELECT et renvoyer le résultat par colonnes {NOM: tableau NumPy}
+
+        Noms et types viennent de cursor.description. Avec python-oracledb >= 3
+        et pyarrow, les données arrivent directement en colonnes Arrow (ni tuple
+        par ligne ni Decimal) ; sinon les lots `fetchmany` sont transposés.
+        """
+        table = self._fetch_table(query, params, arraysize)
+        if table is None or isinstance(table, dict):
+            return table
+        return {name: table.column(name).to_numpy(zero_copy_only=False)
+                for name in table.column_names}
+
+    def fetch_dataframe(self, query, params=None, arraysize=None, cached=False):
+        """Exécuter un SELECT et renvoyer un DataFrame pandas typé (colonnes nommées)"""
+        cache = self.cache if cached else None
+        key = "-- dataframe\n" + query
+        if cache is not None:
+            df = cache.get(key, params)
+            if df is not None:
+                return df.copy()
+            version = cache.version
+        table = self._fetch_table(query, params, arraysize)
+        if table is None:
+            return pd.DataFrame()
+        df = pd.DataFrame(table) if isinstance(table, dict) else table.to_pandas()
+        if cache is not None and not self.in_transaction():
+            cache.put(key, params, df.copy(), version,
+                      size=int(df.memory_usage(deep=True).sum()))
+        return df
+
+    def _fetch_table(self, query, params, arraysize):
+        """Table Arrow (fetch_df_all) ou dict de tableaux NumPy ; None en cas d'erreur"""
+        arraysize = arraysize or FETCH_CONFIG['arraysize']
+        start = time.perf_counter()
+        try:
+            with self.acquire() as (connection, _):
+                self.statement_cache.seen(connection, query)
+                if pyarrow is not None and hasattr(connection, 'fetch_df_all'):
+                    odf = connection.fetch_df_all(statement=query, parameters=params,
+                                                  arraysize=arraysize)
+                    table = pyarrow.Table.from_arrays(odf.column_arrays(), names=odf.column_names())
+                    rows = table.num_rows
+                else:
+                    table = self._fetch_numpy(connection, query, params, arraysize)
+                    rows = len(next(iter(table.values()))) if table else 0
+            self.metrics.record('columnar', query, time.perf_counter() - start, rows)
+            return table
         except Exception as e:
+            self.metrics.record('columnar', query, time.perf_counter() - start, error=True)
             print(f"❌ Erreur d'exécution: {e}")
             return None
-    
-    def execute_update(self, query, params=None):
-        """Exécuter une requête INSERT/UPDATE/DELETE"""
+
+    def _fetch_numpy(self, connection, query, params, arraysize):
+        """Transposer les lots fetchmany en tableaux NumPy par colonne"""
+        cursor = connection.cursor()
         try:
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize + 1
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            self.connection.commit()
-            return self.cursor.rowcount
+                cursor.execute(query)
+            names = [d[0] for d in cursor.description]
+            kinds = [_column_kind(d) for d in cursor.description]
+            parts = [[] for _ in names]
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for i, values in enumerate(zip(*rows)):
+                    parts[i].append(_to_array(values, kinds[i]))
+            return {name: _concat_column(chunks, kind)
+                    for name, kind, chunks in zip(names, kinds, parts)}
+        finally:
+            cursor.close()
+
+    def execute_update(self, query, params=None, keys=None):
+        """Exécuter une requête INSERT/UPDATE/DELETE (`keys` : voir `_invalidate`)"""
+        def action(cursor):
+            self.statement_cache.seen(cursor.connection, query)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            return cursor.rowcount
+
+        start = time.perf_counter()
+        try:
+            rows = self._write(action, tables=written_tables(query), keys=keys)
+            self.metrics.record('update', query, time.perf_counter() - start, rows)
+            return rows
+        except Exception as e:
+            self.metrics.record('update', query, time.perf_counter() - start, error=True)
+            if self.in_transaction():
+                raise
+            print(f"❌ Erreur d'exécution: {e}")
+            return None
+
+    def execute_returning(self, query, params=None, returning=None, tables=(), inputsizes=None,
+                          keys=None):
+        """Exécuter une écriture avec variables de sortie : DML ... RETURNING INTO
+        ou bloc PL/SQL (vérification et action côté serveur)
+
+        `params` : binds nommés ; `returning` : {nom du bind de sortie: type
+        Python}. Renvoie (lignes modifiées, {nom: valeur}), None en cas
+        d'erreur hors transaction. Hors transaction, un seul aller-retour.
+        `tables` : tables modifiées (par défaut, la cible du DML) ; `keys` :
+        clés écrites par table (voir `_invalidate`).
+        `inputsizes` : {nom du bind: type Python} fixé même quand la valeur
+        est None (sinon liée en VARCHAR2), pour garder un seul plan par texte.
+        """
+        returning = returning or {}
+
+        def action(cursor):
+            self.statement_cache.seen(cursor.connection, query)
+            if inputsizes:
+                cursor.setinputsizes(**inputsizes)
+            variables = {name: cursor.var(type_) for name, type_ in returning.items()}
+            cursor.execute(query, {**(params or {}), **variables})
+            values = {}
+            for name, variable in variables.items():
+                value = variable.getvalue()
+                # DML RETURNING : une valeur par ligne modifiée
+                if isinstance(value, list):
+                    value = value[0] if value else None
+                values[name] = value
+            return cursor.rowcount, values
+
+        start = time.perf_counter()
+        try:
+            result = self._write(action, tables=written_tables(query) if tables == () else tables,
+                                 keys=keys)
+            self.metrics.record('update', query, time.perf_counter() - start, result[0])
+            return result
         except Exception as e:
+            self.metrics.record('update', query, time.perf_counter() - start, error=True)
+            if self.in_transaction():
+                raise
             print(f"❌ Erreur d'exécution: {e}")
-            self.connection.rollback()
             return None
-    
+
     def execute_many(self, query, data_list):
         """Exécuter une requête en batch"""
+        def action(cursor):
+            self.statement_cache.seen(cursor.connection, query)
+            cursor.executemany(query, data_list)
+            return cursor.rowcount
+
+        start = time.perf_counter()
         try:
-            self.cursor.executemany(query, data_list)
-            self.connection.commit()
-            return self.cursor.rowcount
+            rows = self._write(action, partial=True, tables=written_tables(query))
+            self.metrics.record('batch', query, time.perf_counter() - start, rows)
+            return rows
         except Exception as e:
+            self.metrics.record('batch', query, time.perf_counter() - start, error=True)
+            if self.in_transaction():
+                raise
             print(f"❌ Erreur d'exécution batch: {e}")
-            self.connection.rollback()
             return None
-    
+
+    def execute_batch(self, query, rows, chunk_size=None, policy=None, row_counts=False,
+                      inputsizes=None, keys=None):
+        """Exécuter une requête en lots avec rapport d'erreurs par ligne
+
+        Les lignes sont envoyées par paquets de `chunk_size` (array DML) ;
+        le pilote collecte les erreurs ligne par ligne (batcherrors) au lieu
+        d'interrompre le lot. `policy` :
+        - 'partial' : les lignes correctes sont validées (COMMIT par paquet)
+        - 'atomic'  : une seule erreur annule tout (un seul COMMIT à la fin)
+        `row_counts` : nombre de lignes touchées par chaque ligne de `rows`
+        (arraydmlrowcounts, 0 si rejetée) dans `report.row_counts`.
+        `inputsizes` : types des binds nommés, comme pour execute_returning ;
+        `keys` : clés écrites par table (voir `_invalidate`).
+        Renvoie un BatchReport (indices des lignes rejetées dans `rows`).
+        """
+        chunk_size = chunk_size or BATCH_CONFIG['chunk_size']
+        policy = policy or BATCH_CONFIG['error_policy']
+        rows = rows if isinstance(rows, list) else list(rows)
+        report = BatchReport(len(rows), policy)
+        if row_counts:
+            report.row_counts = []
+        tx = getattr(self._local, 'transaction', None)
+        tables = written_tables(query)
+        start = time.perf_counter()
+        try:
+            with self.acquire() as (connection, cursor):
+                if tx is None:
+                    self._flush_group(connection)
+                try:
+                    for offset in range(0, len(rows), chunk_size):
+                        chunk = rows[offset:offset + chunk_size]
+                        chunk_start = time.perf_counter()
+                        self.statement_cache.seen(connection, query)
+                        if inputsizes:
+                            cursor.setinputsizes(**inputsizes)
+                        if row_counts:
+                            cursor.executemany(query, chunk, batcherrors=True, arraydmlrowcounts=True)
+                        else:
+                            cursor.executemany(query, chunk, batcherrors=True)
+                        errors = cursor.getbatcherrors()
+                        for error in errors:
+                            report.add_error(offset + error.offset, str(error.message).strip())
+                        if row_counts:
+                            report.row_counts.extend(_chunk_row_counts(cursor.getarraydmlrowcounts(),
+                                                                       len(chunk), errors))
+                        report.succeeded += len(chunk) - len(errors)
+                        report.chunks += 1
+                        self.metrics.record('batch', query, time.perf_counter() - chunk_start,
+                                            len(chunk) - len(errors), bool(errors))
+                        if tx is None and policy == 'partial':
+                            connection.commit()
+                            report.committed = True
+                    if policy == 'atomic' and report.errors:
+                        report.succeeded = 0
+                        if tx is not None:
+                            tx.rollback_only = True
+                        else:
+                            connection.rollback()
+                    else:
+                        if tx is None and policy == 'atomic':
+                            connection.commit()
+                        report.committed = tx is None
+                except Exception:
+                    if tx is not None:
+                        tx.rollback_only = True
+                    else:
+                        connection.rollback()
+                    raise
+                finally:
+                    self._invalidate(tables, keys)
+        except Exception as e:
+            self.metrics.record('batch', query, time.perf_counter() - start, error=True)
+            if tx is not None:
+                raise
+            print(f"❌ Erreur d'exécution batch: {e}")
+            # Les paquets suivants n'ont pas été envoyés, le paquet en cours a été annulé
+            report.aborted = True
+            report.committed = False
+            first = min(report.chunks * chunk_size, len(rows))
+            if policy == 'atomic':
+                report.succeeded = 0
+            report.errors.extend((index, f"paquet non appliqué: {e}") for index in range(first, len(rows)))
+        report.elapsed = time.perf_counter() - start
+        return report
+
     def call_procedure(self, proc_name, params=None):
         """Appeler une procédure stockée"""
-        try:
+        def action(cursor):
+            # callproc prépare "BEGIN proc(:1, ...); END;"
+            self.statement_cache.seen(cursor.connection, f"{proc_name}/{len(params or ())}")
             if params:
-                self.cursor.callproc(proc_name, params)
+                cursor.callproc(proc_name, params)
             else:
-                self.cursor.callproc(proc_name)
-            self.connection.commit()
+                cursor.callproc(proc_name)
             return True
+
+        start = time.perf_counter()
+        try:
+            result = self._write(action, tables=procedure_tables(proc_name))
+            self.metrics.record('procedure', proc_name, time.perf_counter() - start)
+            return result
         except Exception as e:
+            self.metrics.record('procedure', proc_name, time.perf_counter() - start, error=True)
+            if self.in_transaction():
+                raise
             print(f"❌ Erreur d'appel de procédure: {e}")
-            self.connection.rollback()
             return False
-    
+
+    def session_parse_stats(self):
+        """Compteurs d'analyse de la session côté serveur (v$mystat) :
+        {statistique: valeur}, None sans droit de lecture sur les vues V$"""
+        query = """
+            SELECT n.name, s.value
+            FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic#
+            WHERE n.name IN ('parse count (total)', 'parse count (hard)',
+                             'execute count', 'session cursor cache hits')
+        """
+        try:
+            with self.acquire() as (_, cursor):
+                cursor.execute(query)
+                return dict(cursor.fetchall())
+        except Exception:
+            return None
+
     def get_table_stats(self):
         """Obtenir les statistiques des tables"""
         query = """
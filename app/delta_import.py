@@ -0,0 +1,250 @@
+"""
+Import incrémental : seules les lignes ajoutées, modifiées ou supprimées
+depuis le dernier import sont appliquées (MERGE / DELETE en lot)
+"""
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import BATCH_CONFIG, CSV_FILES, IMPORT_CONFIG, STATE_DIR
+from csv_cache import read_table
+from csv_schema import CSV_SCHEMAS, to_bind_rows, merge_sql, delete_sql
+from loader import load_order
+
+HASH_COLUMN = '_hash'
+
+
+class DeltaReport:
+    """Résultat de l'import incrémental d'une table"""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def touched(self):
+        return self.inserted + self.updated + self.deleted
+
+    def summary(self, limit=5):
+        lines = [f"{self.inserted} insérée(s), {self.updated} modifiée(s), {self.deleted} supprimée(s), "
+                 f"{self.unchanged} inchangée(s) (référence: {self.source}, {self.elapsed:.2f}s)"]
+        for line, message in self.errors[:limit]:
+            lines.append(f"{line}: {message}")
+        if len(self.errors) > limit:
+            lines.append(f"... {len(self.errors) - limit} autre(s) erreur(s)")
+        return lines
+
+
+def fingerprint(rows, name):
+    """Clé primaire + empreinte (uint64) des autres colonnes de chaque ligne
+
+    Les valeurs sont normalisées par type (Int64, float64, dates, texte) pour
+    que lignes issues du CSV et lignes lues dans Oracle donnent la même empreinte.
+    """
+    schema = CSV_SCHEMAS[name]
+    columns = schema['columns']
+    frame = pd.DataFrame.from_records(rows, columns=[column.name for column in columns])
+    for column in columns:
+        values = frame[column.name]
+        if column.type == 'int':
+            frame[column.name] = pd.to_numeric(values).astype('Int64')
+        elif column.type == 'float':
+            frame[column.name] = pd.to_numeric(values).astype('float64')
+        elif column.type == 'date':
+            frame[column.name] = pd.to_datetime(values)
+        else:
+            frame[column.name] = values.astype('string')
+    key = list(schema['key'])
+    result = frame[key].copy()
+    others = [column.name for column in columns if column.name not in schema['key']]
+    result[HASH_COLUMN] = pd.util.hash_pandas_object(frame[others], index=False).to_numpy()
+    return result
+
+def snapshot_path(name, directory=None):
+    return os.path.join(directory or STATE_DIR, f"{name}.snapshot.pkl")
+
+def load_snapshot(name, directory=None):
+    """Empreintes du dernier import (None si aucun)"""
+    path = snapshot_path(name, directory)
+    return pd.read_pickle(path) if os.path.exists(path) else None
+
+def save_snapshot(name, frame, directory=None):
+    os.makedirs(directory or STATE_DIR, exist_ok=True)
+    frame.to_pickle(snapshot_path(name, directory))
+
+def live_fingerprint(db, name, chunk_rows=None):
+    """Empreintes calculées à partir du contenu actuel de la table"""
+    schema = CSV_SCHEMAS[name]
+    columns = schema['columns']
+    chunk_rows = chunk_rows or IMPORT_CONFIG['chunk_rows']
+    rows = db.iter_query(f"SELECT {', '.join(column.name for column in columns)} FROM {schema['table']}")
+    # Prix lus en centimes (ORACLE_PRICE_MODE=cents) : revenir aux euros du CSV
+    cents = [i for i, column in enumerate(columns)
+             if column.type == 'float' and db.type_handler is not None
+             and db.type_handler.kind(column.name, None, None) == 'cents']
+    parts = []
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            break
+        for i in cents:
+            chunk = [row[:i] + (None if row[i] is None else row[i] / 100,) + row[i + 1:] for row in chunk]
+        parts.append(fingerprint(chunk, name))
+    if not parts:
+        return fingerprint([], name)
+    return pd.concat(parts, ignore_index=True)
+
+def compute_delta(name, reference, path=None, chunk_rows=None):
+    """Comparer le CSV à la référence (clé + empreinte)
+
+    Renvoie (upserts, upsert_lines, is_new, deletes, new_snapshot, counts) :
+    lignes à fusionner avec leur numéro de ligne CSV et leur nature (insertion
+    ou mise à jour), clés à supprimer, empreintes du fichier et compteurs
+    {'inserted', 'updated', 'unchanged'}.
+    """
+    schema = CSV_SCHEMAS[name]
+    key = list(schema['key'])
+    old_index = pd.MultiIndex.from_frame(reference[key])
+    old_hash = reference[HASH_COLUMN].to_numpy()
+    seen = np.zeros(len(reference), dtype=bool)
+    upserts, upsert_lines, is_new, parts = [], [], [], []
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    offset = 0
+    for df in read_table(path or CSV_FILES[name], name, chunksize=chunk_rows or IMPORT_CONFIG['chunk_rows']):
+        rows = to_bind_rows(df, name)
+        current = fingerprint(rows, name)
+        positions = old_index.get_indexer(pd.MultiIndex.from_frame(current[key]))
+        found = positions >= 0
+        seen[positions[found]] = True
+        new = ~found
+        changed = found.copy()
+        changed[found] = old_hash[positions[found]] != current[HASH_COLUMN].to_numpy()[found]
+        counts['inserted'] += int(new.sum())
+        counts['updated'] += int(changed.sum())
+        counts['unchanged'] += int(found.sum() - changed.sum())
+        for i in np.flatnonzero(new | changed):
+            upserts.append(rows[i])
+            upsert_lines.append(offset + int(i) + 2)  # en-tête + numérotation à partir de 1
+            is_new.append(bool(new[i]))
+        parts.append(current)
+        offset += len(rows)
+    # astype(object) : valeurs Python (int, str) pour les binds
+    deletes = list(reference.loc[~seen, key].astype(object).itertuples(index=False, name=None))
+    snapshot = pd.concat(parts, ignore_index=True) if parts else reference.iloc[:0]
+    snapshot = snapshot.drop_duplicates(key, keep='last')
+    return upserts, upsert_lines, is_new, deletes, snapshot, counts
+
+def delta_import(db, names=None, source=None, files=None, directory=None):
+    """Importer seulement les différences entre les CSV et la référence
+
+    `source` : 'snapshot' (empreintes du dernier import), 'live' (contenu
+    actuel des tables) ou 'auto' (snapshot s'il existe, sinon live).
+    Fusions (MERGE) dans l'ordre des clés étrangères, suppressions dans
+    l'ordre inverse. Renvoie {nom: DeltaReport}.
+    """
+    names = [name for wave in load_order(names) for name in wave]
+    source = source or IMPORT_CONFIG['delta_source']
+    files = files or {}
+    reports, deltas = {}, {}
+    for name in names:
+        start = time.perf_counter()
+        reference = load_snapshot(name, directory) if source in ('auto', 'snapshot') else None
+        table_source = 'snapshot'
+        if reference is None:
+            if source == 'snapshot':
+                print(f"   ⚠️  {name}: pas de snapshot, comparaison avec la table")
+            reference = live_fingerprint(db, name)
+            table_source = 'table'
+        report = reports[name] = DeltaReport(name, table_source)
+        upserts, lines, is_new, deletes, snapshot, counts = compute_delta(name, reference, files.get(name))
+        report.inserted, report.updated, report.unchanged = (counts['inserted'], counts['updated'],
+                                                             counts['unchanged'])
+        deltas[name] = (upserts, lines, is_new, deletes, snapshot, reference)
+        report.elapsed = time.perf_counter() - start
+
+    chunk_size = BATCH_CONFIG['chunk_size']
+    failed_keys = {}
+    # Tables dont un lot a été interrompu : snapshot non écrit (tout est recomparé)
+    interrupted = set()
+    for name in names:
+        upserts, lines, is_new, _, _, _ = deltas[name]
+        start = time.perf_counter()
+        failed_keys[name] = set()
+        if upserts:
+            batch = db.execute_batch(merge_sql(name), upserts, chunk_size=chunk_size, policy='partial')
+            report = reports[name]
+            key_positions = _key_positions(name)
+            for index, message in _failed_rows(batch, len(upserts), chunk_size):
+                report.errors.append((f"ligne {lines[index]}", message))
+                failed_keys[name].add(tuple(upserts[index][i] for i in key_positions))
+                if is_new[index]:
+                    report.inserted -= 1
+                else:
+                    report.updated -= 1
+            if batch.aborted:
+                report.errors.append(("MERGE", "lot interrompu"))
+                interrupted.add(name)
+        reports[name].elapsed += time.perf_counter() - start
+
+    kept_deletes = {}
+    for name in reversed(names):
+        _, _, _, deletes, _, _ = deltas[name]
+        start = time.perf_counter()
+        kept_deletes[name] = []
+        if deletes:
+            batch = db.execute_batch(delete_sql(name), deletes, chunk_size=chunk_size, policy='partial')
+            report = reports[name]
+            for index, message in _failed_rows(batch, len(deletes), chunk_size):
+                report.errors.append((f"suppression {deletes[index]}", message))
+                kept_deletes[name].append(index)
+            # Politique partial : les paquets envoyés avant une interruption sont validés
+            report.deleted = len(deletes) - len(kept_deletes[name])
+            if batch.aborted:
+                report.errors.append(("DELETE", "lot interrompu"))
+                interrupted.add(name)
+        reports[name].elapsed += time.perf_counter() - start
+
+    for name in names:
+        _, _, _, deletes, snapshot, reference = deltas[name]
+        if name in interrupted:
+            print(f"   ⚠️  {name}: lot interrompu, snapshot conservé (prochain import recomparé)")
+            continue
+        key = list(CSV_SCHEMAS[name]['key'])
+        if failed_keys[name]:
+            # Lignes rejetées : retentées au prochain import (le MERGE les insère ou les met à jour)
+            rejected = snapshot[key].apply(tuple, axis=1).isin(failed_keys[name])
+            snapshot = snapshot[~rejected.to_numpy()]
+        if kept_deletes[name]:
+            # Suppressions en échec : la ligne existe toujours, la garder dans le snapshot
+            missing = reference[key].apply(tuple, axis=1).isin({deletes[i] for i in kept_deletes[name]})
+            snapshot = pd.concat([snapshot, reference[missing.to_numpy()]], ignore_index=True)
+        save_snapshot(name, snapshot, directory)
+    return reports
+
+def _failed_rows(batch, total, chunk_size):
+    """Indices des lignes non appliquées : rejetées, ou dans un paquet que
+    l'interruption du lot a empêché d'envoyer"""
+    failed = {index: message for index, message in batch.errors}
+    for index in range(min(batch.chunks * chunk_size, total), total):
+        failed.setdefault(index, "paquet non appliqué")
+    return sorted(failed.items())
+
+def clear_snapshots(names=None, directory=None):
+    """Oublier les empreintes (après un import complet : la table fait référence)"""
+    for name in names or CSV_SCHEMAS:
+        path = snapshot_path(name, directory)
+        if os.path.exists(path):
+            os.remove(path)
+
+def _key_positions(name):
+    columns = [column.name for column in CSV_SCHEMAS[name]['columns']]
+    return [columns.index(column) for column in CSV_SCHEMAS[name]['key']]
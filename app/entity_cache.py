@@ -0,0 +1,129 @@
+"""
+Cache d'entités (identity map) des lignes de référence lues par clé primaire
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Tables de référence gardées en mémoire (noms comme written_tables)
+ENTITY_TABLES = ('CLIENT', 'VOITURE', 'PROPRIETAIRE')
+
+
+class EntityCache:
+    """Une ligne par clé primaire et par table, LRU borné à `max_entries` par table
+
+    Écriture directe : les CRUD remplacent l'entrée par la nouvelle image de
+    la ligne (UPDATE ... RETURNING) ou l'évincent. Les autres écritures
+    passant par Database vident les tables touchées (triggers compris).
+    `verify_s` : une entrée plus ancienne est revalidée par ORA_ROWSCN avant
+    d'être servie (0 = jamais) ; ORA_ROWSCN suit le bloc, une ligne voisine
+    modifiée provoque donc une relecture de trop, jamais une donnée périmée.
+    """
+
+    def __init__(self, max_entries=4096, verify_s=0.0, tables=ENTITY_TABLES):
+        self.max_entries = max_entries
+        self.verify_s = verify_s
+        self.lock = threading.Lock()
+        self.entries = {table: OrderedDict() for table in tables}
+        # Incrémenté à chaque invalidation : une ligne lue avant n'est pas gardée
+        self.generations = dict.fromkeys(tables, 0)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def tracks(self, table):
+        return table.upper() in self.entries
+
+    def get(self, table, key, load, version=None):
+        """Ligne `key` de `table` : depuis le cache, sinon `load(key)`
+
+        `load(key)` -> (enregistrement, ORA_ROWSCN) ou None si introuvable ;
+        `version(key)` -> ORA_ROWSCN actuel, appelé pour revalider une entrée
+        plus ancienne que `verify_s`. Les exceptions de `load` remontent.
+        """
+        table = table.upper()
+        with self.lock:
+            entries = self.entries[table]
+            generation = self.generations[table]
+            entry = entries.get(key)
+            if entry is not None:
+                entries.move_to_end(key)
+                record, scn, checked = entry
+                if not self.verify_s or version is None or time.monotonic() - checked < self.verify_s:
+                    self.hits += 1
+                    return record
+        if entry is not None:
+            current = version(key)
+            with self.lock:
+                if scn is not None and current == scn:
+                    self.hits += 1
+                    if entries.get(key) is entry:
+                        entries[key] = (record, scn, time.monotonic())
+                    return record
+                self.stale += 1
+                if entries.get(key) is entry:
+                    del entries[key]
+        with self.lock:
+            self.misses += 1
+        loaded = load(key)
+        if loaded is None:
+            return None
+        record, scn = loaded
+        self.put(table, key, record, scn, generation)
+        return record
+
+    def put(self, table, key, record, scn=None, generation=None):
+        """Garder `record` (image validée de la ligne) ; ignoré si la table a
+        été invalidée depuis `generation` (lecture concurrente d'une écriture)"""
+        table = table.upper()
+        with self.lock:
+            if generation is not None and generation != self.generations[table]:
+                return
+            entries = self.entries[table]
+            entries[key] = (record, scn, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, table, key):
+        table = table.upper()
+        with self.lock:
+            self.generations[table] += 1
+            self.entries[table].pop(key, None)
+
+    def invalidate(self, tables=None, keys=None):
+        """Après une écriture sur `tables` (None: toutes)
+
+        `keys` : {table: clés écrites} quand l'appelant les connaît (CRUD) ;
+        seules ces entrées sont évincées, les autres tables sont vidées.
+        """
+        keys = keys or {}
+        with self.lock:
+            for table in self.entries if tables is None else tables:
+                if table not in self.entries:
+                    continue
+                self.generations[table] += 1
+                entries = self.entries[table]
+                if table in keys:
+                    for key in keys[table]:
+                        entries.pop(key, None)
+                elif entries:
+                    entries.clear()
+                    self.invalidations += 1
+
+    def stats(self):
+        """Compteurs pour les métriques"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'stale': self.stale,
+                'entries': sum(len(entries) for entries in self.entries.values()),
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Générateur de jeux de données synthétiques au format des CSV du projet
+Usage: python app/generate_data.py [table=lignes ...] [seed=N] [workers=N] [out=dossier]
+Ex:    python app/generate_data.py client=1000000 voiture=500000 location=100000000
+"""
+import math
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le dossier app au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+
+from config import GENERATOR_CONFIG
+from csv_schema import CSV_SCHEMAS, NULL_TOKENS
+
+DEFAULT_SIZES = {'proprietaire': 1_000, 'client': 10_000, 'voiture': 5_000, 'location': 100_000}
+
+# Période des locations : dates fixes pour que le jeu ne dépende que de la graine
+FIRST_DAY = np.datetime64('2005-01-01')
+LAST_DAY = np.datetime64('2024-12-31')
+HORIZON = int((LAST_DAY - FIRST_DAY).astype(int)) + 1
+
+VILLES = ('Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nice', 'Nantes', 'Bordeaux', 'Lille',
+          'Strasbourg', 'Montpellier', 'Rennes', 'Neuilly', 'Montreuil', 'Versailles',
+          'Grenoble', 'Dijon', 'Angers', 'Nîmes', 'Reims', 'Brest')
+NOMS = ('Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand',
+        'Leroy', 'Moreau', 'Simon', 'Laurent', 'Lefebvre', 'Michel', 'Garcia', 'David',
+        'Bertrand', 'Roux', 'Vincent', 'Fournier', 'Juniot', 'Delon', 'Auteuil')
+PRENOMS = ('Marie', 'Jean', 'Pierre', 'Camille', 'Lucas', 'Léa', 'Hugo', 'Chloé', 'Louis',
+           'Emma', 'Paul', 'Inès', 'Jules', 'Sarah', 'Gérard', 'Alain', 'Daniel', 'Nathalie')
+RUES = ('rue des tuiles', 'rue des plantes', 'rue du colisée', 'avenue de la gare',
+        'boulevard Voltaire', 'rue de la paix', 'place de la mairie', 'chemin des vignes')
+PSEUDOS = ('jules', 'fred', 'christian', 'lulu', 'nico', 'sam', 'max', 'jo', 'alex', 'vinz')
+DOMAINES = ('hotmail.com', 'gmail.com', 'orange.fr', 'free.fr', 'laposte.net')
+COULEURS = ('Blanc', 'Noir', 'Gris', 'Rouge', 'Bleu', 'Vert', 'Argent')
+# (marque, modèle, catégorie, places, prix journalier de base)
+MODELES = (
+    ('Renault', 'Clio', 'citadine', 5, 30.0), ('Renault', 'Twingo', 'citadine', 4, 25.0),
+    ('Peugeot', '208', 'citadine', 5, 32.0), ('Peugeot', '3008', 'SUV', 5, 55.0),
+    ('Citroën', 'C3', 'citadine', 5, 29.0), ('Citroën', 'Berlingo', 'utilitaire', 5, 45.0),
+    ('Volkswagen', 'Golf', 'berline', 5, 40.0), ('Toyota', 'Yaris', 'citadine', 5, 31.0),
+    ('Renault', 'Espace', 'monospace', 7, 65.0), ('BMW', 'Série 5', 'luxe', 5, 110.0),
+    ('Mercedes', 'Classe E', 'premium', 5, 120.0), ('Tesla', 'Model 3', 'premium', 5, 95.0),
+    ('Ford', 'Transit', 'utilitaire', 9, 70.0), ('Mazda', 'MX-5', 'luxe', 2, 85.0),
+)
+AVIS = {1: ('très déçu', 'à éviter'), 2: ('décevant', 'voiture sale'), 3: ('correct', 'moyen'),
+        4: ('bien', 'satisfait'), 5: ('parfait', 'excellent', 'très satisfait')}
+# Distribution des notes en J (beaucoup de 5, quelques 1 mécontents)
+NOTE_WEIGHTS = np.array([0.08, 0.05, 0.12, 0.30, 0.45])
+NO_NOTE = 0.25          # locations sans note ni avis
+ROUND_TRIP = 0.6        # retour dans la ville de départ
+REGULAR_CLIENT = 0.3    # location par un habitué de la voiture
+REGULARS = 3            # habitués par voiture
+
+_TABLES = tuple(CSV_SCHEMAS)
+
+
+def zipf_weights(n, s=1.0):
+    """Poids décroissants 1/rang^s (villes, modèles... : quelques valeurs dominent)"""
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+def skewed_index(rng, n, size, exponent):
+    """Indices dans [0, n) concentrés sur les premiers rangs (exponent > 1),
+    dispersés par une permutation fixe pour que les plus fréquents ne soient
+    pas les premiers codes"""
+    rank = np.minimum((n * rng.random(size) ** exponent).astype(np.int64), n - 1)
+    return scatter(rank, n)
+
+def scatter(rank, n):
+    """Permutation déterministe de [0, n) : rang * a mod n, a premier avec n"""
+    a = 7_919
+    while math.gcd(a, n) != 1:
+        a += 2
+    return rank * a % n
+
+def _text(prefix, numbers):
+    return np.array([f"{prefix}{number}" for number in numbers.tolist()], dtype=object)
+
+def _pick(values, index):
+    return np.asarray(values, dtype=object)[index]
+
+def immat(numbers):
+    """Immatriculations AA-000-AA distinctes pour des numéros distincts"""
+    letters = np.array(list('ABCDEFGHJKLMNPQRSTVWXYZ'), dtype=object)
+    base = len(letters)
+    digits = pd.Series(numbers % 1000).astype(str).str.zfill(3)
+    rest = numbers // 1000
+    parts = [letters[rest // base ** k % base] for k in range(4)]
+    return (pd.Series(parts[3] + parts[2]) + '-' + digits + '-'
+            + pd.Series(parts[1] + parts[0]))
+
+def proprietaires(rng, start, stop, sizes):
+    n = stop - start
+    codes = np.arange(start, stop)
+    pseudo = _pick(PSEUDOS, rng.integers(0, len(PSEUDOS), n))
+    email = pd.Series(pseudo) + '.' + pd.Series(codes).astype(str) + '@' + \
+        pd.Series(_pick(DOMAINES, rng.choice(len(DOMAINES), n, p=zipf_weights(len(DOMAINES)))))
+    email[rng.random(n) < 0.05] = None  # email facultatif
+    return pd.DataFrame({
+        'codeP': _text('P', codes),
+        'Pseudo': pseudo,
+        'email': email,
+        'ville': _pick(VILLES, rng.choice(len(VILLES), n, p=zipf_weights(len(VILLES)))),
+        'anneeI': rng.integers(2000, 2025, n).astype(np.float64),
+    })
+
+def clients(rng, start, stop, sizes):
+    n = stop - start
+    codes = np.arange(start, stop)
+    return pd.DataFrame({
+        'CodeC': _text('C', codes),
+        'Nom': _pick(NOMS, rng.choice(len(NOMS), n, p=zipf_weights(len(NOMS), 0.7))),
+        'Prenom': _pick(PRENOMS, rng.integers(0, len(PRENOMS), n)),
+        'age': np.clip(rng.normal(42, 14, n), 18, 90).astype(np.int64),
+        'Permis': pd.Series(rng.integers(100_000, 10_000_000, n)).astype(str),
+        'Adresse': pd.Series(rng.integers(1, 200, n)).astype(str) + ' ' +
+                   pd.Series(_pick(RUES, rng.integers(0, len(RUES), n))),
+        'Ville': _pick(VILLES, rng.choice(len(VILLES), n, p=zipf_weights(len(VILLES)))),
+    })
+
+def voitures(rng, start, stop, sizes):
+    n = stop - start
+    model = rng.choice(len(MODELES), n, p=zipf_weights(len(MODELES), 0.8))
+    catalog = pd.DataFrame(MODELES, columns=['Marque', 'modele', 'Categorie', 'places', 'prix'])
+    chosen = catalog.iloc[model].reset_index(drop=True)
+    achat = rng.integers(1995, 2025, n)
+    return pd.DataFrame({
+        'Immat': immat(np.arange(start, stop)),
+        'modele': chosen['modele'],
+        'Marque': chosen['Marque'],
+        'Categorie': chosen['Categorie'],
+        'couleur': _pick(COULEURS, rng.choice(len(COULEURS), n, p=zipf_weights(len(COULEURS)))),
+        'places': chosen['places'],
+        'achatA': achat.astype(np.float64),
+        'compteur': ((2025 - achat) * rng.gamma(4, 3_000, n)).astype(np.int64),
+        'prixJ': np.round(chosen['prix'] * rng.uniform(0.8, 1.3, n)),
+        # Quelques propriétaires possèdent beaucoup de voitures
+        'codeP': _text('P', skewed_index(rng, sizes['proprietaire'], n, 3.0)),
+    })
+
+def rentals_per_car(seed, sizes):
+    """Nombre de locations de chaque voiture (loi log-normale : quelques
+    voitures très demandées), total exact et au plus une location par jour"""
+    n_cars, total = sizes['voiture'], sizes['location']
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(len(_TABLES),)))
+    weights = rng.lognormal(0.0, 1.0, n_cars)
+    counts = rng.multinomial(total, weights / weights.sum())
+    # Voitures trop demandées : le surplus va aux suivantes
+    excess = int(np.maximum(counts - HORIZON, 0).sum())
+    counts = np.minimum(counts, HORIZON)
+    while excess:
+        room = np.flatnonzero(counts < HORIZON)[:excess]
+        counts[room] += 1
+        excess -= len(room)
+    return counts
+
+def _per_car_offset(values, first, counts):
+    """Somme cumulée exclusive de `values` remise à zéro à chaque voiture"""
+    exclusive = np.cumsum(values) - values
+    return exclusive - exclusive[np.repeat(first, counts)]
+
+def locations(rng, car_start, counts, row_start, sizes):
+    """Locations des voitures [car_start, car_start + len(counts))
+
+    Les intervalles [dated, datef] d'une même voiture ne se chevauchent pas
+    (trg_location_verif) : durées tirées puis départs triés dans l'espace
+    libre restant, séparés d'au moins un jour.
+    """
+    n = int(counts.sum())
+    car = np.repeat(np.arange(car_start, car_start + len(counts)), counts)
+    first = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    # Durées : surtout courtes, plafonnées pour que tout tienne dans la période
+    max_days = np.repeat(np.maximum((HORIZON - counts) // np.maximum(counts, 1), 0), counts)
+    duree = np.minimum(np.minimum(rng.geometric(0.25, n) - 1, 30), max_days)
+    busy = np.bincount(car - car_start, weights=duree + 1, minlength=len(counts)).astype(np.int64)
+    free = np.repeat(HORIZON - busy, counts)
+    slack = rng.integers(0, free + 1)
+    slack = slack[np.lexsort((slack, car))]  # trié par voiture
+    dated = FIRST_DAY + slack + _per_car_offset(duree + 1, first, counts)
+    datef = dated + duree
+
+    # Clients : quelques habitués par voiture, sinon un client plutôt fidèle
+    n_clients = sizes['client']
+    client = skewed_index(rng, n_clients, n, 2.5)
+    regular = rng.random(n) < REGULAR_CLIENT
+    client[regular] = scatter((car[regular] * REGULARS + rng.integers(0, REGULARS, regular.sum())) % n_clients,
+                              n_clients)
+
+    weights = zipf_weights(len(VILLES))
+    villed = rng.choice(len(VILLES), n, p=weights)
+    villea = np.where(rng.random(n) < ROUND_TRIP, villed, rng.choice(len(VILLES), n, p=weights))
+    distance = np.where(villed == villea, 0, 20 + (villed * 31 + villea * 17) % 50 * 15)
+    km = (distance + (duree + 1) * rng.gamma(2.0, 40.0, n)).astype(np.int64)
+
+    note = rng.choice(np.arange(1, 6), n, p=NOTE_WEIGHTS)
+    rated = rng.random(n) >= NO_NOTE
+    avis = np.full(n, None, dtype=object)
+    for value, texts in AVIS.items():
+        mask = rated & (note == value)
+        avis[mask] = _pick(texts, rng.integers(0, len(texts), mask.sum()))
+    months = dated.astype('datetime64[M]').astype(np.int64)
+    return pd.DataFrame({
+        'CodeC': _text('C', client),
+        'immat': immat(np.arange(car_start, car_start + len(counts))).to_numpy()[car - car_start],
+        'annee': months // 12 + 1970,
+        'mois': months % 12 + 1,
+        # numLoc unique : la clé primaire l'est aussi
+        'numloc': _text('L', np.arange(row_start, row_start + n)),
+        'km': km,
+        'duree': duree,
+        'villed': _pick(VILLES, villed),
+        'villea': _pick(VILLES, villea),
+        'dated': np.datetime_as_string(dated, unit='D'),
+        'datef': np.datetime_as_string(datef, unit='D'),
+        'note': pd.Series(note, dtype='Int64').where(pd.Series(rated)),
+        'avis': avis,
+    })
+
+GENERATORS = {'proprietaire': proprietaires, 'client': clients, 'voiture': voitures}
+
+def _header(name):
+    return ";".join(column.csv for column in CSV_SCHEMAS[name]['columns'])
+
+def _write_block(task):
+    """Générer un bloc dans un fichier partiel (processus de travail)"""
+    name, block, part, seed, sizes, args = task
+    # Un générateur par (table, bloc) : le résultat ne dépend pas du processus
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(_TABLES.index(name), block)))
+    if name == 'location':
+        df = locations(rng, *args, sizes)
+    else:
+        df = GENERATORS[name](rng, *args, sizes)
+    df.to_csv(part, sep=';', index=False, header=False, na_rep=NULL_TOKENS[0])
+    return name, part, len(df)
+
+def tasks(sizes, seed, block_rows, directory):
+    """Blocs à générer, dans l'ordre des fichiers"""
+    for name in _TABLES:
+        if name == 'location':
+            counts = rentals_per_car(seed, sizes)
+            ends = np.cumsum(counts)
+            # Blocs de ~block_rows lignes, coupés entre deux voitures
+            cuts = np.unique(np.searchsorted(ends, np.arange(block_rows, sizes[name], block_rows)) + 1)
+            bounds = [0, *cuts[cuts < len(counts)].tolist(), len(counts)]
+            blocks = [(start, counts[start:stop], int(ends[start - 1]) if start else 0)
+                      for start, stop in zip(bounds, bounds[1:])]
+        else:
+            blocks = [(start, min(start + block_rows, sizes[name]))
+                      for start in range(0, sizes[name], block_rows)]
+        for block, args in enumerate(blocks):
+            yield name, block, os.path.join(directory, f".{name}.{block}.part"), seed, sizes, args
+
+def generate(sizes=None, seed=None, workers=None, block_rows=None, directory=None, progress=None):
+    """Écrire les 4 CSV dans `directory` ; renvoie {nom: (chemin, lignes)}
+
+    Les blocs sont générés en parallèle puis ajoutés au fichier dans l'ordre,
+    au fur et à mesure : la mémoire dépend de `block_rows`, pas de la taille
+    du jeu. Même graine et même `block_rows` : fichiers identiques.
+    """
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    seed = GENERATOR_CONFIG['seed'] if seed is None else seed
+    workers = workers or GENERATOR_CONFIG['workers']
+    block_rows = block_rows or GENERATOR_CONFIG['block_rows']
+    directory = directory or GENERATOR_CONFIG['directory']
+    for name in ('proprietaire', 'client', 'voiture'):
+        if sizes[name] < 1:
+            raise ValueError(f"{name}: au moins une ligne (référencée par les autres tables)")
+    if sizes['location'] > sizes['voiture'] * HORIZON:
+        raise ValueError(f"{sizes['location']} locations pour {sizes['voiture']} voitures : "
+                         f"au plus {HORIZON} par voiture (une par jour)")
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, f"{name}.csv") for name in _TABLES}
+    outputs = {name: open(paths[name] + '.tmp', 'w', encoding='utf-8') for name in _TABLES}
+    written = dict.fromkeys(_TABLES, 0)
+    try:
+        for name, f in outputs.items():
+            f.write(_header(name) + "\n")
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(workers) as pool:
+            for name, part, rows in pool.imap(_write_block, tasks(sizes, seed, block_rows, directory)):
+                with open(part, encoding='utf-8') as f:
+                    outputs[name].write(f.read())
+                os.remove(part)
+                written[name] += rows
+                if progress:
+                    progress(name, written[name], sizes[name])
+    finally:
+        for f in outputs.values():
+            f.close()
+    for name in _TABLES:
+        os.replace(paths[name] + '.tmp', paths[name])
+    return {name: (paths[name], written[name]) for name in _TABLES}
+
+def main():
+    """Générer un jeu de données (tailles et options en `clé=valeur`)"""
+    sizes, options = {}, {}
+    for arg in sys.argv[1:]:
+        key, _, value = arg.partition('=')
+        if key in CSV_SCHEMAS:
+            sizes[key] = int(value.replace('_', ''))
+        elif key in ('seed', 'workers', 'block_rows'):
+            options[key] = int(value)
+        elif key == 'out':
+            options['directory'] = value
+        else:
+            print(f"❌ Option inconnue: {key} ({', '.join([*CSV_SCHEMAS, 'seed', 'workers', 'block_rows', 'out'])})")
+            return
+    print("="*60)
+    print("🎲 Génération de données synthétiques")
+    print("="*60)
+    last = {}
+
+    def progress(name, rows, total):
+        if rows == total or time.perf_counter() - last.get(name, 0) > 2:
+            last[name] = time.perf_counter()
+            print(f"   {name}: {rows:,}/{total:,}")
+
+    start = time.perf_counter()
+    try:
+        files = generate(sizes, progress=progress, **options)
+    except ValueError as e:
+        print(f"   ❌ {e}")
+        return
+    elapsed = time.perf_counter() - start
+    total = sum(rows for _, rows in files.values())
+    for name, (path, rows) in files.items():
+        print(f"   ✓ {name}: {rows:,} lignes -> {path}")
+    print(f"\n✅ {total:,} lignes en {elapsed:.1f}s ({total / elapsed:,.0f} lignes/s)")
+    print(f"   Import: CSV_DIR={os.path.dirname(files['location'][0])} python app/import_data.py")
+
+
+if __name__ == "__main__":
+    main()
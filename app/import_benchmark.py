@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'import par phase (pilote local, sans serveur Oracle)
+Usage: python app/import_benchmark.py [sizes=N,N] [batches=N,N] [tables=nom,nom] [repeat=N]
+                                      [compare=resultats.json] [tolerance=%] [latency_ms=N]
+"""
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le dossier app au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import child_result, print_table
+from config import CSV_CACHE_CONFIG, METRICS_DIR
+from csv_schema import CSV_SCHEMAS
+from database import Database
+from generate_data import generate
+from loader import stream_csv
+from local_driver import LocalDriver
+from optimizer_stats import gather
+
+# On mesure le parsing : pas de cache des CSV
+CSV_CACHE_CONFIG['enabled'] = False
+
+# 'write' : execute_batch, executemany et COMMIT en un aller-retour (autocommit)
+PHASES = ('parse', 'convert', 'write', 'stats')
+DEFAULT_SIZES = (100_000, 1_000_000)
+DEFAULT_BATCHES = (1_000, 10_000, 50_000)
+SEED = 42
+REPEAT = 3
+# Écart toléré (en %) avant de signaler une régression de débit, sur les
+# mesures d'au moins MIN_SECONDS (en dessous, le bruit domine)
+TOLERANCE = 10.0
+MIN_SECONDS = 0.2
+
+
+def dataset_sizes(n_locations):
+    """Tailles des 4 tables pour un jeu de `n_locations` locations"""
+    return {'proprietaire': max(n_locations // 200, 10), 'client': max(n_locations // 10, 10),
+            'voiture': max(n_locations // 20, 10), 'location': n_locations}
+
+def _responder(counts):
+    """Réponses du pilote local pour optimizer_stats : tables jamais analysées,
+    lignes chargées vues comme insérées (USER_TAB_MODIFICATIONS)"""
+    def respond(sql, params):
+        if 'user_tab_modifications' in sql:
+            return [(table.upper(), None, None, rows, 0, 0, 'NO')
+                    for table, rows in counts.items() if table.upper() in params]
+        return []
+    return respond
+
+def measure_table(name, path, batch_size, latency, row_latency):
+    """Importer un CSV avec le vrai chargeur (stream_csv, paquets de
+    `batch_size` lignes écrits par execute_batch) et chronométrer ses phases"""
+    table = CSV_SCHEMAS[name]['table']
+    counts = {}
+    driver = LocalDriver(responder=_responder(counts), latency=latency, row_latency=row_latency)
+    db = Database(driver=driver)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.connect()
+    timings = {}
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    loaded = stream_csv(db, name, path, chunk_rows=batch_size, policy='partial', timings=timings)
+    rows = counts[table] = loaded.total
+    t = time.perf_counter()
+    report = gather(db, [table], stale_pct=0)
+    timings['stats'] = time.perf_counter() - t
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.disconnect()
+    return {
+        'table': name,
+        'rows': rows,
+        'batch_size': batch_size,
+        'phases': {phase: timings.get(phase, 0.0) for phase in PHASES},
+        'total_s': total,
+        'rows_per_s': rows / total if total else 0.0,
+        'peak_rss_mb': (rss_after - rss_before) / 1024,
+        'round_trips': driver.round_trips,
+        'commits': driver.commits,
+        'stats_gathered': list(report.gathered),
+    }
+
+def _child(queue, *args):
+    """Processus enfant : une mesure, pic RSS isolé"""
+    try:
+        queue.put(measure_table(*args))
+    except Exception as e:
+        queue.put(e)
+
+def measure(ctx, *args):
+    """measure_table dans un processus enfant (pic RSS propre à la mesure)"""
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, *args))
+    proc.start()
+    result = child_result(queue, proc)
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def run(sizes=DEFAULT_SIZES, batches=DEFAULT_BATCHES, tables=None,
+        latency=0.0, row_latency=0.0, seed=SEED, repeat=REPEAT, progress=None):
+    """Mesurer chaque (taille du jeu, table, taille de lot) dans un processus séparé
+
+    Le jeu est produit par generate_data avec une graine fixe : deux exécutions
+    mesurent exactement les mêmes fichiers. Chaque mesure est répétée `repeat`
+    fois et la plus rapide est gardée (le bruit ne fait que ralentir).
+    Renvoie le document JSON des résultats.
+    """
+    tables = list(tables or CSV_SCHEMAS)
+    ctx = multiprocessing.get_context('fork')
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_locations in sizes:
+            files = generate(dataset_sizes(n_locations), seed=seed, directory=tmp)
+            for name in tables:
+                path = files[name][0]
+                for batch_size in batches:
+                    result = min((measure(ctx, name, path, batch_size, latency, row_latency)
+                                  for _ in range(repeat)), key=lambda r: r['total_s'])
+                    result['dataset'] = n_locations
+                    results.append(result)
+                    if progress:
+                        progress(result)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                        'numpy': np.__version__, 'machine': platform.machine(),
+                        'cpus': os.cpu_count()},
+        'parameters': {'sizes': list(sizes), 'batches': list(batches), 'tables': tables,
+                       'latency_s': latency, 'row_latency_s': row_latency, 'seed': seed,
+                       'repeat': repeat},
+        'results': results,
+    }
+
+def _key(result):
+    return result['dataset'], result['table'], result['batch_size']
+
+def compare(current, baseline, tolerance=TOLERANCE, min_seconds=MIN_SECONDS):
+    """Comparer deux exécutions : [(dataset, table, lot, débit avant, débit après,
+    écart %, phase la plus dégradée)] et la liste des régressions (mesures de
+    moins de `min_seconds` exclues)"""
+    previous = {_key(result): result for result in baseline['results']}
+    rows, regressions = [], []
+    for result in current['results']:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        change = (result['rows_per_s'] / before['rows_per_s'] - 1) * 100 if before['rows_per_s'] else 0.0
+        worst = max(PHASES, key=lambda phase: result['phases'][phase] - before['phases'].get(phase, 0.0))
+        row = (*_key(result), before['rows_per_s'], result['rows_per_s'], change, worst)
+        rows.append(row)
+        if change < -tolerance and min(result['total_s'], before['total_s']) >= min_seconds:
+            regressions.append(row)
+    return rows, regressions
+
+def save(document, directory=METRICS_DIR):
+    """Écrire les résultats dans `directory` (un fichier par exécution)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"import_bench_{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+def print_results(document):
+    """Tableau des mesures : durée et part de chaque phase, débit, pic mémoire"""
+    rows = []
+    for r in document['results']:
+        total = r['total_s'] or 1.0
+        rows.append((f"{r['dataset']:,}", r['table'], f"{r['rows']:,}", f"{r['batch_size']:,}",
+                     *(f"{r['phases'][phase]:.2f} ({r['phases'][phase] / total:.0%})" for phase in PHASES),
+                     f"{r['total_s']:.2f}", f"{r['rows_per_s']:,.0f}", f"{r['peak_rss_mb']:.1f}"))
+    print_table(("jeu", "table", "lignes", "lot", *(f"{phase} s" for phase in PHASES),
+                 "total s", "lignes/s", "pic RSS Mo"), rows)
+
+def main():
+    """Lancer le benchmark (options en `clé=valeur`) et comparer à une exécution précédente"""
+    options = dict(arg.partition('=')[::2] for arg in sys.argv[1:])
+    known = {'sizes', 'batches', 'tables', 'latency_ms', 'row_latency_us', 'seed',
+             'repeat', 'compare', 'tolerance', 'out'}
+    unknown = set(options) - known
+    if unknown:
+        print(f"❌ Option inconnue: {', '.join(sorted(unknown))} ({', '.join(sorted(known))})")
+        return 2
+    integers = lambda value: tuple(int(v) for v in value.split(','))
+    tables = options['tables'].split(',') if 'tables' in options else None
+    for name in tables or ():
+        if name not in CSV_SCHEMAS:
+            print(f"❌ Table inconnue: {name} ({', '.join(CSV_SCHEMAS)})")
+            return 2
+
+    print("="*60)
+    print("📊 Benchmark de l'import par phase (pilote local)")
+    print("="*60)
+    document = run(
+        sizes=integers(options['sizes']) if 'sizes' in options else DEFAULT_SIZES,
+        batches=integers(options['batches']) if 'batches' in options else DEFAULT_BATCHES,
+        tables=tables,
+        latency=float(options.get('latency_ms', 0)) / 1000,
+        row_latency=float(options.get('row_latency_us', 0)) / 1e6,
+        seed=int(options.get('seed', SEED)),
+        repeat=int(options.get('repeat', REPEAT)),
+        progress=lambda r: print(f"   ✓ {r['dataset']:,} / {r['table']} / lot {r['batch_size']:,}: "
+                                 f"{r['rows_per_s']:,.0f} lignes/s"),
+    )
+    print()
+    print_results(document)
+    path = save(document, options.get('out', METRICS_DIR))
+    print(f"\n   ✓ Résultats: {path}")
+
+    if 'compare' not in options:
+        return 0
+    with open(options['compare'], encoding='utf-8') as f:
+        baseline = json.load(f)
+    tolerance = float(options.get('tolerance', TOLERANCE))
+    rows, regressions = compare(document, baseline, tolerance)
+    if not rows:
+        print("\n⚠️  Aucune mesure commune avec la référence")
+        return 0
+    print(f"\n📊 Comparaison avec {options['compare']} "
+          f"(tolérance {tolerance:.0f} %, mesures de plus de {MIN_SECONDS}s)")
+    print_table(("jeu", "table", "lot", "avant lignes/s", "après lignes/s", "écart", "phase"),
+                [(f"{d:,}", t, f"{b:,}", f"{before:,.0f}", f"{after:,.0f}", f"{change:+.1f} %", phase)
+                 for d, t, b, before, after, change, phase in rows])
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {tolerance:.0f} %")
+        return 1
+    print("\n✅ Pas de régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
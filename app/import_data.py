@@ -1,177 +1,212 @@
 """
 Script d'import des données CSV dans Oracle
 """
-import pandas as pd
 import sys
+import threading
 from pathlib import Path
 
 # Ajouter le dossier app au path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from database import db
-from config import CSV_FILES
+from config import CSV_FILES, METRICS_DIR, IMPORT_CONFIG, CSV_CACHE_CONFIG
+from csv_cache import purge, file_hash
+import checkpoint
+from csv_schema import CSV_SCHEMAS
+from delta_import import delta_import, clear_snapshots
+from loader import stream_csv, print_progress, load_order, load_tables
+from staging_load import staging_import
+from prevalidation import prevalidate
+from optimizer_stats import StatsJob
 
-def import_proprietaires():
+def print_batch_report(report, label):
+    """Afficher le rapport d'un import en lot (numéros de ligne du CSV)"""
+    print(f"   ✓ {report.succeeded} {label} ({report.rows_per_second:,.0f} lignes/s)")
+    if report.errors:
+        print(f"   ⚠️  {len(report.errors)} ligne(s) rejetée(s):")
+        for index, message in report.errors[:10]:
+            # +2 : en-tête du CSV et numérotation à partir de 1
+            print(f"      ligne {index + 2}: {message}")
+        if len(report.errors) > 10:
+            print(f"      ... {len(report.errors) - 10} autre(s)")
+    if not report.committed:
+        print("   ❌ Aucune ligne validée")
+    return report.committed
+
+def import_table(name, label, path=None):
+    """Importer un CSV en flux : paquets convertis colonne par colonne et
+    insérés en lot pendant la lecture du paquet suivant"""
+    report = stream_csv(db, name, path=path, progress=print_progress(label),
+                        checkpoint=IMPORT_CONFIG['resume'])
+    return print_batch_report(report, label)
+
+def import_proprietaires(path=None):
     """Importer les propriétaires"""
     print("\n📊 Import des PROPRIETAIRES...")
     
     try:
-        df = pd.read_csv(CSV_FILES['proprietaire'], sep=';')
-        print(f"   Fichier chargé: {len(df)} lignes")
-        
-        # Préparer les données
-        data = []
-        for _, row in df.iterrows():
-            data.append((
-                str(row['codeP']).strip() if pd.notna(row['codeP']) else None,
-                str(row['Pseudo']).strip() if pd.notna(row['Pseudo']) else None,
-                str(row['email']).strip() if pd.notna(row['email']) and str(row['email']) != 'NULL' else None,
-                str(row['ville']).strip() if pd.notna(row['ville']) else None,
-                int(float(row['anneeI'])) if pd.notna(row['anneeI']) else None
-            ))
-        
-        # Insérer
-        query = """
-            INSERT INTO Proprietaire (CodeP, pseudo, email, Ville, anneeI)
-            VALUES (:1, :2, :3, :4, :5)
-        """
-        
-        rows = db.execute_many(query, data)
-        print(f"   ✓ {rows} propriétaires importés")
-        return True
-        
+        return import_table('proprietaire', "propriétaires importés", path)
     except Exception as e:
         print(f"   ❌ Erreur: {e}")
         return False
 
-def import_clients():
+def import_clients(path=None):
     """Importer les clients"""
     print("\n📊 Import des CLIENTS...")
     
     try:
-        df = pd.read_csv(CSV_FILES['client'], sep=';')
-        print(f"   Fichier chargé: {len(df)} lignes")
-        
-        data = []
-        for _, row in df.iterrows():
-            data.append((
-                str(row['CodeC']).strip() if pd.notna(row['CodeC']) else None,
-                str(row['Nom']).strip() if pd.notna(row['Nom']) else None,
-                str(row['Prenom']).strip() if pd.notna(row['Prenom']) else None,
-                int(row['age']) if pd.notna(row['age']) else None,
-                str(row['Permis']).strip() if pd.notna(row['Permis']) else None,
-                str(row['Adresse']).strip() if pd.notna(row['Adresse']) else None,
-                str(row['Ville']).strip() if pd.notna(row['Ville']) else None
-            ))
-        
-        query = """
-            INSERT INTO Client (CodeC, Nom, Prenom, Age, Permis, Adresse, Ville)
-            VALUES (:1, :2, :3, :4, :5, :6, :7)
-        """
-        
-        rows = db.execute_many(query, data)
-        print(f"   ✓ {rows} clients importés")
-        return True
-        
+        return import_table('client', "clients importés", path)
     except Exception as e:
         print(f"   ❌ Erreur: {e}")
         return False
 
-def import_voitures():
+def import_voitures(path=None):
     """Importer les voitures"""
     print("\n📊 Import des VOITURES...")
     
     try:
-        df = pd.read_csv(CSV_FILES['voiture'], sep=';')
-        print(f"   Fichier chargé: {len(df)} lignes")
-        # Préparer les données
-        data = []
-        for _, row in df.iterrows():
-            data.append((
-                str(row['Immat']).strip() if pd.notna(row['Immat']) else None,
-                str(row['modele']).strip() if pd.notna(row['modele']) else None,
-                str(row['Marque']).strip() if pd.notna(row['Marque']) else None,
-                str(row['Categorie']).strip() if pd.notna(row['Categorie']) else None,
-                str(row['couleur']).strip() if pd.notna(row['couleur']) else None,
-                int(row['places']) if pd.notna(row['places']) else None,
-                int(float(row['achatA'])) if pd.notna(row['achatA']) else None,
-                int(row['compteur']) if pd.notna(row['compteur']) else None,
-                float(row['prixJ']) if pd.notna(row['prixJ']) else None,
-                str(row['codeP']).strip() if pd.notna(row['codeP']) else None
-            ))
-        
-        query = """
-            INSERT INTO Voiture (Immat, Modele, Marque, Categorie, Couleur, 
-                               Places, achatA, compteur, prixJ, codeP)
-            VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10)
-        """
-        
-        rows = db.execute_many(query, data)
-        print(f"   ✓ {rows} voitures importées")
-        return True
-        
+        return import_table('voiture', "voitures importées", path)
     except Exception as e:
         print(f"   ❌ Erreur: {e}")
         return False
 
-def import_locations():
+def import_locations(path=None):
     """Importer les locations"""
     print("\n📊 Import des LOCATIONS...")
     
     try:
-        df = pd.read_csv(CSV_FILES['location'], sep=';')
-        print(f"   Fichier chargé: {len(df)} lignes")
-        
-        data = []
-        for _, row in df.iterrows():
-            # Convertir les dates si présentes
-            dated = None
-            datef = None
-            
-            if pd.notna(row.get('dated')):
-                try:
-                    dated = pd.to_datetime(row['dated'])
-                except:
-                    pass
-            
-            if pd.notna(row.get('datef')):
-                try:
-                    datef = pd.to_datetime(row['datef'])
-                except:
-                    pass
-            
-            data.append((
-                str(row['CodeC']).strip() if pd.notna(row['CodeC']) else None,
-                str(row['immat']).strip() if pd.notna(row['immat']) else None,
-                int(row['annee']) if pd.notna(row['annee']) else None,
-                int(row['mois']) if pd.notna(row['mois']) else None,
-                str(row['numloc']).strip() if pd.notna(row['numloc']) else None,
-                int(row['km']) if pd.notna(row['km']) else None,
-                int(row['duree']) if pd.notna(row['duree']) else None,
-                str(row['villed']).strip() if pd.notna(row['villed']) else None,
-                str(row['villea']).strip() if pd.notna(row['villea']) else None,
-                dated,
-                datef,
-                int(row['note']) if pd.notna(row.get('note')) and str(row['note']) != 'NULL' else None,
-                str(row['avis']).strip() if pd.notna(row.get('avis')) and str(row['avis']) != 'NULL' else None
-            ))
-        
-        query = """
-            INSERT INTO Location (CodeC, Immat, Annee, Mois, numLoc, km, duree,
-                                villed, villea, dated, datef, note, avis)
-            VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13)
-        """
-        
-        rows = db.execute_many(query, data)
-        print(f"   ✓ {rows} locations importées")
-        return True
-        
+        return import_table('location', "locations importées", path)
     except Exception as e:
         print(f"   ❌ Erreur: {e}")
         return False
 
+LABELS = {
+    'proprietaire': "propriétaires importés",
+    'client': "clients importés",
+    'voiture': "voitures importées",
+    'location': "locations importées",
+}
+
+def import_parallel(files=None):
+    """Importer toutes les tables en parallèle (ordre imposé par les clés étrangères)"""
+    waves = load_order()
+    print(f"\n📊 Import parallèle: {' → '.join(' + '.join(wave) for wave in waves)}")
+    print_lock = threading.Lock()
+    results = {}
+
+    def on_done(name, report):
+        with print_lock:
+            print(f"\n📊 {name.upper()}")
+            if report is None:
+                print("   ❌ Non importée (dépendance en échec)")
+                results[name] = False
+            else:
+                results[name] = print_batch_report(report, LABELS[name])
+
+    load_tables(db, files=files, on_done=on_done, checkpoint=IMPORT_CONFIG['resume'])
+    return all(results.get(name) for name in CSV_SCHEMAS)
+
+def can_resume(files):
+    """Un import interrompu peut-il reprendre ? (points de reprise présents,
+    tous issus des CSV actuels)"""
+    found = checkpoint.sources(db)
+    if not found:
+        return False
+    current = {name: file_hash(files.get(name) or CSV_FILES[name]) for name in CSV_SCHEMAS}
+    return all(name in current and hashes == {current[name]} for name, hashes in found.items())
+
+def import_full(files=None):
+    """Import complet : vider les tables puis tout recharger"""
+    files = files or {}
+    resume = IMPORT_CONFIG['resume']
+    if resume:
+        checkpoint.ensure_table(db)
+    if resume and can_resume(files):
+        print("\n↻ Reprise de l'import interrompu (tables conservées)")
+    else:
+        # Nettoyer les tables existantes (ordre inverse des clés étrangères)
+        print("\n🗑️  Nettoyage des tables...")
+        if resume:
+            checkpoint.clear(db)  # d'abord : jamais de reprise sur des tables vidées
+        for wave in reversed(load_order()):
+            for name in wave:
+                db.execute_update(f"DELETE FROM {CSV_SCHEMAS[name]['table']}")
+        print("   ✓ Tables vidées")
+    clear_snapshots()
+    
+    if IMPORT_CONFIG['parallel'] and db.pool is not None:
+        success = import_parallel(files)
+    else:
+        if IMPORT_CONFIG['parallel']:
+            print("\n⚠️  Import parallèle ignoré: activer le pool (ORACLE_POOL=1)")
+        # Importer dans l'ordre (à cause des clés étrangères)
+        success = True
+        success = success and import_proprietaires(files.get('proprietaire'))
+        success = success and import_clients(files.get('client'))
+        success = success and import_voitures(files.get('voiture'))
+        success = success and import_locations(files.get('location'))
+    if resume and success:
+        checkpoint.clear(db)  # import terminé : le prochain repartira de zéro
+    return success
+
+def import_delta(files=None):
+    """Import incrémental : MERGE des lignes nouvelles ou modifiées, DELETE des disparues"""
+    print(f"\n📊 Import incrémental (référence: {IMPORT_CONFIG['delta_source']})...")
+    reports = delta_import(db, files=files)
+    touched = 0
+    for name, report in reports.items():
+        lines = report.summary(limit=10)
+        print(f"   {'✓' if not report.errors else '⚠️ '} {name}: {lines[0]}")
+        for line in lines[1:]:
+            print(f"      {line}")
+        touched += report.touched
+    print(f"   ✓ {touched} ligne(s) modifiée(s) au total")
+    return not any(report.errors for report in reports.values())
+
+def import_staging(files=None):
+    """Import par staging : les tables en ligne restent complètes pendant le chargement"""
+    print("\n📊 Import par tables de staging (STG_*)...")
+    print_lock = threading.Lock()
+
+    def on_done(name, report):
+        with print_lock:
+            if report is not None:
+                print(f"   ✓ {name}: {report.succeeded} ligne(s) en staging "
+                      f"({report.rows_per_second:,.0f} lignes/s)")
+                for index, message in report.errors[:10]:
+                    print(f"      ligne {index + 2}: {message}")
+
+    try:
+        report = staging_import(db, files=files, on_done=on_done)
+    except Exception as e:
+        print(f"   ❌ Publication annulée: {e}")
+        return False
+    for line in report.summary():
+        print(f"   {line}")
+    if report.published:
+        clear_snapshots()
+    return report.published
+
+def validate_csv():
+    """Valider les CSV en mémoire : seules les lignes correctes iront en base
+
+    Renvoie {nom: CSV à importer} (fichiers nettoyés s'il y a des rejets).
+    """
+    level = IMPORT_CONFIG['prevalidate']
+    print(f"\n🔎 Validation des CSV (niveau: {level})...")
+    reports, files = prevalidate(level=level)
+    for name, report in reports.items():
+        lines = report.summary()
+        print(f"   {'✓' if not report.rejected else '⚠️ '} {name}: {lines[0]}")
+        for line in lines[1:]:
+            print(f"      {line}")
+        if report.reject_path:
+            print(f"      rejets: {report.reject_path}")
+    return files
+
 def verify_import():
-    """Vérifier les données importées"""
+    """Vérifier les données importées et lancer le calcul des statistiques
+    (tables modifiées seulement, en tâche de fond) ; renvoie le StatsJob"""
     print("\n📊 Vérification des données...")
     
     stats = db.get_table_stats()
@@ -179,9 +214,24 @@ def verify_import():
         for table_name, num_rows in stats:
             print(f"   {table_name}: {num_rows or 0} lignes")
     
-    # Analyser les statistiques
-    db.execute_update("BEGIN DBMS_STATS.GATHER_SCHEMA_STATS(USER); END;")
-    print("   ✓ Statistiques mises à jour")
+    # Analyser les statistiques des tables modifiées
+    job = StatsJob(db)
+    if not job.done:
+        print("   ⏳ Statistiques en cours de calcul (tâche de fond)")
+    return job
+
+def print_stats_report(job):
+    """Attendre la fin du calcul des statistiques et afficher le temps par table
+    (à la déconnexion : le calcul en tâche de fond ne retarde pas l'import)"""
+    if not job.done:
+        print("\n⏳ Attente des statistiques...")
+    report = job.wait()
+    if job.error:
+        print(f"   ❌ Statistiques: {job.error}")
+        return
+    print(f"\n📊 Statistiques de l'optimiseur ({report.elapsed:.2f}s):")
+    for line in report.summary():
+        print(f"   {line}")
 
 def main():
     """Fonction principale"""
@@ -189,39 +239,46 @@ def main():
     print("🚀 Import des données CSV dans Oracle")
     print("="*60)
     
+    # Vérifier les fichiers CSV
+    print("\n📁 Vérification des fichiers CSV...")
+    for name, path in CSV_FILES.items():
+        if Path(path).exists():
+            print(f"   ✓ {name}: {path}")
+        else:
+            print(f"   ❌ MANQUANT: {path}")
+            return
+    
+    if CSV_CACHE_CONFIG['enabled']:
+        removed = purge()
+        if removed:
+            print(f"   ✓ Cache CSV: {removed} entrée(s) périmée(s) supprimée(s)")
+    
+    # Valider avant de se connecter : aucun aller-retour pour une ligne invalide
+    files = None
+    if IMPORT_CONFIG['prevalidate'] != 'off':
+        try:
+            files = validate_csv()
+        except ValueError as e:
+            print(f"   ❌ {e}")
+            return
+    
     # Connexion
     if not db.connect():
         print("\n❌ Impossible de se connecter à la base de données")
         return
     
+    stats_job = None
     try:
-        # Vérifier les fichiers CSV
-        print("\n📁 Vérification des fichiers CSV...")
-        for name, path in CSV_FILES.items():
-            if Path(path).exists():
-                print(f"   ✓ {name}: {path}")
-            else:
-                print(f"   ❌ MANQUANT: {path}")
-                return
-        
-        # Nettoyer les tables existantes
-        print("\n🗑️  Nettoyage des tables...")
-        db.execute_update("DELETE FROM Location")
-        db.execute_update("DELETE FROM Voiture")
-        db.execute_update("DELETE FROM Client")
-        db.execute_update("DELETE FROM Proprietaire")
-        print("   ✓ Tables vidées")
-        
-        # Importer dans l'ordre (à cause des clés étrangères)
-        success = True
-        success = success and import_proprietaires()
-        success = success and import_clients()
-        success = success and import_voitures()
-        success = success and import_locations()
+        if IMPORT_CONFIG['mode'] == 'delta':
+            success = import_delta(files)
+        elif IMPORT_CONFIG['mode'] == 'staging':
+            success = import_staging(files)
+        else:
+            success = import_full(files)
         
         if success:
             # Vérifier
-            verify_import()
+            stats_job = verify_import()
             
             print("\n" + "="*60)
             print("✅ Import terminé avec succès!")
@@ -232,8 +289,15 @@ def main():
             print("  3. Continuer avec les autres scripts SQL")
         else:
             print("\n❌ Import échoué")
+        
+        print("\n📈 Métriques des requêtes:")
+        db.metrics.print_summary()
+        json_path, prom_path = db.metrics.dump(METRICS_DIR, prefix="import_metrics")
+        print(f"   ✓ Exportées: {json_path}, {prom_path}")
     
     finally:
+        if stats_job is not None:
+            print_stats_report(stats_job)  # pas de déconnexion pendant l'analyse
         db.disconnect()
 
 if __name__ == "__main__":
@@ -0,0 +1,269 @@
+"""
+Chargement des CSV en flux : lecture par paquets, écriture en parallèle
+Ordre de chargement déduit des clés étrangères du schéma
+"""
+import os
+import queue
+import re
+import threading
+import time
+
+from checkpoint import committed_chunks, iter_chunks, resume_point, write_chunk
+from config import CSV_FILES, IMPORT_CONFIG, BATCH_CONFIG, SQL_DIR
+from csv_cache import file_hash, read_table
+from csv_schema import CSV_SCHEMAS, to_bind_rows, insert_sql
+from database import BatchReport, TransactionError
+
+_DONE = object()
+
+SCHEMA_FILE = os.path.join(SQL_DIR, '01_schema.sql')
+
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(\w+)", re.IGNORECASE | re.MULTILINE)
+_FOREIGN_KEY = re.compile(r"\bFOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+(\w+)\s*\(([^)]*)\)",
+                          re.IGNORECASE)
+
+def print_progress(label):
+    """Callback de progression : lignes écrites et débit, sur une seule ligne"""
+    def progress(report):
+        print(f"\r   … {report.succeeded:,} {label}, {len(report.errors)} rejetée(s) "
+              f"({report.rows_per_second:,.0f} lignes/s)", end="", flush=True)
+    return progress
+
+def stream_csv(db, name, path=None, chunk_rows=None, queue_depth=None, policy=None,
+               progress=None, writers=1, table=None, checkpoint=False, timings=None):
+    """Importer un CSV par paquets de `chunk_rows` lignes
+
+    Le thread appelant lit et convertit le paquet suivant pendant que
+    `writers` threads d'écriture envoient les précédents (array DML via
+    execute_batch, une session du pool chacun). La file est bornée à
+    `queue_depth` paquets : la mémoire ne dépend pas de la taille du fichier.
+    `policy` :
+    - 'partial' : chaque paquet est validé une fois écrit
+    - 'atomic'  : tout le fichier dans une transaction (un seul écrivain),
+      annulée à la première erreur
+    `progress(report)` est appelé après chaque paquet écrit.
+    `table` remplace la table cible (ex: table de staging).
+    `checkpoint` : chaque paquet est validé avec son point de reprise
+    (checkpoint.py) ; les paquets déjà validés par un import interrompu ne
+    sont ni relus ni renvoyés (politique 'partial' uniquement).
+    `timings` : dict complété avec la durée cumulée de chaque phase, 'parse'
+    (lecture du CSV), 'convert' (binds) et 'write' (écriture et COMMIT,
+    additionnée sur les `writers` threads).
+    Renvoie un BatchReport (indices = rang de la ligne dans le fichier).
+    """
+    path = path or CSV_FILES[name]
+    chunk_rows = chunk_rows or IMPORT_CONFIG['chunk_rows']
+    policy = policy or BATCH_CONFIG['error_policy']
+    if checkpoint and policy == 'atomic':
+        print(f"   ⚠️  {name}: points de reprise ignorés (politique atomic)")
+        checkpoint = False
+    if policy == 'atomic' or db.pool is None:
+        writers = 1  # une transaction = une session ; connexion unique = pas de parallélisme
+    queue_depth = max(queue_depth or IMPORT_CONFIG['queue_depth'], writers)
+    query = insert_sql(name, table)
+    report = BatchReport(0, policy)
+    source = None
+    if checkpoint:
+        source = file_hash(path)
+        done = committed_chunks(db, name, source)
+        if done:
+            chunk_rows = next(iter(done.values()))[4]  # mêmes limites de paquets qu'avant l'arrêt
+            report.chunks, report.total, report.succeeded = resume_point(done)
+            print(f"   ↻ {name}: reprise après {report.chunks} paquet(s) "
+                  f"({report.succeeded:,} ligne(s) déjà validée(s))")
+        chunks = iter_chunks(path, name, chunk_rows, done)
+    else:
+        chunks = ((None, None, None, df) for df in read_table(path, name, chunksize=chunk_rows))
+    pending = queue.Queue(maxsize=queue_depth)
+    lock = threading.Lock()
+    failure = []
+
+    def write_chunks():
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if failure:
+                continue  # vider la file pour ne pas bloquer le lecteur
+            offset, rows, mark = item
+            written = time.perf_counter()
+            try:
+                if mark is None:
+                    chunk = db.execute_batch(query, rows, chunk_size=len(rows), policy=policy)
+                else:
+                    chunk = write_chunk(db, query, rows, name, source, mark, chunk_rows)
+            except Exception as e:
+                failure.append(e)
+                continue
+            with lock:
+                _timed(timings, 'write', written)
+                report.merge(chunk, offset)
+                report.elapsed = time.perf_counter() - start
+                if policy == 'atomic' and chunk.errors:
+                    failure.append(None)  # transaction perdue : inutile d'écrire la suite
+                elif policy == 'partial' and not chunk.committed:
+                    failure.append(None)  # échec du paquet entier (connexion...)
+                if progress:
+                    progress(report)
+
+    def writer():
+        if policy == 'atomic':
+            try:
+                with db.transaction():
+                    write_chunks()
+                report.committed = not failure
+            except TransactionError:
+                report.committed = False
+            except Exception as e:
+                failure.append(e)
+        else:
+            write_chunks()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=writer, name=f"import-{name}-{i}", daemon=True)
+               for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    try:
+        while not failure:
+            parsed = time.perf_counter()
+            item = next(chunks, None)
+            _timed(timings, 'parse', parsed)
+            if item is None:
+                break
+            chunk_no, chunk_start, chunk_end, df = item
+            if not len(df):
+                continue
+            converted = time.perf_counter()
+            rows = to_bind_rows(df, name)
+            _timed(timings, 'convert', converted)
+            mark = None if chunk_no is None else (chunk_no, chunk_start, chunk_end)
+            pending.put((int(df.index[0]), rows, mark))
+            del df, rows
+    finally:
+        for _ in threads:
+            pending.put(_DONE)
+        for thread in threads:
+            thread.join()
+    # Paquets non écrits (ou fichier non lu jusqu'au bout) : import incomplet
+    report.aborted = report.aborted or bool(failure)
+    if policy == 'partial':
+        report.committed = not failure
+    elif report.errors:
+        report.succeeded = 0
+    report.errors.sort()
+    report.elapsed = time.perf_counter() - start
+    if progress:
+        print()
+    errors = [e for e in failure if e is not None]
+    if errors:
+        raise errors[0]
+    return report
+
+def _timed(timings, phase, start):
+    """Ajouter à `timings[phase]` le temps écoulé depuis `start`"""
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+# ========== ORDRE DE CHARGEMENT ==========
+
+def foreign_keys(path=SCHEMA_FILE):
+    """Clés étrangères du schéma : {TABLE: [(colonnes, TABLE RÉFÉRENCÉE, colonnes référencées)]}"""
+    with open(path, encoding='utf-8') as f:
+        sql = f.read()
+    matches = list(_CREATE_TABLE.finditer(sql))
+    keys = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(sql)
+        keys[match.group(1).upper()] = [
+            (_columns(columns), referenced.upper(), _columns(referenced_columns))
+            for columns, referenced, referenced_columns in _FOREIGN_KEY.findall(sql, match.end(), end)
+        ]
+    return keys
+
+def _columns(text):
+    return tuple(column.strip() for column in text.split(','))
+
+def schema_dependencies(path=SCHEMA_FILE):
+    """Tables référencées par chaque table (FOREIGN KEY ... REFERENCES du schéma)
+
+    Renvoie {TABLE: {TABLES RÉFÉRENCÉES}} en majuscules.
+    """
+    return {table: {referenced for _, referenced, _ in keys} - {table}
+            for table, keys in foreign_keys(path).items()}
+
+def load_order(names=None, path=SCHEMA_FILE):
+    """Vagues de chargement des CSV : chaque vague ne dépend que des précédentes
+
+    Les tables d'une même vague sont indépendantes (ex: Proprietaire et Client).
+    """
+    names = list(names or CSV_SCHEMAS)
+    dependencies = _csv_dependencies(names, path)
+    waves, loaded = [], set()
+    while len(loaded) < len(names):
+        wave = [name for name in names if name not in loaded and dependencies[name] <= loaded]
+        if not wave:
+            raise ValueError(f"Dépendances circulaires entre: {', '.join(set(names) - loaded)}")
+        waves.append(wave)
+        loaded.update(wave)
+    return waves
+
+def _csv_dependencies(names, path):
+    """Dépendances entre fichiers CSV (limitées aux fichiers chargés)"""
+    tables = {CSV_SCHEMAS[name]['table'].upper(): name for name in names}
+    schema = schema_dependencies(path)
+    return {name: {tables[t] for t in schema.get(CSV_SCHEMAS[name]['table'].upper(), ()) if t in tables}
+            for name in names}
+
+def load_tables(db, names=None, writers=None, files=None, on_done=None, path=SCHEMA_FILE,
+                tables=None, checkpoint=False):
+    """Charger les CSV en parallèle en respectant les clés étrangères
+
+    Chaque table démarre dès que les tables qu'elle référence sont chargées,
+    sur sa propre session du pool ; la plus grosse (Location) est écrite par
+    `writers` sessions. Sans pool, les tables sont chargées l'une après l'autre.
+    `on_done(name, report)` est appelé à la fin de chaque table (report None :
+    non chargée car une dépendance a échoué). `tables` redirige vers d'autres
+    tables cibles sans clés étrangères (staging) : tout est chargé en même temps.
+    `checkpoint` : voir stream_csv.
+    Renvoie {nom: BatchReport}.
+    """
+    names = list(names or CSV_SCHEMAS)
+    writers = writers or IMPORT_CONFIG['writers']
+    files = files or {}
+    tables = tables or {}
+    dependencies = {name: set() for name in names} if tables else _csv_dependencies(names, path)
+    order = [name for wave in load_order(names, path) for name in wave]
+    done = {name: threading.Event() for name in names}
+    reports = {}
+
+    def load(name):
+        try:
+            for dependency in dependencies[name]:
+                done[dependency].wait()
+            if all(reports.get(d) is not None and reports[d].committed for d in dependencies[name]):
+                # Seul le plus gros fichier justifie plusieurs écrivains
+                table_writers = writers if name == 'location' else 1
+                reports[name] = stream_csv(db, name, path=files.get(name), writers=table_writers,
+                                           table=tables.get(name), checkpoint=checkpoint)
+            else:
+                reports[name] = None
+        except Exception as e:
+            print(f"   ❌ {name}: {e}")
+            reports[name] = None
+        finally:
+            if on_done:
+                on_done(name, reports[name])
+            done[name].set()
+
+    if db.pool is None:
+        for name in order:
+            load(name)
+        return reports
+    threads = [threading.Thread(target=load, args=(name,), name=f"load-{name}", daemon=True)
+               for name in order]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return reports
@@ -0,0 +1,311 @@
+"""
+Pilote local de substitution (stand-in) pour oracledb
+Permet d'exécuter Database, les CRUD et l'import sans serveur Oracle
+"""
+import threading
+import time
+from collections import namedtuple
+
+# Métadonnées de colonne passées à outputtypehandler (comme oracledb.FetchInfo)
+LocalFetchInfo = namedtuple('LocalFetchInfo', 'name type_code display_size internal_size '
+                                              'precision scale null_ok')
+
+
+class LocalDriver:
+    """Imitation minimale de l'API oracledb (connect / create_pool)
+
+    `responder(sql, params)` fournit les lignes renvoyées par un SELECT :
+    soit une liste/un itérable de tuples, soit un couple (description, lignes).
+    `latency` simule le coût d'un aller-retour réseau (en secondes),
+    `row_latency` le travail du serveur par ligne écrite en lot (executemany).
+    `reject(sql, row)` renvoie un message d'erreur pour simuler le rejet d'une ligne.
+    """
+
+    def __init__(self, responder=None, latency=0.0, version="23.0.0-local", reject=None,
+                 row_latency=0.0):
+        self.responder = responder
+        self.reject = reject
+        self.latency = latency
+        self.row_latency = row_latency
+        self.version = version
+        self.lock = threading.Lock()
+        self.round_trips = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.statements = []
+
+    def connect(self, user=None, password=None, dsn=None, **kwargs):
+        """Ouvrir une connexion locale"""
+        self._round_trip()
+        connection = LocalConnection(self)
+        connection.stmtcachesize = kwargs.get('stmtcachesize', connection.stmtcachesize)
+        return connection
+
+    def create_pool(self, user=None, password=None, dsn=None,
+                    min=1, max=2, increment=1, **kwargs):
+        """Créer un pool de connexions locales"""
+        return LocalPool(self, min, max, increment)
+
+    def _round_trip(self):
+        with self.lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _record(self, sql):
+        with self.lock:
+            self.statements.append(" ".join(sql.split()))
+
+    def _rows_for(self, sql, params):
+        if self.responder is None:
+            return None, []
+        result = self.responder(sql, params)
+        if isinstance(result, tuple) and len(result) == 2:
+            return result
+        return None, result
+
+
+class LocalBatchError:
+    """Erreur de ligne renvoyée par getbatcherrors()"""
+
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+        self.full_code = message.split(":", 1)[0]
+
+    def __str__(self):
+        return self.message
+
+
+class LocalDatabaseError(Exception):
+    """Erreur levée par le pilote local"""
+
+
+class LocalPool:
+    """Pool de connexions locales bornées à `max` sessions"""
+
+    def __init__(self, driver, min, max, increment):
+        self.driver = driver
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.condition = threading.Condition()
+        self.idle = [LocalConnection(driver, self) for _ in range(min)]
+        self.opened = min
+        self.busy = 0
+
+    def acquire(self):
+        """Emprunter une connexion (bloque si le pool est plein)"""
+        with self.condition:
+            while not self.idle and self.opened >= self.max:
+                self.condition.wait()
+            if not self.idle:
+                self.idle.append(LocalConnection(self.driver, self))
+                self.opened += 1
+            self.busy += 1
+            return self.idle.pop()
+
+    def release(self, connection):
+        """Rendre une connexion au pool"""
+        connection.rollback()
+        with self.condition:
+            self.busy -= 1
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def close(self, force=False):
+        with self.condition:
+            self.idle = []
+            self.opened = 0
+
+
+class LocalConnection:
+    """Connexion locale : compte les commits et délègue au pilote"""
+
+    def __init__(self, driver, pool=None):
+        self.driver = driver
+        self.pool = pool
+        self.version = driver.version
+        self.autocommit = False
+        self.stmtcachesize = 20
+        self.outputtypehandler = None
+        self.pending = 0
+
+    def cursor(self):
+        return LocalCursor(self)
+
+    def commit(self):
+        self.driver._round_trip()
+        with self.driver.lock:
+            self.driver.commits += 1
+        self.pending = 0
+
+    def rollback(self):
+        if self.pending:
+            self.driver._round_trip()
+            with self.driver.lock:
+                self.driver.rollbacks += 1
+        self.pending = 0
+
+    def close(self):
+        self.pending = 0
+
+
+class LocalVar:
+    """Variable de fetch créée par cursor.var() dans un outputtypehandler"""
+
+    def __init__(self, type_, outconverter=None):
+        self.type = type_
+        self.outconverter = outconverter
+        self.value = None
+
+    def getvalue(self, pos=0):
+        return self.value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+    def convert(self, value):
+        if value is None:
+            return None
+        if self.type is int:
+            value = int(value)
+        elif self.type is float or getattr(self.type, 'name', None) in ('DB_TYPE_BINARY_DOUBLE',
+                                                                         'DB_TYPE_BINARY_FLOAT'):
+            value = float(value)
+        elif self.type is str:
+            value = str(value)
+        return self.outconverter(value) if self.outconverter else value
+
+
+class LocalCursor:
+    """Curseur local compatible DB-API"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.driver = connection.driver
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowcount = 0
+        self.description = None
+        self._rows = iter(())
+        self._batch_errors = []
+        self._row_counts = []
+        self.inputsizes = {}
+
+    def execute(self, sql, params=None):
+        self.driver._round_trip()
+        self.driver._record(sql)
+        description, rows = self.driver._rows_for(sql, params)
+        self.description = description
+        self._rows = iter(rows)
+        handler = self.connection.outputtypehandler
+        if handler and description:
+            variables = [handler(self, LocalFetchInfo(*column)) for column in description]
+            if any(variables):
+                self._rows = self._convert(self._rows, variables)
+        verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        outputs = [value for value in params.values() if isinstance(value, LocalVar)] \
+            if isinstance(params, dict) else []
+        if verb in ("INSERT", "UPDATE", "DELETE", "MERGE"):
+            message = self.driver.reject(sql, params) if self.driver.reject else None
+            if message is not None:
+                raise LocalDatabaseError(message)
+            self.rowcount = 1
+            if outputs:
+                # RETURNING INTO : la réponse donne les lignes modifiées
+                returned = list(self._rows)
+                self.rowcount = len(returned)
+                for position, variable in enumerate(outputs):
+                    variable.setvalue(0, [row[position] for row in returned])
+            self.connection.pending += self.rowcount
+        else:
+            self.rowcount = 0
+            if outputs:
+                # Bloc PL/SQL : la première ligne de la réponse donne les binds de sortie
+                row = next(self._rows, None) or ()
+                for variable, value in zip(outputs, row):
+                    variable.setvalue(0, value)
+                self.connection.pending += verb in ("BEGIN", "DECLARE")
+        self._autocommit()
+
+    def executemany(self, sql, data, batcherrors=False, arraydmlrowcounts=False, **kwargs):
+        self.driver._round_trip()
+        self.driver._record(sql)
+        self._batch_errors = []
+        self._row_counts = []
+        applied = 0
+        for offset, row in enumerate(data):
+            message = self.driver.reject(sql, row) if self.driver.reject else None
+            if arraydmlrowcounts:
+                self._row_counts.append(1 if message is None else 0)
+            if message is None:
+                applied += 1
+            elif batcherrors:
+                self._batch_errors.append(LocalBatchError(offset, message))
+            else:
+                self.rowcount = applied
+                self.connection.pending += applied
+                raise LocalDatabaseError(message)
+        self.rowcount = applied
+        self.connection.pending += applied
+        if self.driver.row_latency:
+            time.sleep(self.driver.row_latency * (applied + len(self._batch_errors)))
+        self._autocommit()
+
+    def setinputsizes(self, *args, **kwargs):
+        self.inputsizes = args or kwargs
+
+    def var(self, type_, size=0, arraysize=1, inconverter=None, outconverter=None, **kwargs):
+        return LocalVar(type_, outconverter)
+
+    @staticmethod
+    def _convert(rows, variables):
+        for row in rows:
+            yield tuple(var.convert(value) if var else value
+                        for var, value in zip(variables, row))
+
+    def getbatcherrors(self):
+        return list(self._batch_errors)
+
+    def getarraydmlrowcounts(self):
+        return list(self._row_counts)
+
+    def callproc(self, name, params=None):
+        self.driver._round_trip()
+        self.driver._record(f"CALL {name}")
+        self.connection.pending += 1
+        self._autocommit()
+        return list(params or [])
+
+    def fetchone(self):
+        row = next(self._rows, None)
+        if row is not None:
+            self.rowcount += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        batch = []
+        for row in self._rows:
+            batch.append(row)
+            if len(batch) >= size:
+                break
+        if batch and self.rowcount >= self.prefetchrows:
+            self.driver._round_trip()
+        self.rowcount += len(batch)
+        return batch
+
+    def fetchall(self):
+        rows = list(self._rows)
+        self.rowcount += len(rows)
+        return rows
+
+    def close(self):
+        self._rows = iter(())
+
+    def _autocommit(self):
+        if self.connection.autocommit:
+            with self.driver.lock:
+                self.driver.commits += 1
+            self.connection.pending = 0
@@ -5,6 +5,7 @@ Interface utilisateur en ligne de commande
 """
 
 from database import Database
+from config import METRICS_DIR
 from crud_operations import CRUDClient, CRUDVoiture, CRUDLocation, CRUDProprietaire
 from datetime import datetime, date
 import os
@@ -24,6 +25,15 @@ def print_header(title):
     print(f"  {title}")
     print("="*80)
 
+def paginer(afficher):
+    """Afficher une liste page par page : `afficher(curseur)` affiche une page
+    et renvoie le curseur de la suivante (None à la fin)"""
+    curseur = afficher(None)
+    while curseur:
+        if input("\nEntrée: page suivante, q: arrêter ").strip().lower() == 'q':
+            return
+        curseur = afficher(curseur)
+
 def input_non_vide(prompt: str, message_erreur: str = "⚠️  Ce champ ne peut pas être vide") -> str:
     """Demander une entrée non vide à l'utilisateur"""
     while True:
@@ -49,6 +59,8 @@ class MenuInteractif:
     
     def __init__(self):
         self.db = Database()
+        # Les écrans de statistiques relisent les mêmes agrégats : cache invalidé par les écritures
+        self.db.enable_cache()
         self.crud_client = None
         self.crud_voiture = None
         self.crud_location = None
@@ -101,7 +113,7 @@ class MenuInteractif:
         """Lister tous les clients"""
         clear_screen()
         print_header("LISTE DES CLIENTS")
-        self.crud_client.list_all()
+        paginer(self.crud_client.list_all)
         pause()
     
     def rechercher_client(self):
@@ -122,10 +134,10 @@ class MenuInteractif:
             
             # Afficher ses locations
             print(f"\n📊 Locations de ce client:")
-            locations = self.crud_location.read(codec=codec)
+            locations = self.crud_location.read(codec=codec, columns=('km',))
             if locations:
                 print(f"   Nombre de locations: {len(locations)}")
-                km_total = sum(loc[5] for loc in locations)
+                km_total = sum(loc.km for loc in locations)
                 print(f"   Kilométrage total: {km_total:,} km")
             else:
                 print("   Aucune location")
@@ -170,16 +182,15 @@ class MenuInteractif:
         print_header("MODIFIER UN CLIENT")
         
         codec = input_non_vide("Code du client à modifier: ")
-        clients = self.crud_client.read(codec)
+        # Valeurs actuelles (lecture par clé : sans aller-retour si le client est en cache)
+        clients = self.crud_client.read(codec, columns=('codec', 'nom', 'prenom', 'age', 'ville'))
         
         if not clients:
             print(f"❌ Client {codec} non trouvé")
             pause()
             return
         
-        # Afficher les infos actuelles
-        # SELECT * FROM Client retourne: CodeC, Nom, Prenom, Age, Permis, Adresse, Ville
-        codec_db, nom, prenom, age, permis, adresse, ville = clients[0]
+        codec_db, nom, prenom, age, ville = clients[0]
         print(f"\n📋 Informations actuelles:")
         print(f"   Code: {codec_db}")
         print(f"   Nom: {nom}")
@@ -208,7 +219,14 @@ class MenuInteractif:
             updates['ville'] = new_ville
         
         if updates:
-            self.crud_client.update(codec, **updates)
+            client = self.crud_client.update(codec_db, **updates)
+            if client:
+                print(f"\n📋 Informations enregistrées:")
+                print(f"   Code: {client.codec}")
+                print(f"   Nom: {client.nom}")
+                print(f"   Prénom: {client.prenom}")
+                print(f"   Âge: {client.age}")
+                print(f"   Ville: {client.ville}")
         else:
             print("Aucune modification")
         
@@ -220,23 +238,22 @@ class MenuInteractif:
         print_header("SUPPRIMER UN CLIENT")
         
         codec = input_non_vide("Code du client à supprimer: ")
-        clients = self.crud_client.read(codec)
+        # Lecture par clé des seules colonnes affichées (sans aller-retour si le client est en cache)
+        clients = self.crud_client.read(codec, columns=('codec', 'nom', 'prenom'))
         
         if not clients:
             print(f"❌ Client {codec} non trouvé")
             pause()
             return
         
-        # SELECT * FROM Client retourne: CodeC, Nom, Prenom, Age, Permis, Adresse, Ville
-        client_data = clients[0]
-        codec_db, nom, prenom, age, permis, adresse, ville = client_data
-        
+        codec_db, nom, prenom = clients[0]
         print(f"\n⚠️  Voulez-vous vraiment supprimer:")
-        print(f"   {nom} {prenom} (Code: {codec_db})")
+        print(f"   {nom} {prenom} ({codec_db})")
         
+        # Locations vérifiées par la suppression elle-même (un aller-retour)
         confirmer = input("\nConfirmer la suppression ? (o/n): ").strip().lower()
         if confirmer == 'o':
-            self.crud_client.delete(codec_db)
+            self.crud_client.delete(codec)
         else:
             print("Suppression annulée")
         
@@ -282,7 +299,7 @@ class MenuInteractif:
         clear_screen()
         titre = "VOITURES DISPONIBLES" if disponibles_only else "TOUTES LES VOITURES"
         print_header(titre)
-        self.crud_voiture.list_all(disponibles_only)
+        paginer(lambda curseur: self.crud_voiture.list_all(disponibles_only, curseur))
         pause()
     
     def rechercher_voiture(self):
@@ -301,12 +318,12 @@ class MenuInteractif:
             print(f"   Couleur: {couleur}")
             print(f"   Places: {places}")
             print(f"   Compteur: {compteur:,} km")
-            print(f"   Prix/jour: {prix}€")
+            print(f"   Prix/jour: {self.crud_voiture.stored('prix_jour', prix)}€")
             print(f"   État: {etat}")
             print(f"   Propriétaire: {codep}")
             
             # Nombre de locations
-            locations = self.crud_location.read(immat=immat)
+            locations = self.crud_location.read(immat=immat, columns=('numloc',))
             print(f"\n📊 Nombre de locations: {len(locations) if locations else 0}")
         else:
             print(f"\n❌ Voiture {immat} non trouvée")
@@ -347,7 +364,8 @@ class MenuInteractif:
             confirmer = input("\nConfirmer la création ? (o/n): ").strip().lower()
             if confirmer == 'o':
                 self.crud_voiture.create(immat, modele, marque, categorie, couleur,
-                                        places, achat_annee, compteur, prix_jour, code_proprio)
+                                        places, achat_annee, compteur,
+                                        self.crud_voiture.loaded('prix_jour', prix_jour), code_proprio)
         except ValueError as e:
             print(f"❌ Erreur de saisie: {e}")
         
@@ -359,16 +377,19 @@ class MenuInteractif:
         print_header("MODIFIER UNE VOITURE")
         
         immat = input_non_vide("Immatriculation de la voiture à modifier: ")
-        voitures = self.crud_voiture.read(immat)
+        # Valeurs actuelles (lecture par clé : sans aller-retour si la voiture est en cache)
+        voitures = self.crud_voiture.read(immat, columns=('marque', 'modele', 'compteur', 'prix_jour', 'etat'))
         
         if not voitures:
             print(f"❌ Voiture {immat} non trouvée")
             pause()
             return
         
-        _, modele, marque, categorie, couleur, places, achat, compteur, prix, codep, etat = voitures[0]
-        
+        marque, modele, compteur, prix, etat = voitures[0]
+        # Prix affichés et saisis en euros, quel que soit ORACLE_PRICE_MODE
+        prix = self.crud_voiture.stored('prix_jour', prix)
         print(f"\n📋 Informations actuelles:")
+        print(f"   Véhicule: {marque} {modele}")
         print(f"   Compteur: {compteur:,} km")
         print(f"   Prix/jour: {prix}€")
         print(f"   État: {etat}")
@@ -383,10 +404,16 @@ class MenuInteractif:
         
         new_prix = input(f"Nouveau prix/jour [{prix}]: ").strip()
         if new_prix:
-            updates['prix_jour'] = float(new_prix)
+            updates['prix_jour'] = self.crud_voiture.loaded('prix_jour', float(new_prix))
         
         if updates:
-            self.crud_voiture.update(immat, **updates)
+            voiture = self.crud_voiture.update(immat, **updates)
+            if voiture:
+                print(f"\n📋 Informations enregistrées:")
+                print(f"   Véhicule: {voiture.marque} {voiture.modele}")
+                print(f"   Compteur: {voiture.compteur:,} km")
+                print(f"   Prix/jour: {self.crud_voiture.stored('prix_jour', voiture.prix_jour)}€")
+                print(f"   État: {voiture.etat}")
         else:
             print("Aucune modification")
         
@@ -462,7 +489,7 @@ class MenuInteractif:
         while True:
             clear_screen()
             print_header("GESTION DES LOCATIONS")
-            print("1. Lister les locations récentes")
+            print("1. Lister les locations")
             print("2. Locations d'un client")
             print("3. Locations d'une voiture")
             print("4. Créer une nouvelle location")
@@ -485,10 +512,10 @@ class MenuInteractif:
                 break
     
     def lister_locations(self):
-        """Lister les locations récentes"""
+        """Lister les locations"""
         clear_screen()
-        print_header("LOCATIONS RÉCENTES")
-        self.crud_location.list_all(limit=30)
+        print_header("LISTE DES LOCATIONS")
+        paginer(lambda curseur: self.crud_location.list_all(limit=30, cursor=curseur))
         pause()
     
     def locations_client(self):
@@ -497,11 +524,11 @@ class MenuInteractif:
         print_header("LOCATIONS D'UN CLIENT")
         
         codec = input_non_vide("Code client: ")
-        locations = self.crud_location.read(codec=codec)
+        locations = self.crud_location.read(codec=codec, columns=('km',))
         
         if locations:
             print(f"\n✅ {len(locations)} location(s) trouvée(s)")
-            km_total = sum(loc[5] for loc in locations)
+            km_total = sum(loc.km for loc in locations)
             print(f"   Kilométrage total: {km_total:,} km")
         else:
             print(f"\n❌ Aucune location pour le client {codec}")
@@ -514,11 +541,11 @@ class MenuInteractif:
         print_header("LOCATIONS D'UNE VOITURE")
         
         immat = input_non_vide("Immatriculation: ")
-        locations = self.crud_location.read(immat=immat)
+        locations = self.crud_location.read(immat=immat, columns=('km',))
         
         if locations:
             print(f"\n✅ {len(locations)} location(s) trouvée(s)")
-            km_total = sum(loc[5] for loc in locations)
+            km_total = sum(loc.km for loc in locations)
             print(f"   Kilométrage total: {km_total:,} km")
         else:
             print(f"\n❌ Aucune location pour la voiture {immat}")
@@ -603,6 +630,7 @@ class MenuInteractif:
             print("2. Propriétaires avec stats")
             print("3. Top clients")
             print("4. Voitures rentables")
+            print("5. Métriques des requêtes SQL")
             print("0. Retour au menu principal")
             
             choix = input("\nVotre choix: ").strip()
@@ -615,6 +643,8 @@ class MenuInteractif:
                 self.stats_top_clients()
             elif choix == "4":
                 self.stats_voitures_rentables()
+            elif choix == "5":
+                self.stats_metriques()
             elif choix == "0":
                 break
     
@@ -633,7 +663,7 @@ class MenuInteractif:
             FROM DUAL
         """
         
-        result = self.db.execute_query(query)
+        result = self.db.execute_query(query, cached=True)
         if result:
             nb_clients, nb_voitures, nb_locations, nb_proprios, note_moy = result[0]
             
@@ -669,7 +699,7 @@ class MenuInteractif:
             FETCH FIRST 10 ROWS ONLY
         """
         
-        clients = self.db.execute_query(query)
+        clients = self.db.execute_query(query, cached=True)
         
         if clients:
             print(f"\n{'Rang':<6} {'Client':<30} {'Locations':<12} {'KM Total':<15}")
@@ -697,7 +727,7 @@ class MenuInteractif:
             FETCH FIRST 10 ROWS ONLY
         """
         
-        voitures = self.db.execute_query(query)
+        voitures = self.db.execute_query(query, cached=True)
         
         if voitures:
             print(f"\n{'Immat':<12} {'Véhicule':<30} {'Prix/J':<10} {'Locations':<12} {'Jours':<10}")
@@ -705,7 +735,27 @@ class MenuInteractif:
             
             for immat, marque, modele, prix, nb_loc, jours in voitures:
                 vehicule = f"{marque} {modele}"
-                print(f"{immat:<12} {vehicule:<30} {prix:>7.2f}€ {nb_loc:>11} {jours:>9}")
+                print(f"{immat:<12} {vehicule:<30} {self.crud_voiture.stored('prix_jour', prix):>7.2f}€ "
+                      f"{nb_loc:>11} {jours:>9}")
+        
+        pause()
+    
+    def stats_metriques(self):
+        """Métriques des requêtes SQL de la session"""
+        clear_screen()
+        print_header("MÉTRIQUES DES REQUÊTES SQL (temps cumulé)")
+        self.db.metrics.print_summary()
+        
+        parses = self.db.session_parse_stats()
+        if parses:
+            print("\n📊 Session Oracle: " + ", ".join(f"{name}={value}" for name, value in parses.items()))
+        
+        confirmer = input("\nExporter en JSON et Prometheus ? (o/n): ").strip().lower()
+        if confirmer == 'o':
+            json_path, prom_path = self.db.metrics.dump(METRICS_DIR)
+            print(f"✅ Métriques exportées:")
+            print(f"   {json_path}")
+            print(f"   {prom_path}")
         
         pause()
     
@@ -0,0 +1,244 @@
+"""
+Instrumentation des requêtes SQL: compteurs et latences par empreinte de requête
+Export JSON et texte Prometheus
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![:\w])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Normaliser une requête: littéraux remplacés par ?, espaces compactés"""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class StatementStats:
+    """Compteurs d'une empreinte de requête"""
+
+    __slots__ = ("kind", "calls", "errors", "rows", "total_time", "max_time", "samples")
+
+    def __init__(self, kind, sample_size):
+        self.kind = kind
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+
+class StatementCacheStats:
+    """Réplique du cache d'instructions des sessions (stmtcachesize)
+
+    Le pilote garde, par connexion, les `size` derniers textes SQL préparés
+    (LRU) : un texte présent réutilise son curseur, sinon il est envoyé au
+    serveur pour analyse (parse). Des textes construits à la volée (ex: SET
+    selon les champs fournis) dispersent le cache et multiplient les analyses.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.texts = set()
+        self.executions = 0
+        self.hits = 0
+        self.parses = 0
+
+    def seen(self, connection, sql):
+        """Compter une exécution de `sql` sur `connection` (True: trouvée en cache)"""
+        with self.lock:
+            self.executions += 1
+            cache = self.sessions.get(id(connection))
+            if cache is None:
+                cache = self.sessions[id(connection)] = OrderedDict()
+            if sql in cache:
+                cache.move_to_end(sql)
+                self.hits += 1
+                return True
+            self.parses += 1
+            self.texts.add(sql)
+            if self.size > 0:
+                cache[sql] = True
+                if len(cache) > self.size:
+                    cache.popitem(last=False)
+            return False
+
+    def reset(self):
+        with self.lock:
+            self.sessions.clear()
+            self.texts.clear()
+            self.executions = self.hits = self.parses = 0
+
+    def stats(self):
+        """Compteurs pour les métriques"""
+        with self.lock:
+            return {
+                'size': self.size,
+                'executions': self.executions,
+                'hits': self.hits,
+                'parses': self.parses,
+                'hit_ratio': self.hits / self.executions if self.executions else 0.0,
+                'distinct_statements': len(self.texts),
+            }
+
+
+class QueryMetrics:
+    """Métriques par empreinte: appels, latences p50/p95/p99, lignes, erreurs
+
+    `slow_query_ms` déclenche un message pour les requêtes plus lentes (0 = désactivé).
+    D'autres composants (cache...) peuvent publier leurs compteurs via `register_source`.
+    """
+
+    def __init__(self, slow_query_ms=500, sample_size=1024):
+        self.slow_query_ms = slow_query_ms
+        self.sample_size = sample_size
+        self.lock = threading.Lock()
+        self.statements = {}
+        self.sources = {}
+        self.started_at = time.time()
+
+    def record(self, kind, sql, elapsed, rows=0, error=False):
+        """Enregistrer un appel (durée en secondes)"""
+        key = fingerprint(sql)
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(kind, self.sample_size)
+            stats.calls += 1
+            stats.rows += rows or 0
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            stats.samples.append(elapsed)
+            if error:
+                stats.errors += 1
+        if self.slow_query_ms and elapsed * 1000 >= self.slow_query_ms:
+            print(f"🐢 Requête lente ({elapsed * 1000:.0f} ms, {kind}): {key[:120]}")
+
+    def register_source(self, name, collect):
+        """Publier les compteurs d'un autre composant (collect() -> dict)"""
+        self.sources[name] = collect
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Copie des métriques, triée par temps cumulé décroissant"""
+        with self.lock:
+            items = [(key, stats.kind, stats.calls, stats.errors, stats.rows,
+                      stats.total_time, stats.max_time, sorted(stats.samples))
+                     for key, stats in self.statements.items()]
+        statements = []
+        for key, kind, calls, errors, rows, total, max_time, samples in items:
+            statements.append({
+                'id': hashlib.sha1(key.encode()).hexdigest()[:12],
+                'fingerprint': key,
+                'kind': kind,
+                'calls': calls,
+                'errors': errors,
+                'rows': rows,
+                'total_ms': total * 1000,
+                'mean_ms': total * 1000 / calls if calls else 0.0,
+                'p50_ms': _percentile(samples, 0.50) * 1000,
+                'p95_ms': _percentile(samples, 0.95) * 1000,
+                'p99_ms': _percentile(samples, 0.99) * 1000,
+                'max_ms': max_time * 1000,
+            })
+        statements.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {
+            'started_at': self.started_at,
+            'uptime_s': time.time() - self.started_at,
+            'statements': statements,
+            'sources': {name: collect() for name, collect in self.sources.items()},
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(stmt, extra=""):
+            return (f'{{id="{stmt["id"]}",kind="{stmt["kind"]}",'
+                    f'statement="{_escape_label(stmt["fingerprint"][:120])}"{extra}}}')
+
+        statements = snapshot['statements']
+        metric("bda_sql_calls_total", "counter", "Nombre d'appels par requête",
+               [f"bda_sql_calls_total{labels(s)} {s['calls']}" for s in statements])
+        metric("bda_sql_errors_total", "counter", "Nombre d'erreurs par requête",
+               [f"bda_sql_errors_total{labels(s)} {s['errors']}" for s in statements])
+        metric("bda_sql_rows_total", "counter", "Lignes lues ou modifiées par requête",
+               [f"bda_sql_rows_total{labels(s)} {s['rows']}" for s in statements])
+        latency = []
+        for s in statements:
+            for quantile in ('50', '95', '99'):
+                quantile_label = ',quantile="0.%s"' % quantile
+                value = s['p%s_ms' % quantile] / 1000
+                latency.append(f"bda_sql_latency_seconds{labels(s, quantile_label)} {value:.6f}")
+            latency.append(f"bda_sql_latency_seconds_sum{labels(s)} {s['total_ms'] / 1000:.6f}")
+            latency.append(f"bda_sql_latency_seconds_count{labels(s)} {s['calls']}")
+        metric("bda_sql_latency_seconds", "summary", "Latence des requêtes", latency)
+        for source, values in snapshot['sources'].items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)):
+                    name = f"bda_{source}_{key}"
+                    metric(name, "gauge", f"{source}: {key}", [f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory, prefix="db_metrics"):
+        """Écrire les métriques en JSON et Prometheus, renvoie les chemins"""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{prefix}.json")
+        prom_path = os.path.join(directory, f"{prefix}.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+    def print_summary(self, limit=10):
+        """Afficher les requêtes les plus coûteuses (temps cumulé)"""
+        snapshot = self.snapshot()
+        statements = snapshot['statements'][:limit]
+        if not statements:
+            print("Aucune requête enregistrée")
+        else:
+            print(f"\n{'Appels':>7} {'Err':>4} {'Lignes':>9} {'Total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8}  Requête")
+            print("=" * 110)
+            for s in statements:
+                print(f"{s['calls']:>7} {s['errors']:>4} {s['rows']:>9} {s['total_ms']:>10.1f} "
+                      f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}  {s['fingerprint'][:50]}")
+        for source, values in snapshot['sources'].items():
+            details = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                for k, v in values.items())
+            print(f"   {source}: {details}")
@@ -0,0 +1,140 @@
+"""
+Statistiques de l'optimiseur après import : seules les tables dont le nombre
+de lignes a changé sont analysées, table par table et en tâche de fond
+"""
+import threading
+import time
+
+from config import STATS_CONFIG
+from csv_schema import CSV_SCHEMAS
+
+
+class StatsReport:
+    """Résultat du calcul des statistiques : tables analysées, ignorées, en échec"""
+
+    def __init__(self):
+        self.gathered = {}  # table: (lignes, échantillon, secondes)
+        self.skipped = {}   # table: motif
+        self.errors = {}    # table: message
+        self.elapsed = 0.0
+
+    def summary(self):
+        lines = [f"{table}: {rows:,} lignes, {sample}, {elapsed:.2f}s"
+                 for table, (rows, sample, elapsed) in self.gathered.items()]
+        lines.extend(f"{table}: ignorée ({reason})" for table, reason in self.skipped.items())
+        lines.extend(f"❌ {table}: {message}" for table, message in self.errors.items())
+        return lines
+
+
+def estimate_percent(rows, sample_rows=None, sample_pct=None):
+    """Valeur de estimate_percent : lecture complète des petites tables,
+    échantillon au-delà de `sample_rows` lignes"""
+    sample_rows = STATS_CONFIG['sample_rows'] if sample_rows is None else sample_rows
+    sample_pct = sample_pct or STATS_CONFIG['sample_pct']
+    if rows < sample_rows:
+        return '100'
+    if str(sample_pct).lower() == 'auto':
+        return 'DBMS_STATS.AUTO_SAMPLE_SIZE'
+    return str(float(sample_pct))
+
+def stale_tables(db, tables, stale_pct=None):
+    """Tables à analyser : [(table, lignes estimées)] et {table: motif} des autres
+
+    Une table est analysée si elle n'a pas de statistiques, si elle a été
+    vidée (TRUNCATE) ou si ses lignes insérées, modifiées et supprimées depuis
+    la dernière analyse (USER_TAB_MODIFICATIONS) dépassent `stale_pct` % de
+    NUM_ROWS. Aucune table n'est parcourue : FLUSH_DATABASE_MONITORING_INFO
+    rend visibles les écritures de l'import. Sans ce droit (ANALYZE ANY), le
+    nombre de lignes est compté (COUNT(*)) et comparé à NUM_ROWS.
+    """
+    stale_pct = STATS_CONFIG['stale_pct'] if stale_pct is None else stale_pct
+    flushed = db.execute_update("BEGIN DBMS_STATS.FLUSH_DATABASE_MONITORING_INFO; END;") is not None
+    binds = ", ".join(f":{i}" for i in range(1, len(tables) + 1))
+    known = db.execute_query(
+        f"SELECT t.table_name, t.num_rows, t.last_analyzed, m.inserts, m.updates, m.deletes, m.truncated "
+        f"FROM user_tables t LEFT JOIN user_tab_modifications m "
+        f"ON m.table_name = t.table_name AND m.partition_name IS NULL "
+        f"WHERE t.table_name IN ({binds})",
+        [table.upper() for table in tables]
+    ) or []
+    known = {row[0]: row[1:] for row in known}
+    stale, skipped = [], {}
+    for table in tables:
+        num_rows, analyzed, inserts, updates, deletes, truncated = known.get(table.upper(), (None,) * 6)
+        if flushed:
+            inserts, updates, deletes = inserts or 0, updates or 0, deletes or 0
+            rows = max(inserts if truncated == 'YES' else (num_rows or 0) + inserts - deletes, 0)
+            changes = inserts + updates + deletes
+        else:
+            result = db.execute_query(f"SELECT COUNT(*) FROM {table}")
+            if not result:
+                skipped[table] = "comptage impossible"
+                continue
+            rows = result[0][0]
+            changes = abs(rows - (num_rows or 0))
+        if analyzed is None or num_rows is None or truncated == 'YES':
+            stale.append((table, rows))
+        elif changes > stale_pct / 100 * max(num_rows, 1):
+            stale.append((table, rows))
+        else:
+            skipped[table] = f"{changes:,} ligne(s) modifiée(s), {num_rows:,} dans les statistiques"
+    return stale, skipped
+
+def gather(db, tables=None, stale_pct=None, report=None):
+    """Analyser les tables modifiées (index compris) ; renvoie un StatsReport"""
+    tables = tables or [schema['table'] for schema in CSV_SCHEMAS.values()]
+    report = report or StatsReport()
+    start = time.perf_counter()
+    stale, report.skipped = stale_tables(db, tables, stale_pct)
+    for table, rows in stale:
+        estimate = estimate_percent(rows)
+        table_start = time.perf_counter()
+        done = db.execute_update(
+            f"BEGIN DBMS_STATS.GATHER_TABLE_STATS(ownname => USER, tabname => :1, "
+            f"estimate_percent => {estimate}, cascade => TRUE); END;",
+            [table.upper()]
+        )
+        if done is None:
+            report.errors[table] = "DBMS_STATS.GATHER_TABLE_STATS en échec"
+            continue
+        sample = "complet" if estimate == '100' else (
+            "échantillon auto" if estimate.startswith('DBMS_STATS') else f"échantillon {estimate} %")
+        report.gathered[table] = (rows, sample, time.perf_counter() - table_start)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+class StatsJob:
+    """Calcul des statistiques en tâche de fond (ou immédiat) : `wait()` renvoie le StatsReport
+
+    En connexion unique, les appels du thread appelant attendent la fin de
+    l'analyse en cours (verrou de la session) ; avec le pool, chaque thread
+    a sa session.
+    """
+
+    def __init__(self, db, tables=None, background=None):
+        background = STATS_CONFIG['background'] if background is None else background
+        self.report = StatsReport()
+        self.error = None
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(db, tables),
+                                            name="optimizer-stats", daemon=True)
+            self._thread.start()
+        else:
+            self._run(db, tables)
+
+    def _run(self, db, tables):
+        try:
+            gather(db, tables, report=self.report)
+        except Exception as e:
+            self.error = e
+
+    @property
+    def done(self):
+        return self._thread is None or not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.report
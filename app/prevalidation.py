@@ -0,0 +1,288 @@
+"""
+Validation des CSV en mémoire, avant toute connexion : clés primaires,
+clés étrangères, dates et contraintes CHECK du schéma
+"""
+import itertools
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from config import CSV_FILES, IMPORT_CONFIG, REJECT_DIR
+from csv_schema import CSV_SCHEMAS, NULL_TOKENS, read_csv
+from loader import SCHEMA_FILE, foreign_keys, load_order
+
+# 'schema' : ce que 01_schema.sql refuse (types, longueurs, clés) ;
+# 'all' : aussi les contraintes de 02_constraints.sql et 06_triggers.sql,
+# ajoutées après le premier import
+LEVELS = ('schema', 'all')
+
+REASON_COLUMN = 'motif'
+LINE_COLUMN = 'ligne'
+
+_VARCHAR = re.compile(r"^\s*(\w+)\s+VARCHAR2\s*\(\s*(\d+)\s*\)", re.IGNORECASE | re.MULTILINE)
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(\w+)", re.IGNORECASE | re.MULTILINE)
+
+# Contraintes CHECK de 02_constraints.sql et triggers de 06_triggers.sql :
+# (contrainte, colonne, prédicat sur les valeurs non NULL)
+CHECKS = {
+    'proprietaire': (
+        ('chk_proprietaire_email', 'email', lambda s: s.str.contains(r"@.*\.", regex=True)),
+    ),
+    'client': (
+        ('chk_client_age', 'Age', lambda s: s.between(18, 120)),
+    ),
+    'voiture': (
+        ('chk_voiture_prix', 'prixJ', lambda s: s > 0),
+        ('chk_voiture_places', 'Places', lambda s: s.between(1, 9)),
+        ('chk_voiture_compteur', 'compteur', lambda s: s >= 0),
+    ),
+    'location': (
+        ('chk_location_note', 'note', lambda s: s.between(1, 5)),
+        ('chk_location_mois', 'Mois', lambda s: s.between(1, 12)),
+        ('chk_location_km', 'km', lambda s: s >= 0),
+        ('chk_location_duree', 'duree', lambda s: s >= 0),
+        ('trg_location_dates', 'dated',
+         lambda s: s <= pd.Timestamp.now().normalize() + pd.DateOffset(months=12)),
+    ),
+}
+
+# Colonnes obligatoires hors clé primaire (trg_location_dates)
+REQUIRED = {'location': ('dated',)}
+
+# Contraintes UNIQUE hors clé primaire (NULL autorisés)
+UNIQUE = {'proprietaire': (('uk_proprietaire_email', 'email'),)}
+
+
+class ValidationReport:
+    """Résultat de la validation d'un CSV : lignes lues, rejetées, par motif"""
+
+    def __init__(self, name, rows=0):
+        self.name = name
+        self.rows = rows
+        self.rejected = 0
+        self.reasons = {}
+        self.clean_path = None
+        self.reject_path = None
+
+    @property
+    def accepted(self):
+        return self.rows - self.rejected
+
+    def summary(self):
+        lines = [f"{self.accepted}/{self.rows} ligne(s) valide(s)"]
+        lines.extend(f"{reason}: {count}" for reason, count in self.reasons.items())
+        return lines
+
+
+def varchar_lengths(path=SCHEMA_FILE):
+    """Longueur maximale des colonnes VARCHAR2 : {TABLE: {COLONNE: octets}}"""
+    with open(path, encoding='utf-8') as f:
+        sql = f.read()
+    matches = list(_CREATE_TABLE.finditer(sql))
+    lengths = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(sql)
+        lengths[match.group(1).upper()] = {column.upper(): int(size)
+                                           for column, size in _VARCHAR.findall(sql, match.end(), end)}
+    return lengths
+
+def _by_uniques(raw, *conversions):
+    """Appliquer chaque (conversion, valeur NULL) aux seules valeurs distinctes
+    de la colonne (cf. csv_schema._by_uniques) ; un tableau par conversion"""
+    codes, uniques = pd.factorize(raw)
+    uniques = pd.Series(uniques, dtype=object)
+    results = []
+    for convert, missing in conversions:
+        converted = np.asarray(convert(uniques))
+        results.append(np.append(converted, np.asarray([missing], dtype=converted.dtype))[codes])
+    return results
+
+def typed_frame(raw, name):
+    """Colonnes du CSV (lu en texte) converties selon le schéma, nommées comme
+    dans Oracle ; renvoie aussi les valeurs illisibles par colonne numérique
+    et la longueur en octets des colonnes texte"""
+    frame, invalid, sizes = {}, {}, {}
+    for column in CSV_SCHEMAS[name]['columns']:
+        values = raw[column.csv]
+        if column.type in ('int', 'float'):
+            converted, = _by_uniques(values, (lambda u: pd.to_numeric(u.str.strip(), errors='coerce')
+                                              .to_numpy(dtype=np.float64), np.nan))
+            invalid[column.name] = values.notna().to_numpy() & np.isnan(converted)
+        elif column.type == 'date':
+            # Date illisible : NULL à l'import (pas un rejet)
+            converted, = _by_uniques(values, (lambda u: pd.to_datetime(u, format=column.format, errors='coerce')
+                                              .to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT')))
+        else:
+            converted, sizes[column.name] = _by_uniques(
+                values,
+                (lambda u: u.str.strip().to_numpy(dtype=object), None),
+                (lambda u: u.str.strip().str.encode('utf-8').str.len().to_numpy(dtype=np.int64), 0),
+            )
+        frame[column.name] = converted
+    return pd.DataFrame(frame, index=raw.index), invalid, sizes
+
+def _key_index(frame, columns):
+    return pd.MultiIndex.from_frame(frame[list(columns)])
+
+def check_table(name, raw, known_keys, lengths=None, level='schema', seen=None):
+    """Motifs de rejet de chaque ligne d'un CSV (ou d'un paquet de lignes)
+
+    Renvoie (drapeaux, motifs, frame) : un bit par motif rejeté (0 : ligne
+    valide), motifs[i] étant le libellé du bit i. `known_keys` : {TABLE:
+    MultiIndex des clés valides} des tables déjà validées, pour les clés
+    étrangères. `seen` : {colonnes: MultiIndex des valeurs déjà gardées}
+    pour l'unicité entre paquets, complété avec les lignes valides de
+    celui-ci. Tous les contrôles sont vectorisés.
+    """
+    seen = {} if seen is None else seen
+    constraints = level == 'all'
+    schema = CSV_SCHEMAS[name]
+    table = schema['table'].upper()
+    frame, invalid, byte_sizes = typed_frame(raw, name)
+    flags = np.zeros(len(raw), dtype=np.uint64)
+    reasons = []
+
+    def reject(mask, reason):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            flags[mask] |= np.uint64(1 << len(reasons))
+            reasons.append(reason)
+
+    for column, mask in invalid.items():
+        reject(mask, f"{column} non numérique")
+    sizes = (lengths or {}).get(table, {})
+    for column, byte_size in byte_sizes.items():
+        size = sizes.get(column.upper())
+        if size:
+            reject(byte_size > size, f"{column} > {size} octets")
+
+    key = list(schema['key'])
+    reject(frame[key].isna().any(axis=1), "clé primaire NULL")
+    if constraints:
+        for column in REQUIRED.get(name, ()):
+            reject(frame[column].isna(), f"{column} obligatoire")
+        for constraint, column, predicate in CHECKS.get(name, ()):
+            values = frame[column]
+            present = values.notna()
+            valid = pd.Series(True, index=frame.index)
+            valid[present] = predicate(values[present]).to_numpy(dtype=bool)
+            reject(~valid, constraint)
+        if name == 'location':
+            reject(frame['datef'].notna() & (frame['datef'] < frame['dated']), "datef < dated")
+
+    for columns, referenced, referenced_columns in foreign_keys().get(table, ()):
+        if referenced not in known_keys:
+            continue  # table référencée non chargée : contrôle laissé à Oracle
+        present = frame[list(columns)].notna().all(axis=1)
+        found = known_keys[referenced].get_indexer(_key_index(frame, columns)) >= 0
+        reject(present & ~found, f"{', '.join(columns)} absent de {referenced}")
+
+    # Unicité en dernier, parmi les lignes restantes : la première occurrence
+    # valide est gardée, comme à l'insertion
+    clean = flags == 0
+    reject(_duplicated(frame[key], clean, seen.get(tuple(key))), "clé primaire en double")
+    unique = [(key, clean)]
+    for constraint, column in UNIQUE.get(name, ()) if constraints else ():
+        present = clean & frame[column].notna().to_numpy()
+        reject(_duplicated(frame[[column]], present, seen.get((column,))), constraint)
+        unique.append(([column], present))
+    for columns, mask in unique:
+        kept = _key_index(frame[mask & (flags == 0)], columns)
+        previous = seen.get(tuple(columns))
+        seen[tuple(columns)] = kept if previous is None else previous.append(kept)
+    return flags, reasons, frame
+
+def reason_text(flags, reasons):
+    """Drapeaux -> motifs lisibles (« motif | motif »), construits une fois par combinaison"""
+    codes, uniques = pd.factorize(flags)
+    texts = np.array([" | ".join(reason for bit, reason in enumerate(reasons) if int(value) >> bit & 1)
+                      for value in uniques], dtype=object)
+    return texts[codes]
+
+def _duplicated(frame, mask, previous=None):
+    """Lignes de `mask` dont la valeur est déjà apparue plus haut parmi `mask`
+    ou dans `previous` (valeurs gardées des paquets précédents)"""
+    duplicated = np.zeros(len(frame), dtype=bool)
+    candidates = frame[mask]
+    duplicated[mask] = candidates.duplicated(keep='first').to_numpy()
+    if previous is not None and len(previous):
+        duplicated[mask] |= _key_index(candidates, candidates.columns).isin(previous)
+    return duplicated
+
+def write_csv(frame, path, append=False):
+    """Écrire un CSV au format du projet (NULL pour les valeurs absentes) ;
+    `append` : ajouter les lignes, sans en-tête, à la fin du fichier"""
+    frame.to_csv(path, sep=';', index=False, na_rep=NULL_TOKENS[0],
+                 mode='a' if append else 'w', header=not append)
+
+def prevalidate(names=None, files=None, directory=None, level=None, chunk_rows=None):
+    """Valider les CSV entre eux avant l'import
+
+    Les tables sont contrôlées dans l'ordre des clés étrangères : une ligne
+    qui référence une ligne rejetée est rejetée à son tour. Les lignes
+    rejetées sont écrites dans `<nom>.rejets.csv` (colonnes d'origine,
+    numéro de ligne et motif) et les lignes valides dans `<nom>.csv`, sous
+    `directory`. Renvoie ({nom: ValidationReport}, {nom: CSV à importer}) ;
+    un fichier sans rejet est importé tel quel. `level` : voir LEVELS.
+
+    Chaque CSV est lu par paquets de `chunk_rows` lignes, comme à l'import :
+    seules les clés gardées (tables référencées, unicité) restent en mémoire.
+    """
+    level = level or IMPORT_CONFIG['prevalidate']
+    if level not in LEVELS:
+        raise ValueError(f"Niveau de validation inconnu: {level} ({', '.join(LEVELS)})")
+    names = [name for wave in load_order(names) for name in wave]
+    files = files or {}
+    directory = directory or REJECT_DIR
+    chunk_rows = chunk_rows or IMPORT_CONFIG['chunk_rows']
+    lengths = varchar_lengths()
+    referenced = {table for keys in foreign_keys().values() for _, table, _ in keys}
+    reports, clean_files, known_keys = {}, {}, {}
+    for name in names:
+        path = clean_files[name] = files.get(name) or CSV_FILES[name]
+        schema = CSV_SCHEMAS[name]
+        report = reports[name] = ValidationReport(name)
+        reject_path = os.path.join(directory, f"{name}.rejets.csv")
+        clean_path = os.path.join(directory, f"{name}.csv")
+        _remove(reject_path)
+        seen = {}
+        for raw in read_csv(path, chunksize=chunk_rows):
+            flags, reasons, _ = check_table(name, raw, known_keys, lengths, level, seen)
+            rejected = flags != 0
+            count = int(rejected.sum())
+            for bit, reason in enumerate(reasons):
+                report.reasons[reason] = (report.reasons.get(reason, 0)
+                                          + int((flags >> np.uint64(bit) & np.uint64(1)).sum()))
+            if count:
+                os.makedirs(directory, exist_ok=True)
+                if not report.rejected:
+                    # Premier rejet : les paquets précédents, tous valides, sont recopiés tels quels
+                    _copy_lines(path, clean_path, report.rows)
+                rejects = raw[rejected].copy()
+                # +2 : en-tête du CSV et numérotation à partir de 1 (index continu entre paquets)
+                rejects.insert(0, LINE_COLUMN, rejects.index + 2)
+                rejects[REASON_COLUMN] = reason_text(flags[rejected], reasons)
+                write_csv(rejects, reject_path, append=bool(report.rejected))
+            if report.rejected or count:
+                write_csv(raw[~rejected], clean_path, append=True)
+            report.rows += len(raw)
+            report.rejected += count
+        table = schema['table'].upper()
+        if table in referenced:
+            key = list(schema['key'])
+            known_keys[table] = seen.get(tuple(key), pd.MultiIndex.from_arrays([[] for _ in key], names=key))
+        if report.rejected:
+            report.reject_path = reject_path
+            report.clean_path = clean_files[name] = clean_path
+    return reports, clean_files
+
+def _copy_lines(source, target, count):
+    """Recopier l'en-tête et les `count` premières lignes de `source` dans `target`"""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        dst.writelines(itertools.islice(src, count + 1))
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
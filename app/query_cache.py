@@ -0,0 +1,182 @@
+"""
+Cache des résultats de requêtes SELECT avec invalidation par table
+"""
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Tables suivies par l'invalidation
+TABLES = ('PROPRIETAIRE', 'CLIENT', 'VOITURE', 'LOCATION')
+
+# Effets de bord des triggers : écrire dans Location modifie aussi Voiture
+# (trg_location_update_etat, trg_location_update_compteur)
+TRIGGER_SIDE_EFFECTS = {
+    'LOCATION': ('VOITURE',),
+}
+
+# Vues de sql/03_views.sql et tables qu'elles lisent
+VIEWS = {
+    'V_CLIENT': ('CLIENT', 'LOCATION'),
+    'V_CLIENT55': ('CLIENT', 'LOCATION'),
+}
+
+# Procédures connues et tables qu'elles modifient (sinon: tout invalider)
+PROCEDURE_TABLES = {
+    'NOTER_LOCATION': ('LOCATION',),
+    'MAJ_AVIS': ('LOCATION',),
+}
+
+_TABLE_PATTERN = re.compile(r"\b(" + "|".join(TABLES + tuple(VIEWS)) + r")\b", re.IGNORECASE)
+_WRITE_TARGET = re.compile(r"^\s*(?:INSERT\s+(?:/\*.*?\*/\s*)?INTO|UPDATE|DELETE(?:\s+FROM)?|MERGE\s+(?:/\*.*?\*/\s*)?INTO)\s+(\w+)",
+                           re.IGNORECASE | re.DOTALL)
+
+def read_tables(sql):
+    """Tables lues par une requête (recherche des noms connus, vues
+    remplacées par leurs tables) ; vide si aucune n'est reconnue"""
+    names = {name.upper() for name in _TABLE_PATTERN.findall(sql)}
+    return frozenset(table for name in names for table in VIEWS.get(name, (name,)))
+
+def written_tables(sql):
+    """Tables modifiées par une écriture, effets des triggers compris
+
+    Renvoie None si la cible n'est pas reconnue (bloc PL/SQL...) : tout invalider.
+    """
+    match = _WRITE_TARGET.match(sql)
+    if not match:
+        return None
+    table = match.group(1).upper()
+    return frozenset((table,) + TRIGGER_SIDE_EFFECTS.get(table, ()))
+
+def procedure_tables(proc_name):
+    """Tables modifiées par une procédure (None si inconnue)"""
+    tables = PROCEDURE_TABLES.get(proc_name.split('.')[-1].upper())
+    if tables is None:
+        return None
+    return frozenset(t for table in tables for t in (table,) + TRIGGER_SIDE_EFFECTS.get(table, ()))
+
+def _estimate_size(rows):
+    """Taille approximative d'un résultat (octets)"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """Cache LRU des résultats (clé: SQL + binds), borné en taille et en durée
+
+    Chaque entrée retient les tables lues ; une écriture sur une table
+    invalide toutes les entrées qui en dépendent.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.by_table = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Incrémenté à chaque invalidation : un résultat lu avant une écriture
+        # concurrente n'est pas mis en cache
+        self.version = 0
+
+    @staticmethod
+    def key(sql, params):
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return sql, params
+
+    def get(self, sql, params=None):
+        """Résultat en cache ou None"""
+        key = self.key(sql, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            rows, tables, size, expires = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, sql, params, rows, version=None, size=None):
+        """Mémoriser un résultat lu à la `version` donnée
+
+        Ignoré s'il dépasse la capacité, si une invalidation a eu lieu depuis
+        ou si aucune table lue n'est reconnue (rien ne l'invaliderait).
+        `size` (octets) remplace l'estimation pour les résultats non tabulaires.
+        """
+        size = _estimate_size(rows) if size is None else size
+        if size > self.max_bytes:
+            return
+        tables = read_tables(sql)
+        if not tables:
+            return
+        key = self.key(sql, params)
+        with self.lock:
+            if version is not None and version != self.version:
+                return
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (rows, tables, size, time.monotonic() + self.ttl)
+            self.bytes += size
+            for table in tables:
+                self.by_table.setdefault(table, set()).add(key)
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables=None):
+        """Supprimer les entrées dépendant de ces tables (toutes si None)"""
+        with self.lock:
+            self.version += 1
+            if tables is None:
+                count = len(self.entries)
+                self.entries.clear()
+                self.by_table.clear()
+                self.bytes = 0
+            else:
+                keys = set()
+                for table in tables:
+                    keys |= self.by_table.get(table, set())
+                count = len(keys)
+                for key in keys:
+                    self._remove(key)
+            self.invalidations += count
+
+    def _remove(self, key):
+        rows, tables, size, _ = self.entries.pop(key)
+        self.bytes -= size
+        for table in tables:
+            keys = self.by_table.get(table)
+            if keys:
+                keys.discard(key)
+
+    def stats(self):
+        """Compteurs pour les métriques"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,69 @@
+"""
+Enregistrements compacts pour les lectures CRUD : une classe à __slots__ par
+(table, colonnes lues), générée à la demande et mise en cache
+"""
+from operator import attrgetter
+
+_TYPES = {}
+
+
+class Record:
+    """Base des enregistrements : lecture par attribut (`client.nom`), par
+    position (`client[1]`) et décompression comme un tuple"""
+
+    __slots__ = ()
+    _fields = ()
+
+    def _values(self):
+        values = self._get(self)
+        return values if len(self._fields) > 1 else (values,)
+
+    def __iter__(self):
+        return iter(self._values())
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return self._values()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, tuple)):
+            return self._values() == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={value!r}" for field, value in zip(self._fields, self._values()))
+        return f"{type(self).__name__}({values})"
+
+    def _asdict(self):
+        return dict(zip(self._fields, self._values()))
+
+
+def record_type(name, fields):
+    """Classe d'enregistrement `name` à __slots__ pour `fields`
+
+    Pas de __dict__ par instance : une ligne coûte l'en-tête de l'objet plus
+    un pointeur par colonne. Le constructeur est généré (comme namedtuple)
+    pour éviter une boucle Python par ligne.
+    """
+    fields = tuple(fields)
+    key = (name, fields)
+    cls = _TYPES.get(key)
+    if cls is not None:
+        return cls
+    if not fields or len(set(fields)) != len(fields) or not all(field.isidentifier() for field in fields):
+        raise ValueError(f"Colonnes invalides pour {name}: {', '.join(fields)}")
+    namespace = {}
+    body = "".join(f"    self.{field} = {field}\n" for field in fields)
+    exec(f"def __init__(self, {', '.join(fields)}):\n{body}", namespace)
+    cls = type(name, (Record,), {
+        '__slots__': fields,
+        '_fields': fields,
+        '_get': staticmethod(attrgetter(*fields)),
+        '__init__': namespace['__init__'],
+    })
+    _TYPES[key] = cls
+    return cls
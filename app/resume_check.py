@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Vérification de la reprise d'import : l'import est tué (SIGKILL) à des
+instants aléatoires jusqu'à ce qu'il aille au bout, puis les tables sont
+comparées aux CSV
+Usage: python app/resume_check.py [interruptions] [délai max en s] [graine]
+"""
+import os
+import random
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+# Ajouter le dossier app au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database import db
+from config import IMPORT_CONFIG
+from csv_schema import CSV_SCHEMAS
+from checkpoint import CHECKPOINT_TABLE
+from prevalidation import prevalidate
+
+IMPORT_SCRIPT = Path(__file__).parent / 'import_data.py'
+DONE_MARKER = "Import terminé avec succès"
+DUPLICATE_ERROR = "ORA-00001"
+
+
+def run_with_kills(command=None, kills=10, max_delay=5.0, seed=None, env=None):
+    """Lancer l'import avec reprise, le tuer après un délai aléatoire, relancer
+
+    Après `kills` interruptions, l'import est relancé une dernière fois sans
+    limite de temps. Renvoie (interruptions effectives, sorties de chaque
+    exécution, import terminé ?).
+    """
+    rng = random.Random(seed)
+    command = command or [sys.executable, str(IMPORT_SCRIPT)]
+    env = {**os.environ, **(env or {}), 'IMPORT_RESUME': '1', 'PYTHONUNBUFFERED': '1'}
+    outputs, killed = [], 0
+    for attempt in range(kills + 1):
+        process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True)
+        try:
+            output, _ = process.communicate(timeout=rng.uniform(0, max_delay) if attempt < kills else None)
+        except subprocess.TimeoutExpired:
+            process.send_signal(signal.SIGKILL)
+            output, _ = process.communicate()
+            outputs.append(output)
+            killed += 1
+            print(f"   ✂️  exécution {attempt + 1} tuée")
+            continue
+        outputs.append(output)
+        return killed, outputs, DONE_MARKER in output
+    return killed, outputs, False
+
+def check_tables(db, expected):
+    """Écarts entre les tables et les lignes attendues : [(table, attendu, trouvé)]"""
+    problems = []
+    for name, rows in expected.items():
+        table = CSV_SCHEMAS[name]['table']
+        result = db.execute_query(f"SELECT COUNT(*) FROM {table}")
+        found = result[0][0] if result else None
+        if found != rows:
+            problems.append((table, rows, found))
+    result = db.execute_query(f"SELECT COUNT(*) FROM {CHECKPOINT_TABLE}")
+    left = result[0][0] if result else None
+    if left != 0:
+        problems.append((CHECKPOINT_TABLE, 0, left))
+    return problems
+
+def main(kills=10, max_delay=5.0, seed=None, command=None):
+    """Interrompre l'import puis vérifier : lignes ni perdues ni envoyées deux fois"""
+    print("="*60)
+    print(f"🔁 Reprise d'import : {kills} interruption(s) aléatoire(s)")
+    print("="*60)
+
+    if IMPORT_CONFIG['prevalidate'] == 'off':
+        expected = None
+    else:
+        reports, _ = prevalidate()
+        expected = {name: report.accepted for name, report in reports.items()}
+
+    killed, outputs, finished = run_with_kills(command, kills, max_delay, seed)
+    duplicates = sum(output.count(DUPLICATE_ERROR) for output in outputs)
+    resumed = sum("↻" in output for output in outputs)
+    print(f"\n   {killed} interruption(s), {resumed} reprise(s), {len(outputs)} exécution(s)")
+    if not finished:
+        print("   ❌ L'import n'est pas allé au bout")
+        print(outputs[-1][-2000:])
+        return False
+    if duplicates:
+        print(f"   ❌ {duplicates} ligne(s) renvoyée(s) après reprise ({DUPLICATE_ERROR})")
+
+    if expected is None:
+        print("   ⚠️  Validation désactivée (IMPORT_PREVALIDATE=off) : comptages non vérifiés")
+        return not duplicates
+    if not db.connect():
+        print("\n❌ Impossible de se connecter à la base de données")
+        return False
+    try:
+        problems = check_tables(db, expected)
+    finally:
+        db.disconnect()
+    for table, rows, found in problems:
+        print(f"   ❌ {table}: {found} ligne(s), {rows} attendue(s)")
+    if not problems and not duplicates:
+        print("   ✓ Tables identiques aux CSV, aucun point de reprise restant")
+    return not problems and not duplicates
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    ok = main(int(args[0]) if args else 10,
+              float(args[1]) if len(args) > 1 else 5.0,
+              int(args[2]) if len(args) > 2 else None)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,209 @@
+"""
+Chargement via tables de staging : les tables en ligne ne sont jamais vides
+ni à moitié chargées pour les lecteurs
+"""
+import time
+
+from config import IMPORT_CONFIG
+from csv_schema import CSV_SCHEMAS
+from loader import foreign_keys, load_order, load_tables
+
+STAGING_PREFIX = 'STG_'
+
+# Triggers de 06_triggers.sql court-circuités par pkg_publication pendant la
+# publication : leurs règles sont contrôlées par validate, leurs effets
+# appliqués en bloc par publish (DERIVED, SIDE_EFFECTS)
+BYPASSED_TRIGGERS = ('TRG_LOCATION_VERIFICATION', 'TRG_LOCATION_DATES', 'TRG_LOCATION_UPDATE_ETAT')
+
+# Colonnes calculées par un trigger : {nom: {colonne: (trigger, expression SQL)}}
+DERIVED = {
+    'location': {'duree': ('TRG_LOCATION_DATES',
+                           "CASE WHEN dated IS NOT NULL AND datef IS NOT NULL THEN datef - dated ELSE duree END")},
+}
+
+# Écritures d'un trigger sur d'autres tables, rejouées après la copie : {nom: [(trigger, SQL)]}
+SIDE_EFFECTS = {
+    'location': [('TRG_LOCATION_UPDATE_ETAT',
+                  "UPDATE Voiture SET etat = 'en location' WHERE etat = 'disponible' "
+                  "AND immat IN (SELECT immat FROM Location WHERE dated <= SYSDATE)")],
+}
+
+
+class StagingReport:
+    """Résultat d'un chargement par staging : lignes chargées, contrôles, publication"""
+
+    def __init__(self):
+        self.loads = {}
+        self.problems = []
+        self.published = False
+        self.timings = {}
+
+    def summary(self):
+        lines = [f"{phase}: {elapsed:.2f}s" for phase, elapsed in self.timings.items()]
+        lines.extend(f"❌ {check}: {count} ligne(s)" for check, count in self.problems)
+        lines.append("publié" if self.published else "non publié (tables en ligne inchangées)")
+        return lines
+
+
+def staging_table(name):
+    return STAGING_PREFIX + CSV_SCHEMAS[name]['table']
+
+def live_triggers(db, names):
+    """Triggers activés des tables en ligne de `names` (USER_TRIGGERS)"""
+    tables = [CSV_SCHEMAS[name]['table'].upper() for name in names]
+    binds = ", ".join(f":{i}" for i in range(1, len(tables) + 1))
+    rows = db.execute_query(f"SELECT trigger_name FROM user_triggers "
+                            f"WHERE status = 'ENABLED' AND table_name IN ({binds})", tables)
+    if rows is None:
+        raise RuntimeError("lecture de USER_TRIGGERS impossible")
+    return {trigger for trigger, in rows}
+
+def _drop(db, table):
+    """Supprimer une table si elle existe (ORA-00942 ignorée)"""
+    db.execute_update(
+        f"BEGIN EXECUTE IMMEDIATE 'DROP TABLE {table} PURGE'; "
+        f"EXCEPTION WHEN OTHERS THEN IF SQLCODE != -942 THEN RAISE; END IF; END;"
+    )
+
+def create_staging(db, names):
+    """Copies vides des tables : ni index, ni triggers, ni clés étrangères"""
+    for name in names:
+        _drop(db, staging_table(name))
+        db.execute_update(f"CREATE TABLE {staging_table(name)} NOLOGGING AS "
+                          f"SELECT * FROM {CSV_SCHEMAS[name]['table']} WHERE 1 = 0")
+
+def trigger_checks(name, table, loaded, triggers):
+    """Règles des triggers activés, en requêtes ensemblistes sur `table` :
+    [(contrôle, SELECT COUNT(*) des lignes que le trigger refuserait)]"""
+    if name != 'location':
+        return []
+    checks = []
+    if 'TRG_LOCATION_DATES' in triggers:
+        checks.append((f"{table}: dated obligatoire", f"SELECT COUNT(*) FROM {table} WHERE dated IS NULL"))
+        checks.append((f"{table}: dated à plus de 12 mois",
+                       f"SELECT COUNT(*) FROM {table} WHERE dated > ADD_MONTHS(SYSDATE, 12)"))
+    if 'TRG_LOCATION_VERIFICATION' in triggers:
+        if 'VOITURE' not in loaded:
+            # Voitures rechargées : état par défaut ('disponible') à la publication
+            checks.append((f"{table}: voiture non disponible",
+                           f"SELECT COUNT(*) FROM {table} s JOIN Voiture v ON v.immat = s.immat "
+                           f"WHERE v.etat != 'disponible'"))
+        checks.append((f"{table}: chevauchement de dates",
+                       f"SELECT COUNT(*) FROM {table} s WHERE s.dated IS NOT NULL AND EXISTS ("
+                       f"SELECT 1 FROM {table} o WHERE o.immat = s.immat "
+                       f"AND (o.CodeC != s.CodeC OR o.Annee != s.Annee OR o.Mois != s.Mois "
+                       f"OR o.numLoc != s.numLoc) "
+                       f"AND o.dated IS NOT NULL AND o.datef IS NOT NULL "
+                       f"AND (s.dated BETWEEN o.dated AND o.datef "
+                       f"OR NVL(s.datef, s.dated + 365) BETWEEN o.dated AND o.datef))"))
+    return checks
+
+def validate(db, names, triggers=()):
+    """Contrôles des tables de staging avant publication : [(contrôle, nombre de lignes)]
+
+    Clés primaires en double, clés étrangères orphelines (référence : staging
+    si la table est rechargée, sinon table en ligne), dates incohérentes et
+    règles des triggers activés (`triggers`, voir trigger_checks).
+    """
+    problems = []
+    loaded = {CSV_SCHEMAS[name]['table'].upper(): name for name in names}
+    schema_keys = foreign_keys()
+    for name in names:
+        table = staging_table(name)
+        key = ", ".join(CSV_SCHEMAS[name]['key'])
+        checks = [(f"{table}: clé primaire en double",
+                   f"SELECT COUNT(*) FROM (SELECT {key} FROM {table} GROUP BY {key} HAVING COUNT(*) > 1)")]
+        for columns, referenced, referenced_columns in schema_keys.get(CSV_SCHEMAS[name]['table'].upper(), ()):
+            target = staging_table(loaded[referenced]) if referenced in loaded else referenced
+            join = " AND ".join(f"r.{rc} = s.{c}" for c, rc in zip(columns, referenced_columns))
+            present = " AND ".join(f"s.{c} IS NOT NULL" for c in columns)
+            checks.append((f"{table}: {', '.join(columns)} absent de {target}",
+                           f"SELECT COUNT(*) FROM {table} s WHERE {present} "
+                           f"AND NOT EXISTS (SELECT 1 FROM {target} r WHERE {join})"))
+        if name == 'location':
+            checks.append((f"{table}: datef < dated",
+                           f"SELECT COUNT(*) FROM {table} WHERE datef < dated"))
+        checks.extend(trigger_checks(name, table, loaded, triggers))
+        for check, query in checks:
+            result = db.execute_query(query)
+            count = result[0][0] if result else None
+            if count is None:
+                problems.append((check, "contrôle impossible"))
+            elif count:
+                problems.append((check, count))
+    return problems
+
+def publish(db, names, triggers=()):
+    """Remplacer le contenu des tables en ligne par celui du staging, en une transaction
+
+    Les lecteurs voient l'ancien contenu jusqu'au COMMIT, puis le nouveau.
+    Les triggers restent activés : pkg_publication court-circuite, pour cette
+    session seulement, ceux de BYPASSED_TRIGGERS (règles rejouées par
+    validate ; colonnes calculées et mises à jour des voitures appliquées
+    ici en bloc, dans la même transaction).
+    """
+    order = [name for wave in load_order(names) for name in wave]
+    bypass = bool(triggers & set(BYPASSED_TRIGGERS))
+    with db.transaction():
+        if bypass:
+            db.execute_update("BEGIN pkg_publication.debut; END;")
+        try:
+            for name in reversed(order):
+                db.execute_update(f"DELETE FROM {CSV_SCHEMAS[name]['table']}")
+            for name in order:
+                columns = [column.name for column in CSV_SCHEMAS[name]['columns']]
+                derived = {column: expression for column, (trigger, expression) in DERIVED.get(name, {}).items()
+                           if trigger in triggers}
+                values = ", ".join(derived.get(column, column) for column in columns)
+                db.execute_update(f"INSERT INTO {CSV_SCHEMAS[name]['table']} ({', '.join(columns)}) "
+                                  f"SELECT {values} FROM {staging_table(name)}")
+            for name in order:
+                for trigger, statement in SIDE_EFFECTS.get(name, ()):
+                    if trigger in triggers:
+                        db.execute_update(statement)
+        finally:
+            if bypass:
+                db.execute_update("BEGIN pkg_publication.fin; END;")
+
+def staging_import(db, names=None, files=None, keep=None, on_done=None):
+    """Charger les CSV dans des tables de staging puis publier d'un coup
+
+    1. copies vides des tables (CTAS) ; 2. chargement en lot, sans index ni
+    trigger ; 3. contrôles ensemblistes (clés, règles des triggers) ;
+    4. publication en une transaction si tout est correct. `keep` conserve les tables de staging.
+    Renvoie un StagingReport.
+    """
+    names = [name for wave in load_order(names) for name in wave]
+    keep = IMPORT_CONFIG['keep_staging'] if keep is None else keep
+    report = StagingReport()
+
+    def phase(label, action, *args):
+        start = time.perf_counter()
+        result = action(*args)
+        report.timings[label] = time.perf_counter() - start
+        return result
+
+    phase("création staging", create_staging, db, names)
+    try:
+        tables = {name: staging_table(name) for name in names}
+        report.loads = phase("chargement", lambda: load_tables(db, names, files=files, on_done=on_done,
+                                                               tables=tables))
+        for name in names:
+            load = report.loads.get(name)
+            if load is None or not load.committed:
+                report.problems.append((f"{tables[name]}: chargement", "échec"))
+            elif load.errors:
+                report.problems.append((f"{tables[name]}: lignes rejetées", len(load.errors)))
+        if report.problems:
+            return report
+        triggers = live_triggers(db, names)
+        report.problems = phase("contrôles", validate, db, names, triggers)
+        if report.problems:
+            return report
+        phase("publication", publish, db, names, triggers)
+        report.published = True
+        return report
+    finally:
+        if not keep:
+            for name in names:
+                _drop(db, staging_table(name))
@@ -0,0 +1,85 @@
+"""
+Conversion des colonnes NUMBER en types Python natifs (int / float / centimes)
+"""
+import oracledb
+
+# Colonnes numériques du schéma (sql/01_schema.sql) et type Python cible
+# 'price' suit le mode choisi pour les prix : 'float' (euros) ou 'cents' (entier)
+COLUMN_TYPES = {
+    'ANNEEI': 'int',
+    'AGE': 'int',
+    'PLACES': 'int',
+    'ACHATA': 'int',
+    'COMPTEUR': 'int',
+    'PRIXJ': 'price',
+    'ANNEE': 'int',
+    'MOIS': 'int',
+    'KM': 'int',
+    'DUREE': 'int',
+    'NOTE': 'int',
+}
+
+PRICE_MODES = ('float', 'cents')
+
+def to_cents(value):
+    """Montant en euros -> entier en centimes"""
+    return round(value * 100)
+
+def from_cents(value):
+    """Entier en centimes -> montant en euros"""
+    return value / 100
+
+
+class NativeTypeHandler:
+    """`outputtypehandler` python-oracledb : NUMBER -> int, float ou centimes
+
+    Les colonnes du schéma suivent `columns` (COLUMN_TYPES par défaut) ; les
+    autres NUMBER sont choisies d'après précision/échelle, les NUMBER sans
+    précision (COUNT, SUM, AVG...) gardent la conversion par défaut du pilote.
+    """
+
+    def __init__(self, columns=None, price_mode='float'):
+        if price_mode not in PRICE_MODES:
+            raise ValueError(f"Mode de prix inconnu: {price_mode} ({', '.join(PRICE_MODES)})")
+        self.columns = dict(COLUMN_TYPES if columns is None else columns)
+        self.price_mode = price_mode
+
+    def kind(self, name, precision, scale):
+        """Type cible d'une colonne NUMBER (None: conversion par défaut)"""
+        kind = self.columns.get(name.upper())
+        if kind == 'price':
+            return self.price_mode
+        if kind is not None:
+            return kind
+        if scale == 0 and precision:
+            return 'int'
+        if scale is not None and scale > 0:
+            return 'float'
+        return None
+
+    def to_python(self, name, value):
+        """Valeur d'une colonne reçue hors fetch (RETURNING INTO, variable typée
+        par l'appelant), convertie comme à la lecture : prix en centimes en mode 'cents'"""
+        if value is not None and self.columns.get(name.upper()) == 'price' and self.price_mode == 'cents':
+            return to_cents(value)
+        return value
+
+    def to_database(self, name, value):
+        """Inverse de to_python : valeur au format de lecture ramenée à celui de
+        la base (prix en euros en mode 'cents'), pour un bind ou un affichage"""
+        if value is not None and self.columns.get(name.upper()) == 'price' and self.price_mode == 'cents':
+            return from_cents(value)
+        return value
+
+    def __call__(self, cursor, metadata):
+        if metadata.type_code is not oracledb.DB_TYPE_NUMBER:
+            return None
+        kind = self.kind(metadata.name, metadata.precision, metadata.scale)
+        if kind == 'int':
+            return cursor.var(int, arraysize=cursor.arraysize)
+        if kind == 'float':
+            return cursor.var(oracledb.DB_TYPE_BINARY_DOUBLE, arraysize=cursor.arraysize)
+        if kind == 'cents':
+            return cursor.var(oracledb.DB_TYPE_BINARY_DOUBLE, arraysize=cursor.arraysize,
+                              outconverter=to_cents)
+        return None
@@ -5,7 +5,6 @@ Module de visualisations - 5 graphiques pour analyser les données
 
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pandas as pd
 import numpy as np
 from database import Database
 from datetime import datetime
@@ -24,6 +23,7 @@ class DataVisualizer:
     
     def __init__(self):
         self.db = Database()
+        self.db.enable_cache()
         self.connect()
     
     def connect(self):
@@ -36,11 +36,12 @@ class DataVisualizer:
         self.db.disconnect()
     
     def get_dataframe(self, query):
-        """Exécuter une requête et retourner un DataFrame pandas"""
-        result = self.db.execute_query(query)
-        if result:
-            return pd.DataFrame(result)
-        return pd.DataFrame()
+        """Exécuter une requête et retourner un DataFrame pandas
+
+        Lecture en colonnes : noms (alias entre guillemets) et types
+        viennent directement du résultat Oracle.
+        """
+        return self.db.fetch_dataframe(query, cached=True)
     
     # ========== VISUALISATION 1: Distribution des voitures par catégorie ==========
     
@@ -49,10 +50,10 @@ class DataVisualizer:
         print("\n📊 Visualisation 1: Distribution des catégories...")
         
         query = """
-            SELECT Categorie, COUNT(*) as nombre
+            SELECT Categorie AS "Categorie", COUNT(*) AS "Nombre"
             FROM Voiture
             GROUP BY Categorie
-            ORDER BY nombre DESC
+            ORDER BY "Nombre" DESC
         """
         
         df = self.get_dataframe(query)
@@ -60,8 +61,6 @@ class DataVisualizer:
             print("❌ Pas de données")
             return
         
-        df.columns = ['Categorie', 'Nombre']
-        
         # Créer le graphique
         fig, ax = plt.subplots(figsize=(10, 8))
         
@@ -96,12 +95,12 @@ class DataVisualizer:
         print("\n📊 Visualisation 2: Top clients par kilométrage...")
         
         query = """
-            SELECT c.Nom || ' ' || c.Prenom as client,
-                   SUM(l.km) as km_total
+            SELECT c.Nom || ' ' || c.Prenom AS "Client",
+                   SUM(l.km) AS "KM_Total"
             FROM Client c
             JOIN Location l ON c.CodeC = l.CodeC
             GROUP BY c.Nom, c.Prenom
-            ORDER BY km_total DESC
+            ORDER BY "KM_Total" DESC
             FETCH FIRST 10 ROWS ONLY
         """
         
@@ -110,8 +109,6 @@ class DataVisualizer:
             print("❌ Pas de données")
             return
         
-        df.columns = ['Client', 'KM_Total']
-        
         # Créer le graphique
         fig, ax = plt.subplots(figsize=(12, 8))
         
@@ -143,7 +140,7 @@ class DataVisualizer:
         print("\n📊 Visualisation 3: Évolution des locations...")
         
         query = """
-            SELECT Annee, Mois, COUNT(*) as nb_locations
+            SELECT Annee AS "Annee", Mois AS "Mois", COUNT(*) AS "Nb_Locations"
             FROM Location
             GROUP BY Annee, Mois
             ORDER BY Annee, Mois
@@ -154,8 +151,6 @@ class DataVisualizer:
             print("❌ Pas de données")
             return
         
-        df.columns = ['Annee', 'Mois', 'Nb_Locations']
-        
         # Créer une colonne période
         df['Periode'] = df['Annee'].astype(str) + '-' + df['Mois'].astype(str).str.zfill(2)
         df = df.sort_values(['Annee', 'Mois'])
@@ -194,7 +189,7 @@ class DataVisualizer:
         print("\n📊 Visualisation 4: Notes de satisfaction...")
         
         query = """
-            SELECT note, COUNT(*) as nb_locations
+            SELECT note AS "Note", COUNT(*) AS "Nb_Locations"
             FROM Location
             WHERE note IS NOT NULL
             GROUP BY note
@@ -206,8 +201,6 @@ class DataVisualizer:
             print("❌ Pas de données")
             return
         
-        df.columns = ['Note', 'Nb_Locations']
-        
         # Créer une figure avec 2 sous-graphiques
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
         
@@ -269,14 +262,14 @@ class DataVisualizer:
         print("\n📊 Visualisation 5: Analyse multi-critères...")
         
         query = """
-            SELECT v.Categorie,
-                   COUNT(DISTINCT v.Immat) as nb_voitures,
-                   COUNT(l.CodeC) as nb_locations,
-                   AVG(v.prixJ) as prix_moyen
+            SELECT v.Categorie AS "Categorie",
+                   COUNT(DISTINCT v.Immat) AS "Nb_Voitures",
+                   COUNT(l.CodeC) AS "Nb_Locations",
+                   AVG(v.prixJ) AS "Prix_Moyen"
             FROM Voiture v
             LEFT JOIN Location l ON v.Immat = l.Immat
             GROUP BY v.Categorie
-            ORDER BY nb_locations DESC
+            ORDER BY "Nb_Locations" DESC
         """
         
         df = self.get_dataframe(query)
@@ -284,8 +277,6 @@ class DataVisualizer:
             print("❌ Pas de données")
             return
         
-        df.columns = ['Categorie', 'Nb_Voitures', 'Nb_Locations', 'Prix_Moyen']
-        
         # Créer un graphique simple montrant la popularité par catégorie
         fig, ax = plt.subplots(1, 1, figsize=(14, 8))
         
@@ -344,7 +335,7 @@ class DataVisualizer:
             FROM DUAL
         """
         
-        result = self.db.execute_query(stats_query)
+        result = self.db.execute_query(stats_query, cached=True)
         if not result:
             print("❌ Pas de données")
             return
@@ -377,16 +368,15 @@ class DataVisualizer:
         ax_clients = fig.add_subplot(gs[1, 0])
         
         top_clients_query = """
-            SELECT c.Nom || ' ' || SUBSTR(c.Prenom, 1, 1) || '.' as client,
-                   SUM(l.km) as km
+            SELECT c.Nom || ' ' || SUBSTR(c.Prenom, 1, 1) || '.' AS "Client",
+                   SUM(l.km) AS "KM"
             FROM Client c
             JOIN Location l ON c.CodeC = l.CodeC
             GROUP BY c.Nom, c.Prenom
-            ORDER BY km DESC
+            ORDER BY "KM" DESC
             FETCH FIRST 5 ROWS ONLY
         """
         df_clients = self.get_dataframe(top_clients_query)
-        df_clients.columns = ['Client', 'KM']
         
         ax_clients.barh(df_clients['Client'], df_clients['KM'], color='teal')
         ax_clients.set_title('Top 5 Clients (km)', fontsize=12, weight='bold')
@@ -395,9 +385,8 @@ class DataVisualizer:
         # Zone 3: Catégories (milieu centre)
         ax_cat = fig.add_subplot(gs[1, 1])
         
-        cat_query = "SELECT Categorie, COUNT(*) FROM Voiture GROUP BY Categorie"
+        cat_query = 'SELECT Categorie AS "Categorie", COUNT(*) AS "Nombre" FROM Voiture GROUP BY Categorie'
         df_cat = self.get_dataframe(cat_query)
-        df_cat.columns = ['Categorie', 'Nombre']
         
         ax_cat.pie(df_cat['Nombre'], labels=df_cat['Categorie'], autopct='%1.0f%%')
         ax_cat.set_title('Répartition Catégories', fontsize=12, weight='bold')
@@ -405,9 +394,8 @@ class DataVisualizer:
         # Zone 4: Notes (milieu droite)
         ax_notes = fig.add_subplot(gs[1, 2])
         
-        notes_query = "SELECT note, COUNT(*) FROM Location WHERE note IS NOT NULL GROUP BY note ORDER BY note"
+        notes_query = 'SELECT note AS "Note", COUNT(*) AS "Nombre" FROM Location WHERE note IS NOT NULL GROUP BY note ORDER BY note'
         df_notes = self.get_dataframe(notes_query)
-        df_notes.columns = ['Note', 'Nombre']
         
         ax_notes.bar(df_notes['Note'], df_notes['Nombre'], 
                     color=sns.color_palette('RdYlGn', len(df_notes)))
@@ -419,13 +407,12 @@ class DataVisualizer:
         ax_evol = fig.add_subplot(gs[2, :])
         
         evol_query = """
-            SELECT Annee, Mois, COUNT(*) as nb
+            SELECT Annee AS "Annee", Mois AS "Mois", COUNT(*) AS "Nb"
             FROM Location
             GROUP BY Annee, Mois
             ORDER BY Annee, Mois
         """
         df_evol = self.get_dataframe(evol_query)
-        df_evol.columns = ['Annee', 'Mois', 'Nb']
         df_evol['Periode'] = df_evol['Annee'].astype(str) + '-' + df_evol['Mois'].astype(str).str.zfill(2)
         
         ax_evol.plot(range(len(df_evol)), df_evol['Nb'], marker='o', linewidth=2)
@@ -9,6 +9,42 @@
 SET ECHO ON
 SET SERVEROUTPUT ON
 
+PROMPT ============================================================
+PROMPT Package: Publication du staging (import_data.py, IMPORT_MODE=staging)
+PROMPT ============================================================
+
+-- Les règles des triggers de Location sont contrôlées en bloc sur les tables
+-- STG_* avant la publication ; pendant la copie, ces triggers ne font rien
+-- pour la session qui publie (les autres sessions ne sont pas concernées)
+CREATE OR REPLACE PACKAGE pkg_publication AS
+    PROCEDURE debut;
+    PROCEDURE fin;
+    FUNCTION en_cours RETURN BOOLEAN;
+END pkg_publication;
+/
+
+CREATE OR REPLACE PACKAGE BODY pkg_publication AS
+    g_en_cours BOOLEAN := FALSE;
+
+    PROCEDURE debut IS
+    BEGIN
+        g_en_cours := TRUE;
+    END debut;
+
+    PROCEDURE fin IS
+    BEGIN
+        g_en_cours := FALSE;
+    END fin;
+
+    FUNCTION en_cours RETURN BOOLEAN IS
+    BEGIN
+        RETURN g_en_cours;
+    END en_cours;
+END pkg_publication;
+/
+
+PROMPT ✓ Package pkg_publication créé
+
 PROMPT ============================================================
 PROMPT Partie 5.5: Trigger d'historique des changements d'état
 PROMPT ============================================================
@@ -54,6 +90,11 @@ DECLARE
     v_etat_voiture Voiture.etat%TYPE;
     v_nb_locations NUMBER;
 BEGIN
+    -- Publication du staging : règle déjà contrôlée en bloc (staging_load.validate)
+    IF pkg_publication.en_cours THEN
+        RETURN;
+    END IF;
+    
     -- Récupérer l'état actuel de la voiture
     SELECT etat INTO v_etat_voiture
     FROM Voiture
@@ -105,6 +146,11 @@ FOR EACH ROW
 DECLARE
     PRAGMA AUTONOMOUS_TRANSACTION;
 BEGIN
+    -- Publication du staging : règle déjà contrôlée en bloc (staging_load.validate)
+    IF pkg_publication.en_cours THEN
+        RETURN;
+    END IF;
+    
     -- Mettre la voiture en location si la date de début est aujourd'hui ou passée
     IF :NEW.dated <= SYSDATE THEN
         UPDATE Voiture
@@ -211,6 +257,11 @@ CREATE OR REPLACE TRIGGER trg_location_dates
 BEFORE INSERT OR UPDATE ON Location
 FOR EACH ROW
 BEGIN
+    -- Publication du staging : règles et durée appliquées en bloc (staging_load.validate)
+    IF pkg_publication.en_cours THEN
+        RETURN;
+    END IF;
+    
     -- Vérifier que dated est définie
     IF :NEW.dated IS NULL THEN
         RAISE_APPLICATION_ERROR(-20010, 'La date de début est obligatoire');
@@ -351,6 +402,9 @@ PROMPT ============================================================
 PROMPT ✅ Script 06_triggers.sql exécuté avec succès
 PROMPT ============================================================
 PROMPT 
+PROMPT Package créé:
+PROMPT  - pkg_publication             : Publication du staging sans triggers de Location
+PROMPT 
 PROMPT Triggers créés:
 PROMPT  - trg_voiture_etat_hist        : Historique des changements d'état
 PROMPT  - trg_location_verification    : Vérification avant location